@@ -8,7 +8,29 @@ from models import db
 from flask_migrate import Migrate
 from routes import register_blueprints
 from routes.errors import register_error_handlers
+from routes.transcription import run_job
 from services.file_handler import FileHandler
+from services.database import db_executor, is_sqlite, configure_sqlite, register_sqlite_pragmas
+from services.storage import storage_manager
+from services.jobs import job_runner
+from services.scheduler import chunk_scheduler
+from services.probe import media_prober
+from services.audio_workers import audio_workers
+from services.progress import throughput_model
+from services.shared_storage import shared_storage
+from services.audio_store import audio_store
+from services.leases import lease_manager
+from services.workers import worker_registry
+from services.broker import event_broker
+from services.page_cache import page_cache, seed_versions
+from services.responses import response_compressor
+from services.provider_health import provider_health
+from services.hedging import hedge_policy
+from services.local_whisper import local_whisper
+from services.postprocess import postprocessor
+from services.schedules import schedule_manager
+from services.admission import admission_controller
+from services.cold_storage import cold_storage
 
 # Load environment variables first
 load_dotenv()
@@ -39,16 +61,39 @@ def create_app(config=None):
             'max_overflow': 2,
             'pool_timeout': 30,
             'pool_recycle': 1800,
-        }
+        },
+        # Multi-node deployment: where jobs queue, whether this process runs them,
+        # how progress reaches other nodes and where uploads are shared
+        JOB_QUEUE=os.getenv('JOB_QUEUE', 'local'),
+        RUN_JOBS=os.getenv('RUN_JOBS', 'true').lower() not in ('0', 'false', 'no'),
+        BROKER_URL=os.getenv('BROKER_URL', 'memory://'),
+        SHARED_STORAGE_ROOT=os.getenv('SHARED_STORAGE_ROOT'),
+        # Keep normalized audio so transcripts can be re-run without the upload
+        AUDIO_STORE_ROOT=os.getenv('AUDIO_STORE_ROOT'),
+        AUDIO_STORE_MAX_BYTES=int(os.getenv('AUDIO_STORE_MAX_BYTES', 10 * 1024 ** 3)),
+        # Pre-provisioned Whisper model for the local CPU backend
+        LOCAL_WHISPER_MODEL_DIR=os.getenv('LOCAL_WHISPER_MODEL_DIR'),
+        LOCAL_WHISPER_WORKERS=int(os.getenv('LOCAL_WHISPER_WORKERS', 1)),
+        # Derived content generated after each transcription, e.g. "summary,chapters"
+        POSTPROCESS_TASKS=os.getenv('POSTPROCESS_TASKS', ''),
+        POSTPROCESS_MODEL=os.getenv('POSTPROCESS_MODEL', 'gpt-4o-mini')
     )
     
     # Override with custom config if provided
     if config:
         app.config.update(config)
     
+    # SQLite: WAL journal, connection pragmas and a single-writer queue
+    sqlite_mode = is_sqlite(app)
+    if sqlite_mode:
+        configure_sqlite(app, engine_options=not (config and 'SQLALCHEMY_ENGINE_OPTIONS' in config))
+    
     # Initialize extensions
     db.init_app(app)
+    if sqlite_mode:
+        register_sqlite_pragmas(app)
     migrate = Migrate(app, db)  # Initialize Flask-Migrate
+    db_executor.init_app(app)  # Async DB access for the processing pipeline
     
     # Ensure upload directories exist
     upload_dir = Path(app.config['UPLOAD_FOLDER'])
@@ -56,11 +101,46 @@ def create_app(config=None):
     upload_dir.mkdir(exist_ok=True)
     temp_dir.mkdir(exist_ok=True)
     
+    # Disk reservations, per-job temp artifacts and scheduled sweeps where jobs run
+    storage_manager.init_app(app)
+    if app.config['RUN_JOBS']:
+        storage_manager.start_sweeper()
+    
+    # Compressed tier for old completed transcripts, compacted where jobs run
+    cold_storage.init_app(app)
+    if app.config['RUN_JOBS']:
+        cold_storage.start_compactor()
+    
     # Register error handlers
     register_error_handlers(app)
     
     # Register blueprints
     register_blueprints(app)
+    page_cache.init_app(app)
+    response_compressor.init_app(app)  # gzip/brotli negotiation and precompressed static files
+    
+    # Shared state for multi-node deployments
+    shared_storage.init_app(app)
+    audio_store.init_app(app)
+    lease_manager.init_app(app)
+    worker_registry.init_app(app)
+    event_broker.init_app(app)
+    
+    # Background job runner (started on first submitted job)
+    job_runner.init_app(app)
+    job_runner.set_handler(run_job)
+    chunk_scheduler.init_app(app)
+    media_prober.init_app(app)
+    audio_workers.init_app(app)
+    throughput_model.init_app(app)
+    provider_health.init_app(app)
+    hedge_policy.init_app(app)
+    local_whisper.init_app(app)
+    postprocessor.init_app(app)
+    admission_controller.init_app(app)  # Backpressure on uploads; needs the runner's limits
+    schedule_manager.init_app(app)  # Releases held batch work into spare capacity
+    if app.config['RUN_JOBS']:
+        schedule_manager.start()
     
     return app
 
@@ -68,6 +148,7 @@ def init_db(app):
     """Initialize database tables"""
     with app.app_context():
         db.create_all()
+        seed_versions()
 
 if __name__ == '__main__':
     app = create_app()
@@ -0,0 +1,54 @@
+"""Synthetic audio and video fixtures for benchmarks"""
+import math
+import shutil
+import subprocess
+import wave
+from array import array
+from pathlib import Path
+
+def make_wav(path: Path, seconds: float, sample_rate: int = 16000, channels: int = 1) -> Path:
+    """Write a 16-bit PCM WAV containing a quiet sweep of the given length"""
+    path = Path(path)
+    frames_per_block = sample_rate
+    total_frames = int(seconds * sample_rate)
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        written = 0
+        while written < total_frames:
+            count = min(frames_per_block, total_frames - written)
+            freq = 220 + (written // sample_rate) % 40 * 10
+            block = array('h', (
+                int(3000 * math.sin(2 * math.pi * freq * (written + i) / sample_rate))
+                for i in range(count)
+                for _ in range(channels)
+            ))
+            wav.writeframes(block.tobytes())
+            written += count
+    return path
+
+def has_ffmpeg() -> bool:
+    return shutil.which('ffmpeg') is not None
+
+def make_video(path: Path, seconds: float) -> Path:
+    """Write a small MP4 (test pattern + AAC tone) using ffmpeg's lavfi sources"""
+    if not has_ffmpeg():
+        raise RuntimeError('ffmpeg is required to generate video fixtures')
+    path = Path(path)
+    subprocess.run([
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f'testsrc=size=320x240:rate=10:duration={seconds}',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=44100:duration={seconds}',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-c:a', 'aac', '-shortest',
+        str(path)
+    ], check=True)
+    return path
+
+def make_fixture(directory: Path, name: str, seconds: float, kind: str = 'wav') -> Path:
+    """Create a fixture of the given kind ('wav' or 'mp4') in directory"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    if kind == 'mp4':
+        return make_video(directory / f'{name}.mp4', seconds)
+    return make_wav(directory / f'{name}.wav', seconds)
@@ -0,0 +1,97 @@
+"""Cold-start benchmark for the web process.
+
+Examples::
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 10 --top 15 --json
+
+Times ``import app`` and ``create_app()`` in fresh interpreters, lists the
+slowest imports (from ``python -X importtime``) and checks that provider and
+audio dependencies are not loaded until a job needs them.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that belong behind the processing boundary and must not load at startup
+DEFERRED_MODULES = ('groq_transcription', 'openai', 'groq', 'pydub', 'aiohttp', 'aiofiles', 'deepgram')
+
+_PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'STORAGE_SWEEP_INTERVAL': 0})
+created = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - started,
+    'create_app_seconds': created - imported,
+    'loaded': sorted(m for m in %r if m in sys.modules),
+}))
+''' % (DEFERRED_MODULES,)
+
+def _run(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}, check=True
+    )
+
+def measure(runs: int) -> Tuple[List[Dict[str, float]], List[str]]:
+    samples, loaded = [], set()
+    for _ in range(runs):
+        result = json.loads(_run(['-c', _PROBE]).stdout.strip().splitlines()[-1])
+        loaded.update(result.pop('loaded'))
+        samples.append(result)
+    return samples, sorted(loaded)
+
+def slowest_imports(top: int) -> List[Tuple[str, int]]:
+    """Modules with the largest cumulative import time, in microseconds"""
+    stderr = _run(['-X', 'importtime', '-c', 'import app']).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        rows.append((name, int(cumulative)))
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to list')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    samples, loaded = measure(args.runs)
+    imports = [s['import_seconds'] for s in samples]
+    creates = [s['create_app_seconds'] for s in samples]
+    report = {
+        'runs': args.runs,
+        'import_app_median': round(statistics.median(imports), 3),
+        'import_app_max': round(max(imports), 3),
+        'create_app_median': round(statistics.median(creates), 3),
+        'deferred_modules_loaded': ', '.join(loaded) or 'none',
+    }
+    slowest = slowest_imports(args.top)
+
+    if args.json:
+        print(json.dumps({**report, 'slowest_imports_ms': {name: us / 1000 for name, us in slowest}}, indent=2))
+    else:
+        width = max(len(key) for key in report)
+        for key, value in report.items():
+            print(f'{key:<{width}}  {value}')
+        print('\nslowest imports (cumulative ms)')
+        for name, us in slowest:
+            print(f'  {us / 1000:>8.1f}  {name}')
+    if loaded:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
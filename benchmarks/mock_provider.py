@@ -0,0 +1,200 @@
+"""Local stand-in for the Groq/OpenAI ``/audio/transcriptions`` endpoint.
+
+Serves both ``/openai/v1/audio/transcriptions`` (Groq layout) and
+``/v1/audio/transcriptions`` (OpenAI layout) with configurable latency,
+error rate and a requests-per-second rate limit, returning a
+``verbose_json``-shaped body with synthetic segments (and words when word
+timestamps are requested).
+
+Run standalone with ``python -m benchmarks.mock_provider --port 8765``.
+"""
+import argparse
+import asyncio
+import io
+import random
+import threading
+import time
+import wave
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from aiohttp import web
+
+@dataclass
+class MockProviderConfig:
+    """Behaviour knobs for the mock provider"""
+    latency: float = 0.2           # Base seconds per request
+    latency_per_minute: float = 0.05  # Extra seconds per minute of submitted audio
+    jitter: float = 0.05           # Uniform +/- seconds added to each request
+    error_rate: float = 0.0        # Probability of answering 500
+    rate_limit: float = 0.0        # Requests per second before answering 429 (0 = unlimited)
+    segment_seconds: float = 5.0   # Length of each synthetic segment
+
+@dataclass
+class MockProviderStats:
+    requests: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    audio_seconds: float = 0.0
+    by_path: Dict[str, int] = field(default_factory=dict)
+
+def _audio_seconds(data: bytes) -> float:
+    """Duration of a WAV payload, or a rough bitrate-based guess for other formats"""
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError):
+        return len(data) / (128_000 / 8)
+
+class MockProvider:
+    """aiohttp server emulating an OpenAI-compatible transcription API"""
+
+    def __init__(self, config: Optional[MockProviderConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or MockProviderConfig()
+        self.host = host
+        self.port = port
+        self.stats = MockProviderStats()
+        self._tokens = float(self.config.rate_limit)
+        self._last_refill = time.monotonic()
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def groq_base_url(self) -> str:
+        return f'http://{self.host}:{self.port}/openai/v1'
+
+    @property
+    def openai_base_url(self) -> str:
+        return f'http://{self.host}:{self.port}/v1'
+
+    def _take_token(self) -> bool:
+        if not self.config.rate_limit:
+            return True
+        now = time.monotonic()
+        self._tokens = min(
+            self.config.rate_limit, self._tokens + (now - self._last_refill) * self.config.rate_limit
+        )
+        self._last_refill = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def handle_transcription(self, request: web.Request) -> web.Response:
+        self.stats.requests += 1
+        self.stats.by_path[request.path] = self.stats.by_path.get(request.path, 0) + 1
+
+        if not self._take_token():
+            self.stats.rate_limited += 1
+            return web.json_response(
+                {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_exceeded'}},
+                status=429, headers={'retry-after': '1'}
+            )
+
+        audio = b''
+        language = 'en'
+        granularities = set()
+        reader = await request.multipart()
+        async for part in reader:
+            if part.name == 'file':
+                audio = await part.read(decode=False)
+            elif part.name == 'language':
+                language = (await part.text()) or language
+            elif part.name in ('timestamp_granularities[]', 'timestamp_granularities'):
+                granularities.add(await part.text())
+
+        seconds = _audio_seconds(audio)
+        self.stats.audio_seconds += seconds
+        delay = self.config.latency + self.config.latency_per_minute * seconds / 60
+        delay += random.uniform(-self.config.jitter, self.config.jitter)
+        await asyncio.sleep(max(0.0, delay))
+
+        if random.random() < self.config.error_rate:
+            self.stats.errors += 1
+            return web.json_response({'error': {'message': 'Injected failure'}}, status=500)
+
+        segments = []
+        start = 0.0
+        index = 0
+        while start < seconds:
+            end = min(seconds, start + self.config.segment_seconds)
+            segments.append({
+                'id': index, 'start': start, 'end': end,
+                'text': f' Segment {index} of synthetic speech.'
+            })
+            start = end
+            index += 1
+        body = {
+            'task': 'transcribe',
+            'language': language,
+            'duration': seconds,
+            'text': ''.join(s['text'] for s in segments).strip(),
+            'segments': segments,
+        }
+        if 'word' in granularities:
+            # Spread each segment's words evenly across it
+            body['words'] = []
+            for segment in segments:
+                tokens = segment['text'].split()
+                step = (segment['end'] - segment['start']) / len(tokens)
+                for i, token in enumerate(tokens):
+                    start = segment['start'] + i * step
+                    body['words'].append({'word': token, 'start': start, 'end': start + step})
+        return web.json_response(body)
+
+    def make_app(self) -> web.Application:
+        app = web.Application(client_max_size=200 * 1024 * 1024)
+        app.router.add_post('/openai/v1/audio/transcriptions', self.handle_transcription)
+        app.router.add_post('/v1/audio/transcriptions', self.handle_transcription)
+        return app
+
+    async def _serve(self) -> None:
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+
+    def start(self) -> 'MockProvider':
+        """Serve on a background thread and return once listening"""
+        def _run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._serve())
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, name='mock-provider', daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run the mock transcription provider')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--latency-per-minute', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=0.0)
+    args = parser.parse_args()
+
+    provider = MockProvider(MockProviderConfig(
+        latency=args.latency,
+        latency_per_minute=args.latency_per_minute,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+    ), host=args.host, port=args.port)
+    print(f'Groq base URL:   {provider.groq_base_url}')
+    print(f'OpenAI base URL: {provider.openai_base_url}')
+    web.run_app(provider.make_app(), host=args.host, port=args.port)
+
+if __name__ == '__main__':
+    main()
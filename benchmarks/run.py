@@ -0,0 +1,216 @@
+"""End-to-end pipeline benchmark against the local mock provider.
+
+Examples::
+
+    python -m benchmarks.run --jobs 20 --concurrency 5 --durations 60,900
+    python -m benchmarks.run --mode upload --jobs 10 --latency 1.5 --error-rate 0.1
+    LOCAL_WHISPER_MODEL_DIR=models/whisper-small python -m benchmarks.run --backend local --jobs 4
+
+Reports throughput, p50/p95 job latency, peak RSS, DB commits and provider
+request counts. Each run uses a throwaway SQLite database and upload folder.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fixtures import make_fixture
+from benchmarks.mock_provider import MockProvider, MockProviderConfig
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+def build_fixtures(directory: Path, durations: List[float], kind: str) -> List[Path]:
+    return [make_fixture(directory, f'fixture_{int(d)}s', d, kind) for d in durations]
+
+def run_process_mode(app, fixtures: List[Path], jobs: int, concurrency: int,
+                     backend: str = 'mock') -> Dict[str, float]:
+    """Drive process_file directly, bypassing HTTP"""
+    from routes.transcription import process_file
+    from services.jobs import Job
+    from services.local_whisper import LOCAL
+    from services.storage import storage_manager
+
+    latencies: Dict[str, float] = {}
+
+    async def one(index: int, semaphore: asyncio.Semaphore) -> None:
+        fixture = fixtures[index % len(fixtures)]
+        title = f'bench_{index}'
+        async with semaphore:
+            upload = Path(app.config['UPLOAD_FOLDER']) / f'{title}{fixture.suffix}'
+            shutil.copyfile(fixture, upload)
+            storage_manager.track(title, upload)
+            job = Job(title, upload, options={'backend': LOCAL}) if backend == LOCAL else None
+            started = time.perf_counter()
+            await process_file(upload, title, job=job)
+            latencies[title] = time.perf_counter() - started
+
+    async def main() -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(one(i, semaphore) for i in range(jobs)))
+
+    with app.app_context():
+        asyncio.run(main())
+    return latencies
+
+def run_upload_mode(app, fixtures: List[Path], jobs: int, concurrency: int, timeout: float) -> Dict[str, float]:
+    """POST files to /upload and poll until each transcript reaches a terminal state"""
+    from models import Transcript
+
+    latencies: Dict[str, float] = {}
+    lock = threading.Lock()
+
+    def one(index: int) -> None:
+        fixture = fixtures[index % len(fixtures)]
+        title = f'bench_{index}'
+        client = app.test_client()
+        started = time.perf_counter()
+        with open(fixture, 'rb') as f:
+            response = client.post(
+                '/api/transcription/upload',
+                data={'file': (f, f'{title}{fixture.suffix}')},
+                content_type='multipart/form-data'
+            )
+        if response.status_code != 200:
+            print(f'  upload {title} rejected: {response.status_code} {response.get_data(as_text=True)[:200]}')
+            return
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            with app.app_context():
+                transcript = Transcript.get_by_title(title)
+                status = transcript.status if transcript else None
+            if status in TERMINAL_STATUSES:
+                with lock:
+                    latencies[title] = time.perf_counter() - started
+                return
+            time.sleep(0.1)
+        print(f'  {title} timed out in status {status!r}')
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(jobs)))
+    return latencies
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the transcription pipeline')
+    parser.add_argument('--mode', choices=['process', 'upload'], default='process')
+    parser.add_argument('--jobs', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--durations', default='30,300',
+                        help='Comma-separated fixture lengths in seconds, cycled across jobs')
+    parser.add_argument('--kind', choices=['wav', 'mp4'], default='wav')
+    parser.add_argument('--backend', choices=['mock', 'local'], default='mock',
+                        help='local: transcribe on this CPU with the model in LOCAL_WHISPER_MODEL_DIR, no network')
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--latency-per-minute', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=0.0)
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+    if args.backend == 'local' and args.mode != 'process':
+        parser.error('--backend local runs in process mode')
+
+    workdir = Path(tempfile.mkdtemp(prefix='bentobox-bench-'))
+    provider = MockProvider(MockProviderConfig(
+        latency=args.latency,
+        latency_per_minute=args.latency_per_minute,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+    )).start()
+    os.environ.update({
+        'GROQ_API_KEY': 'bench', 'OPENAI_API_KEY': 'bench',
+        'GROQ_BASE_URL': provider.groq_base_url, 'OPENAI_BASE_URL': provider.openai_base_url,
+    })
+
+    try:
+        from app import create_app, init_db
+        from models import Transcript
+        from services.metrics import DB_COMMITS
+
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{workdir / "bench.db"}',
+            'UPLOAD_FOLDER': str(workdir / 'uploads'),
+            'STORAGE_HEADROOM_BYTES': 0,
+            'STORAGE_SWEEP_INTERVAL': 0,
+        })
+        init_db(app)
+        if args.backend == 'local':
+            from services.local_whisper import local_whisper
+            if not local_whisper.available:
+                raise SystemExit('--backend local needs faster-whisper and a model in LOCAL_WHISPER_MODEL_DIR')
+
+        durations = [float(d) for d in args.durations.split(',') if d]
+        fixtures = build_fixtures(workdir / 'fixtures', durations, args.kind)
+        commits_before = DB_COMMITS.value()
+
+        started = time.perf_counter()
+        if args.mode == 'process':
+            latencies = run_process_mode(app, fixtures, args.jobs, args.concurrency, args.backend)
+        else:
+            latencies = run_upload_mode(app, fixtures, args.jobs, args.concurrency, args.timeout)
+        elapsed = time.perf_counter() - started
+
+        with app.app_context():
+            completed = Transcript.query.filter_by(status='completed').count()
+            failed = Transcript.query.filter_by(status='failed').count()
+
+        # Only jobs that reached a terminal state count towards throughput
+        audio_minutes = sum(
+            durations[int(title.rsplit('_', 1)[1]) % len(durations)] for title in latencies
+        ) / 60
+        values = list(latencies.values())
+        report = {
+            'mode': args.mode,
+            'backend': args.backend,
+            'jobs': args.jobs,
+            'concurrency': args.concurrency,
+            'completed': completed,
+            'failed': failed,
+            'wall_seconds': round(elapsed, 3),
+            'jobs_per_second': round(len(values) / elapsed, 3) if elapsed else 0,
+            'audio_minutes_per_minute': round(audio_minutes / (elapsed / 60), 2) if elapsed else 0,
+            'latency_p50': round(percentile(values, 50), 3),
+            'latency_p95': round(percentile(values, 95), 3),
+            'latency_mean': round(statistics.mean(values), 3) if values else 0,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'db_commits': int(DB_COMMITS.value() - commits_before),
+            'provider_requests': provider.stats.requests,
+            'provider_errors': provider.stats.errors,
+            'provider_rate_limited': provider.stats.rate_limited,
+        }
+    finally:
+        provider.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        width = max(len(key) for key in report)
+        for key, value in report.items():
+            print(f'{key:<{width}}  {value}')
+
+if __name__ == '__main__':
+    main()
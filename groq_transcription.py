@@ -4,10 +4,29 @@ import logging
 import aiohttp
 import aiofiles
 import asyncio
-from typing import Dict, Any, Optional, Callable
-from openai import AsyncOpenAI
-from pydub import AudioSegment
+import mimetypes
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from openai import AsyncOpenAI, RateLimitError as OpenAIRateLimitError
 import tempfile
+import time
+from contextlib import nullcontext
+from utils.segments import SegmentList
+from utils.words import WordList
+from services.metrics import PROVIDER_REQUEST_SECONDS, PROVIDER_FALLBACKS, PROVIDER_HEDGES, PROVIDER_SPILLOVERS
+from services.tracing import JobTrace
+from services.scheduler import ChunkScheduler
+from services.probe import MediaInfo, ProbeError, media_prober
+from services.audio_processor import (
+    CHUNK_COPY, CHUNK_SLICE, PROVIDER_MAX_BYTES, chunk_export_mode, copy_segment, decode_duration, slice_wav,
+    transcode_chunk
+)
+from services.audio_workers import audio_workers
+from services.progress import JobProgress, throughput_model
+from services.provider_health import PROVIDERS, RATE_LIMITED, provider_health
+from services.hedging import hedge_policy
+from services.local_whisper import LOCAL, local_whisper
 
 # Custom exceptions for better error handling
 class TranscriptionError(Exception):
@@ -18,26 +37,65 @@ class APIError(TranscriptionError):
     """Raised when API calls fail"""
     pass
 
+class RateLimitError(APIError):
+    """Raised when a provider rejects a request with 429"""
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _retry_after(headers) -> Optional[float]:
+    """Seconds from a Retry-After header, if it holds a number"""
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
 class AudioProcessingError(TranscriptionError):
     """Raised when audio processing fails"""
     pass
 
+PROVIDER_NAMES = {'groq': 'Groq', 'openai': 'OpenAI', LOCAL: 'local Whisper'}
+
 class GroqTranscriptionService:
     """Service for transcribing audio using Groq API with OpenAI fallback"""
     
-    def __init__(self, api_key: Optional[str] = None, openai_api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, openai_api_key: Optional[str] = None,
+                 temp_dir: Optional[str] = None, trace: Optional[JobTrace] = None,
+                 scheduler: Optional[ChunkScheduler] = None, priority: int = 0,
+                 submitted: Optional[float] = None, progress: Optional[JobProgress] = None,
+                 provider: Optional[str] = None, language: Optional[str] = None):
         self.api_key = api_key or os.getenv('GROQ_API_KEY')
         self.openai_api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
+        # Provider tried first and the spoken language, when a job overrides the defaults
+        self.provider = provider or 'groq'
+        self.language = language
         
-        if not self.api_key:
-            raise ValueError("Groq API key not found. Set GROQ_API_KEY environment variable.")
-        if not self.openai_api_key:
-            raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
+        if self.provider == LOCAL:
+            # Runs without API keys; falls back to Groq only when it is configured
+            self.fallback_provider = 'groq' if self.api_key else None
+        else:
+            if not self.api_key:
+                raise ValueError("Groq API key not found. Set GROQ_API_KEY environment variable.")
+            if not self.openai_api_key:
+                raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
+            self.fallback_provider = 'openai' if self.provider == 'groq' else 'groq'
         
-        self.base_url = "https://api.groq.com/openai/v1"
+        # Overridable so benchmarks can point both providers at a local mock server
+        self.base_url = os.getenv('GROQ_BASE_URL', "https://api.groq.com/openai/v1")
         self.session = None
-        self.openai_client = AsyncOpenAI(api_key=self.openai_api_key)
+        self.openai_client = (
+            AsyncOpenAI(api_key=self.openai_api_key, base_url=os.getenv('OPENAI_BASE_URL'))
+            if self.openai_api_key else None
+        )
         self.chunk_duration = 10 * 60 * 1000  # 10 minutes in milliseconds
+        self.temp_dir = temp_dir  # Where chunk exports go; defaults to the system temp dir
+        self.trace = trace or JobTrace('adhoc')
+        # Shared provider slots; chunks from all jobs are ordered by remaining cost, priority and age
+        self.scheduler = scheduler
+        self.priority = priority
+        self.submitted = submitted if submitted is not None else time.monotonic()
+        # Progress and ETA from measured stage rates rather than fixed milestones
+        self.progress = progress or JobProgress(throughput_model)
 
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -71,26 +129,35 @@ class GroqTranscriptionService:
             # Replace incorrect timeout syntax with proper wait_for implementation
             async def transcription_task():
                 if progress_callback:
-                    await progress_callback({
-                        'stage': 'preparing',
-                        'progress': 0,
-                        'text': 'Preparing audio...'
-                    })
+                    await progress_callback(self._update('preparing', 'Preparing audio...'))
 
-                # Load and validate audio file
-                try:
-                    audio = AudioSegment.from_file(audio_file_path)
-                except Exception as e:
-                    raise AudioProcessingError(f"Failed to load audio file: {str(e)}")
-
-                total_duration = len(audio)
+                # Read duration from the container header instead of decoding the whole file
+                with self.trace.span('probe'):
+                    try:
+                        media = await media_prober.probe(audio_file_path)
+                    except ProbeError as e:
+                        raise AudioProcessingError(str(e))
 
-                # Process small files directly
-                if total_duration <= self.chunk_duration:
-                    return await self._transcribe_single_file(audio_file_path, progress_callback)
+                # Without a probed duration (no ffprobe) the file has to be decoded to be measured
+                if media.duration is None:
+                    try:
+                        with self.trace.span('decode', bytes=media.size):
+                            duration = await audio_workers.run(decode_duration, audio_file_path)
+                    except Exception as e:
+                        raise AudioProcessingError(f"Failed to load audio file: {str(e)}")
+                    media = replace(media, duration=duration)
+
+                # Process small files directly, without decoding them at all
+                if media.duration_ms <= self.chunk_duration and media.size <= PROVIDER_MAX_BYTES:
+                    self.progress.plan('provider_request', media.duration, self.provider)
+                    async with self._provider_slot(media.duration):
+                        with self.progress.step('provider_request', observe=False):
+                            return await self._transcribe_single_file(
+                                audio_file_path, progress_callback, media.duration
+                            )
 
                 # Process large files in chunks
-                return await self._process_large_file(audio, audio_file_path, progress_callback)
+                return await self._process_large_file(audio_file_path, media, progress_callback)
 
             try:
                 return await asyncio.wait_for(transcription_task(), timeout=timeout)
@@ -102,85 +169,228 @@ class GroqTranscriptionService:
         except Exception as e:
             raise TranscriptionError(f"Transcription failed: {str(e)}")
 
+    def _plan_chunks(self, media: MediaInfo, mode: str) -> List[Tuple[int, int]]:
+        """Chunk boundaries in milliseconds, short enough to stay under the provider upload limit"""
+        total_duration = media.duration_ms
+        chunk_duration = self.chunk_duration
+        if mode == CHUNK_COPY and media.size and total_duration:
+            # Stream-copied chunks keep the source bitrate
+            bytes_per_ms = media.size / total_duration
+            chunk_duration = max(60 * 1000, min(chunk_duration, int(PROVIDER_MAX_BYTES * 0.95 / bytes_per_ms)))
+        return [
+            (start, min(start + chunk_duration, total_duration))
+            for start in range(0, total_duration, chunk_duration)
+        ]
+
+    async def _export_chunk(self, source_path: str, mode: str, start_ms: int, end_ms: int, dest_path: str) -> None:
+        """Write one chunk by WAV slicing, ffmpeg stream copy or, if required, a transcode"""
+        if mode == CHUNK_COPY:
+            await copy_segment(source_path, dest_path, start_ms, end_ms)
+        else:
+            # Slicing and resampling run in the audio worker pool, off the event loop
+            task = slice_wav if mode == CHUNK_SLICE else transcode_chunk
+            await audio_workers.run(task, source_path, dest_path, start_ms, end_ms)
+
     async def _process_large_file(
         self, 
-        audio: AudioSegment,
         original_path: str,
+        media: MediaInfo,
         progress_callback: Optional[Callable]
     ) -> Dict[Any, Any]:
         """Process large audio files by chunking"""
-        chunks = []
-        full_transcript = {'text': '', 'segments': []}
-        total_duration = len(audio)
-        chunk_count = (total_duration + self.chunk_duration - 1) // self.chunk_duration
+        texts = []
+        segments = SegmentList()
+        words = WordList()
+        language = None
+        total_duration = media.duration_ms
+        mode = chunk_export_mode(media, original_path)
+        chunks = self._plan_chunks(media, mode)
+        chunk_count = len(chunks)
+        suffix = Path(original_path).suffix if mode == CHUNK_COPY else '.wav'
         start_time = 0
+        for chunk_start, chunk_end in chunks:
+            self.progress.plan('chunk_export', (chunk_end - chunk_start) / 1000, mode)
+            self.progress.plan('provider_request', (chunk_end - chunk_start) / 1000, self.provider)
+
+        async def export(index: int) -> str:
+            chunk_start, chunk_end = chunks[index]
+            with tempfile.NamedTemporaryFile(suffix=suffix, dir=self.temp_dir, delete=False) as temp_file:
+                pass
+            try:
+                with self.trace.span('chunk_export', chunk=index, mode=mode) as span, \
+                        self.progress.step('chunk_export'):
+                    await self._export_chunk(original_path, mode, chunk_start, chunk_end, temp_file.name)
+                    span.set(bytes=os.path.getsize(temp_file.name))
+            except BaseException:
+                self._remove_temp(temp_file.name)
+                raise
+            return temp_file.name
+
+        # Export the next chunk in the worker pool while the current one is being transcribed
+        pending = asyncio.ensure_future(export(0))
+        try:
+            for i, (chunk_start, chunk_end) in enumerate(chunks):
+                if progress_callback:
+                    await progress_callback(self._update('chunking', f'Processing chunk {i+1} of {chunk_count}...'))
 
-        for i, chunk_start in enumerate(range(0, total_duration, self.chunk_duration)):
-            if progress_callback:
-                await progress_callback({
-                    'stage': 'chunking',
-                    'progress': (i / chunk_count) * 20,
-                    'text': f'Processing chunk {i+1} of {chunk_count}...'
-                })
-
-            # Extract and process chunk
-            chunk_end = min(chunk_start + self.chunk_duration, total_duration)
-            audio_chunk = audio[chunk_start:chunk_end]
-
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
+                chunk_path = await pending
+                pending = asyncio.ensure_future(export(i + 1)) if i + 1 < chunk_count else None
                 try:
-                    audio_chunk.export(temp_file.name, format='wav')
-                    chunks.append(temp_file.name)
-
-                    # Transcribe chunk
-                    chunk_result = await self._transcribe_single_file(
-                        temp_file.name,
-                        lambda p: self._adjust_progress(p, i, chunk_count, progress_callback)
-                    )
-
-                    # Combine results
-                    chunk_result['text'] = chunk_result['text'].strip() + ' '
-                    for segment in chunk_result['segments']:
-                        segment['start'] += start_time
-                        segment['end'] += start_time
-                    
-                    full_transcript['text'] += chunk_result['text']
-                    full_transcript['segments'].extend(chunk_result['segments'])
-
+                    # Transcribe chunk, yielding the provider slot to cheaper jobs between chunks
+                    async with self._provider_slot((total_duration - chunk_start) / 1000):
+                        with self.progress.step('provider_request', observe=False):
+                            chunk_result = await self._transcribe_single_file(
+                                chunk_path, progress_callback, (chunk_end - chunk_start) / 1000
+                            )
+
+                    # Combine results, shifting chunk-relative times in bulk
+                    texts.append(chunk_result['text'].strip())
+                    segments.extend(chunk_result['segments'], offset=start_time)
+                    words.extend(chunk_result['words'], offset=start_time)
+                    language = language or chunk_result.get('language')
                 finally:
-                    try:
-                        os.unlink(temp_file.name)
-                    except Exception as e:
-                        logging.warning(f"Failed to delete temp file {temp_file.name}: {e}")
+                    self._remove_temp(chunk_path)
 
-            start_time += (chunk_end - chunk_start) / 1000
+                start_time += (chunk_end - chunk_start) / 1000
+        finally:
+            # On failure, drop a prefetched chunk whether or not its export finished
+            if pending is not None:
+                pending.cancel()
+                try:
+                    self._remove_temp(await pending)
+                except BaseException:
+                    pass
+
+        full_transcript = {
+            'text': ' '.join(texts),
+            'segments': segments,
+            'words': words,
+            'language': language or 'en',
+            'duration': start_time
+        }
 
         if progress_callback:
-            await progress_callback({
-                'stage': 'completed',
-                'progress': 100,
-                'text': full_transcript['text']
-            })
+            await progress_callback({**self._update('completed', full_transcript['text']), 'progress': 100})
 
         return full_transcript
 
+    @staticmethod
+    def _remove_temp(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Failed to delete temp file {path}: {e}")
+
+    def _provider_slot(self, remaining_seconds: float):
+        """Slot for one provider request, or a no-op without a scheduler"""
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(remaining_seconds, self.priority, self.submitted)
+
+    def _update(self, stage: str, text: str) -> Dict[str, Any]:
+        """Progress callback payload with the current progress, ETA and throughput"""
+        return {'stage': stage, 'text': text, **self.progress.snapshot()}
+
     async def _transcribe_single_file(
         self, 
         audio_file_path: str, 
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        media_seconds: Optional[float] = None
     ) -> Dict[Any, Any]:
-        """Transcribe a single audio file with fallback"""
+        """Transcribe a single audio file with fallback, hedging a slow request when enabled"""
+        primary, fallback = self._route()
+        hedge_policy.track_request()
+        request = asyncio.ensure_future(
+            self._provider_request(primary, audio_file_path, progress_callback, media_seconds)
+        )
         try:
-            return await self._transcribe_with_groq(audio_file_path, progress_callback)
-        except Exception as groq_error:
-            logging.warning(f"Groq transcription failed: {str(groq_error)}. Falling back to OpenAI.")
-            if progress_callback:
-                await progress_callback({
-                    'stage': 'fallback',
-                    'progress': 30,
-                    'text': 'Groq transcription failed, trying OpenAI...'
-                })
-            return await self._transcribe_with_openai(audio_file_path, progress_callback)
+            delay = hedge_policy.delay(primary, media_seconds) if fallback else None
+            if delay is not None:
+                done, _ = await asyncio.wait({request}, timeout=delay)
+                if not done and hedge_policy.acquire():
+                    return await self._hedge(request, fallback, audio_file_path, progress_callback, media_seconds)
+            try:
+                return await request
+            except Exception as primary_error:
+                if fallback is None:
+                    raise
+                logging.warning(f"{PROVIDER_NAMES[primary]} transcription failed: {str(primary_error)}. "
+                                f"Falling back to {PROVIDER_NAMES[fallback]}.")
+                PROVIDER_FALLBACKS.inc(from_provider=primary, to_provider=fallback)
+                if progress_callback:
+                    await progress_callback(self._update(
+                        'fallback',
+                        f'{PROVIDER_NAMES[primary]} transcription failed, trying {PROVIDER_NAMES[fallback]}...'
+                    ))
+                return await self._provider_request(fallback, audio_file_path, progress_callback, media_seconds)
+        finally:
+            request.cancel()
+
+    def _route(self) -> Tuple[str, Optional[str]]:
+        """Primary and fallback provider for a chunk, spilling to local Whisper while both remote ones are down"""
+        primary, fallback = self.provider, self.fallback_provider
+        remote = [provider for provider in (primary, fallback) if provider in PROVIDERS]
+        if remote and primary != LOCAL and local_whisper.can_spill and \
+                not any(provider_health.healthy(provider) for provider in remote):
+            PROVIDER_SPILLOVERS.inc(from_provider=primary)
+            return LOCAL, primary
+        return primary, fallback
+
+    async def _hedge(self, slow_request: asyncio.Future, fallback: str, audio_file_path: str,
+                     progress_callback: Optional[Callable], media_seconds: Optional[float]) -> Dict[Any, Any]:
+        """Race a slow request against a backup to the fallback provider; the first success wins"""
+        backup = asyncio.ensure_future(
+            self._provider_request(fallback, audio_file_path, progress_callback, media_seconds)
+        )
+        pending = {slow_request, backup}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        PROVIDER_HEDGES.inc(provider=fallback, outcome='won' if task is backup else 'lost')
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Cancel the loser so its provider slot and upload are not wasted
+            for task in pending:
+                task.cancel()
+
+    def _provider_request(self, provider: str, audio_file_path: str, progress_callback: Optional[Callable],
+                          media_seconds: Optional[float]):
+        requests = {'groq': self._transcribe_with_groq, 'openai': self._transcribe_with_openai,
+                    LOCAL: self._transcribe_locally}
+        return self._timed_request(
+            provider, requests[provider], audio_file_path, progress_callback, media_seconds=media_seconds
+        )
+
+    async def _timed_request(self, provider: str, request, *args,
+                             media_seconds: Optional[float] = None) -> Dict[Any, Any]:
+        """Run a provider request and record its latency, outcome and, on success, its speed"""
+        start = time.perf_counter()
+        outcome = 'error'
+        retry_after = None
+        with self.trace.span('provider_request', provider=provider, bytes=os.path.getsize(args[0])) as span:
+            try:
+                result = await request(*args)
+                outcome = 'success'
+                self.progress.model.observe('provider_request', media_seconds, time.perf_counter() - start, provider)
+                hedge_policy.observe(provider, media_seconds, time.perf_counter() - start)
+                return result
+            except RateLimitError as e:
+                outcome, retry_after = RATE_LIMITED, e.retry_after
+                raise
+            except asyncio.CancelledError:
+                outcome = 'cancelled'
+                raise
+            finally:
+                span.set(outcome=outcome)
+                PROVIDER_REQUEST_SECONDS.observe(time.perf_counter() - start, provider=provider, outcome=outcome)
+                provider_health.record(provider, outcome, retry_after)
 
     async def _transcribe_with_groq(
         self, 
@@ -191,34 +401,33 @@ class GroqTranscriptionService:
         data = aiohttp.FormData()
         data.add_field('model', 'whisper-large-v3')
         data.add_field('response_format', 'verbose_json')
-        data.add_field('language', 'en')
+        data.add_field('timestamp_granularities[]', 'segment')
+        data.add_field('timestamp_granularities[]', 'word')
+        data.add_field('language', self.language or 'en')
 
         async with aiofiles.open(audio_file_path, 'rb') as f:
             file_data = await f.read()
-            data.add_field('file', file_data, filename='audio.wav', content_type='audio/wav')
+            # The provider detects the format from the file name, so keep the real extension
+            extension = Path(audio_file_path).suffix.lower() or '.wav'
+            data.add_field('file', file_data, filename=f'audio{extension}',
+                           content_type=mimetypes.guess_type(f'audio{extension}')[0] or 'application/octet-stream')
 
         if progress_callback:
-            await progress_callback({
-                'stage': 'uploading',
-                'progress': 30,
-                'text': 'Uploading to Groq...'
-            })
+            await progress_callback(self._update('uploading', 'Uploading to Groq...'))
 
         async with self.session.post(
             f"{self.base_url}/audio/transcriptions",
             headers={"Authorization": f"Bearer {self.api_key}"},
             data=data
         ) as response:
+            if response.status == 429:
+                raise RateLimitError(f"Groq API rate limit: {await response.text()}", _retry_after(response.headers))
             if response.status != 200:
                 error_text = await response.text()
                 raise APIError(f"Groq API error: {error_text}")
 
             if progress_callback:
-                await progress_callback({
-                    'stage': 'processing',
-                    'progress': 60,
-                    'text': 'Processing transcription...'
-                })
+                await progress_callback(self._update('processing', 'Processing transcription...'))
 
             result = await response.json()
             return self._format_transcription_result(result)
@@ -228,65 +437,54 @@ class GroqTranscriptionService:
         audio_file_path: str, 
         progress_callback: Optional[Callable] = None
     ) -> Dict[Any, Any]:
-        """Internal method to transcribe using OpenAI as fallback"""
+        """Internal method to transcribe using OpenAI"""
         try:
             if progress_callback:
-                await progress_callback({
-                    'stage': 'uploading',
-                    'progress': 40,
-                    'text': 'Uploading to OpenAI...'
-                })
+                await progress_callback(self._update('uploading', 'Uploading to OpenAI...'))
 
             with open(audio_file_path, 'rb') as audio_file:
                 transcript = await self.openai_client.audio.transcriptions.create(
                     file=audio_file,
                     model="whisper-1",
                     response_format="verbose_json",
-                    timestamp_granularities=["segment"]
+                    timestamp_granularities=["segment", "word"],
+                    **({'language': self.language} if self.language else {})
                 )
 
             if progress_callback:
-                await progress_callback({
-                    'stage': 'processing',
-                    'progress': 80,
-                    'text': 'Processing OpenAI transcription...'
-                })
+                await progress_callback(self._update('processing', 'Processing OpenAI transcription...'))
 
-            return self._format_transcription_result(transcript)
+            # The SDK returns a pydantic model; verbose fields (segments, words) are extras on it
+            return self._format_transcription_result(transcript.model_dump())
 
+        except OpenAIRateLimitError as e:
+            raise RateLimitError(f"OpenAI rate limit: {str(e)}", _retry_after(e.response.headers))
         except Exception as e:
             raise APIError(f"OpenAI transcription error: {str(e)}")
 
+    async def _transcribe_locally(
+        self,
+        audio_file_path: str,
+        progress_callback: Optional[Callable] = None
+    ) -> Dict[Any, Any]:
+        """Internal method to transcribe with the local Whisper worker pool"""
+        if progress_callback:
+            await progress_callback(self._update('processing', 'Transcribing locally...'))
+        try:
+            result = await local_whisper.transcribe(audio_file_path, self.language)
+        except Exception as e:
+            raise TranscriptionError(f"Local transcription error: {str(e)}")
+        return self._format_transcription_result(result)
+
     def _format_transcription_result(self, result: Dict[Any, Any]) -> Dict[Any, Any]:
         """Format API response into standard structure"""
+        segments = SegmentList()
+        for segment in result.get('segments') or ():
+            segments.append(segment['start'], segment['end'], segment['text'].strip())
         return {
             'text': result['text'],
-            'segments': [{
-                'start': segment['start'],
-                'end': segment['end'],
-                'text': segment['text'].strip()
-            } for segment in result['segments']],
+            'segments': segments,
+            'words': WordList.from_dicts(result.get('words')),
             'language': result.get('language', 'en'),
             'duration': result.get('duration', 0)
         }
-
-    def _adjust_progress(
-        self, 
-        chunk_progress: Dict[str, Any],
-        chunk_index: int,
-        total_chunks: int,
-        progress_callback: Optional[Callable]
-    ) -> None:
-        """Adjust chunk progress to overall progress"""
-        if not progress_callback or not chunk_progress:
-            return
-
-        chunk_base = 20 + (chunk_index * 80 / total_chunks)
-        chunk_portion = 80 / total_chunks
-        adjusted_progress = chunk_base + (chunk_progress['progress'] * chunk_portion / 100)
-
-        return progress_callback({
-            'stage': chunk_progress['stage'],
-            'progress': min(adjusted_progress, 100),
-            'text': chunk_progress.get('text', '')
-        })
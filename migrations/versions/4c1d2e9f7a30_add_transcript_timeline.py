@@ -0,0 +1,26 @@
+"""add transcript timeline
+
+Revision ID: 4c1d2e9f7a30
+Revises: 81e3567a1b61
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1d2e9f7a30'
+down_revision = '81e3567a1b61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('timeline', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.drop_column('timeline')
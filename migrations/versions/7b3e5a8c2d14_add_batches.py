@@ -0,0 +1,44 @@
+"""add batches
+
+Revision ID: 7b3e5a8c2d14
+Revises: 4c1d2e9f7a30
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3e5a8c2d14'
+down_revision = '4c1d2e9f7a30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('batches',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('batches', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_batches_created_at'), ['created_at'], unique=False)
+
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('batch_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_transcripts_batch_id'), ['batch_id'], unique=False)
+        batch_op.create_foreign_key('fk_transcripts_batch_id_batches', 'batches', ['batch_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_transcripts_batch_id_batches', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_transcripts_batch_id'))
+        batch_op.drop_column('batch_id')
+
+    with op.batch_alter_table('batches', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_batches_created_at'))
+
+    op.drop_table('batches')
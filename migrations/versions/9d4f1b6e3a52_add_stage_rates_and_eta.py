@@ -0,0 +1,41 @@
+"""add stage rates and transcript eta
+
+Revision ID: 9d4f1b6e3a52
+Revises: 7b3e5a8c2d14
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4f1b6e3a52'
+down_revision = '7b3e5a8c2d14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stage_rates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('stage', sa.String(length=50), nullable=False),
+    sa.Column('provider', sa.String(length=50), nullable=False),
+    sa.Column('rate', sa.Float(), nullable=False),
+    sa.Column('samples', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('stage', 'provider', name='uq_stage_rates_stage_provider')
+    )
+
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('eta_seconds', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('throughput', sa.Float(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.drop_column('throughput')
+        batch_op.drop_column('eta_seconds')
+
+    op.drop_table('stage_rates')
@@ -0,0 +1,37 @@
+"""add the worker registry
+
+Revision ID: a8d2f4c6e071
+Revises: f3b9d6a2c815
+Create Date: 2026-10-19 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d2f4c6e071'
+down_revision = 'f3b9d6a2c815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('workers',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('slots', sa.Integer(), nullable=False),
+    sa.Column('providers', sa.Text(), nullable=True),
+    sa.Column('can_spill', sa.Boolean(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('workers', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_workers_heartbeat_at'), ['heartbeat_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('workers', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_workers_heartbeat_at'))
+
+    op.drop_table('workers')
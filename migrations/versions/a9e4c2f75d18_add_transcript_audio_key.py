@@ -0,0 +1,28 @@
+"""add stored audio key and job options to transcripts
+
+Revision ID: a9e4c2f75d18
+Revises: f3b8d61a7c40
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9e4c2f75d18'
+down_revision = 'f3b8d61a7c40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('job_options', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('audio_key', sa.String(length=80), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.drop_column('audio_key')
+        batch_op.drop_column('job_options')
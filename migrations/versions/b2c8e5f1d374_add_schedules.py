@@ -0,0 +1,53 @@
+"""add schedules for held batch work
+
+Revision ID: b2c8e5f1d374
+Revises: d6f1a3b8e920
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2c8e5f1d374'
+down_revision = 'd6f1a3b8e920'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('schedules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('mode', sa.String(length=20), nullable=False),
+    sa.Column('window_start', sa.String(length=5), nullable=True),
+    sa.Column('window_end', sa.String(length=5), nullable=True),
+    sa.Column('not_before', sa.DateTime(), nullable=True),
+    sa.Column('max_concurrent', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('schedules', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_schedules_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_schedules_status'), ['status'], unique=False)
+
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('schedule_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_transcripts_schedule_id'), ['schedule_id'], unique=False)
+        batch_op.create_foreign_key('fk_transcripts_schedule_id_schedules', 'schedules', ['schedule_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_transcripts_schedule_id_schedules', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_transcripts_schedule_id'))
+        batch_op.drop_column('schedule_id')
+
+    with op.batch_alter_table('schedules', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_schedules_status'))
+        batch_op.drop_index(batch_op.f('ix_schedules_created_at'))
+
+    op.drop_table('schedules')
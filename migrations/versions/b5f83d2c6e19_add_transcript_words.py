@@ -0,0 +1,26 @@
+"""add transcript word timings
+
+Revision ID: b5f83d2c6e19
+Revises: e2a7c9f4b815
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5f83d2c6e19'
+down_revision = 'e2a7c9f4b815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('words', sa.LargeBinary(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.drop_column('words')
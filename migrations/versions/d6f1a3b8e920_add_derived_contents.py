@@ -0,0 +1,59 @@
+"""add derived contents and the prompt output cache
+
+Revision ID: d6f1a3b8e920
+Revises: a9e4c2f75d18
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6f1a3b8e920'
+down_revision = 'a9e4c2f75d18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('derived_contents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('transcript_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('prompt_hash', sa.String(length=64), nullable=True),
+    sa.Column('source_hash', sa.String(length=64), nullable=True),
+    sa.Column('windows', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['transcript_id'], ['transcripts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('transcript_id', 'kind', name='uq_derived_contents_transcript_kind')
+    )
+    with op.batch_alter_table('derived_contents', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_derived_contents_transcript_id'), ['transcript_id'], unique=False)
+
+    op.create_table('prompt_outputs',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('output', sa.Text(), nullable=False),
+    sa.Column('input_tokens', sa.Integer(), nullable=True),
+    sa.Column('output_tokens', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('prompt_outputs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_prompt_outputs_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('prompt_outputs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_prompt_outputs_created_at'))
+
+    op.drop_table('prompt_outputs')
+    with op.batch_alter_table('derived_contents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_derived_contents_transcript_id'))
+
+    op.drop_table('derived_contents')
@@ -0,0 +1,40 @@
+"""add job queue and lease columns
+
+Revision ID: e2a7c9f4b815
+Revises: 9d4f1b6e3a52
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a7c9f4b815'
+down_revision = '9d4f1b6e3a52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('source_key', sa.String(length=512), nullable=True))
+        batch_op.add_column(sa.Column('priority', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('estimated_seconds', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('schedule_key', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('lease_owner', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_transcripts_schedule_key'), ['schedule_key'], unique=False)
+        batch_op.create_index(batch_op.f('ix_transcripts_lease_owner'), ['lease_owner'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_transcripts_lease_owner'))
+        batch_op.drop_index(batch_op.f('ix_transcripts_schedule_key'))
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('lease_owner')
+        batch_op.drop_column('schedule_key')
+        batch_op.drop_column('estimated_seconds')
+        batch_op.drop_column('priority')
+        batch_op.drop_column('source_key')
@@ -0,0 +1,45 @@
+"""add compressed cold storage for transcripts
+
+Revision ID: f3b8d61a7c40
+Revises: c7a41e9d2b63
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8d61a7c40'
+down_revision = 'c7a41e9d2b63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('compression_dictionaries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('codec', sa.String(length=10), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('compression_dictionaries', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_compression_dictionaries_created_at'), ['created_at'], unique=False)
+
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('archive', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('archived_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    # Run `flask cold-storage restore` first or archived transcripts lose their content
+    with op.batch_alter_table('transcripts', schema=None) as batch_op:
+        batch_op.drop_column('archived_at')
+        batch_op.drop_column('archive')
+
+    with op.batch_alter_table('compression_dictionaries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_compression_dictionaries_created_at'))
+
+    op.drop_table('compression_dictionaries')
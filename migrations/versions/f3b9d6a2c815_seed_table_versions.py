@@ -0,0 +1,29 @@
+"""seed the transcripts change counter
+
+Revision ID: f3b9d6a2c815
+Revises: b2c8e5f1d374
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b9d6a2c815'
+down_revision = 'b2c8e5f1d374'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # bump_version only UPDATEs, so the row must exist before the first write
+    op.execute(sa.text(
+        "INSERT INTO table_versions (name, version) SELECT 'transcripts', 0 "
+        "WHERE NOT EXISTS (SELECT 1 FROM table_versions WHERE name = 'transcripts')"
+    ))
+
+
+def downgrade():
+    # The row was created lazily before this revision, so leaving it is harmless
+    pass
@@ -1,9 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from sqlalchemy.types import TypeDecorator, TEXT
+from typing import List, Optional, Dict, Any, Tuple, Union
+from sqlalchemy.types import TypeDecorator, TEXT, LargeBinary
 import json
 from sqlalchemy.ext.hybrid import hybrid_property
+from utils.segments import SegmentList
+from utils.words import WordList
+from utils.compression import decompress, unpack_transcript
+from services.metrics import STAGE_SECONDS
 
 db = SQLAlchemy()
 
@@ -21,6 +25,133 @@ class JSONType(TypeDecorator):
             return None
         return json.loads(value)
 
+class SegmentListType(TypeDecorator):
+    """Stores segments as a JSON list and loads them as a compact SegmentList."""
+    impl = TEXT
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        with STAGE_SECONDS.time(stage='serialize_segments'):
+            return SegmentList.coerce(value).to_json()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return SegmentList.from_json(value)
+
+class WordListType(TypeDecorator):
+    """Stores word timings as a compressed delta-encoded blob and loads them as a WordList."""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return WordList.coerce(value).to_bytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return WordList.from_bytes(value)
+
+class Batch(db.Model):
+    """Model grouping transcripts imported together"""
+    __tablename__ = 'batches'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    transcripts = db.relationship('Transcript', backref='batch', lazy='dynamic')
+
+    def progress_summary(self) -> Dict[str, Any]:
+        """Aggregate status counts and overall progress of the batch"""
+        rows = db.session.query(
+            Transcript.status, db.func.count(Transcript.id), db.func.sum(Transcript.progress)
+        ).filter(Transcript.batch_id == self.id).group_by(Transcript.status).all()
+
+        counts = {}
+        total = 0
+        progress_sum = 0.0
+        for status, count, progress in rows:
+            counts[status] = count
+            total += count
+            # Finished jobs count as fully done whatever their last progress value was
+            progress_sum += count * 100 if status in ('completed', 'failed') else (progress or 0)
+
+        completed = counts.get('completed', 0)
+        failed = counts.get('failed', 0)
+        return {
+            'total': total,
+            'completed': completed,
+            'failed': failed,
+            'queued': counts.get('queued', 0),
+            'processing': total - completed - failed - counts.get('queued', 0),
+            'progress': round(progress_sum / total, 1) if total else 0,
+            'status_counts': counts,
+            'is_finished': total > 0 and completed + failed == total,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert batch to dictionary"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            **self.progress_summary()
+        }
+
+    def __repr__(self) -> str:
+        return f'<Batch {self.id}>'
+
+class Schedule(db.Model):
+    """When held transcripts may be released to the job queue: a daily time window, or whenever idle"""
+    __tablename__ = 'schedules'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=True)
+    mode = db.Column(db.String(20), nullable=False)  # 'window' or 'idle'
+    window_start = db.Column(db.String(5), nullable=True)  # HH:MM in SCHEDULE_TIMEZONE
+    window_end = db.Column(db.String(5), nullable=True)  # Before window_start for windows spanning midnight
+    not_before = db.Column(db.DateTime, nullable=True)  # UTC
+    max_concurrent = db.Column(db.Integer, nullable=False, default=2)  # Jobs from this schedule running at once
+    status = db.Column(db.String(20), nullable=False, default='active', index=True)  # active, paused or completed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    transcripts = db.relationship('Transcript', backref='schedule', lazy='dynamic')
+
+    def status_counts(self) -> Dict[str, int]:
+        """Transcripts of the schedule by coarse status"""
+        counts = {'scheduled': 0, 'queued': 0, 'processing': 0, 'completed': 0, 'failed': 0}
+        rows = self.transcripts.with_entities(Transcript.status, db.func.count(Transcript.id)).group_by(
+            Transcript.status
+        ).all()
+        for status, count in rows:
+            key = 'processing' if status.startswith('processing') else status
+            counts[key] = counts.get(key, 0) + count
+        return counts
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert schedule to dictionary"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'mode': self.mode,
+            'window_start': self.window_start,
+            'window_end': self.window_end,
+            'not_before': self.not_before.isoformat() if self.not_before else None,
+            'max_concurrent': self.max_concurrent,
+            'status': self.status,
+            'counts': self.status_counts(),
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self) -> str:
+        return f'<Schedule {self.id} {self.mode}>'
+
 class Transcript(db.Model):
     """Model for storing transcription data"""
     __tablename__ = 'transcripts'
@@ -28,7 +159,7 @@ class Transcript(db.Model):
     # Primary fields
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), unique=True, nullable=False, index=True)
-    content = db.Column(db.Text, nullable=True)
+    _content = db.Column('content', db.Text, nullable=True)
     
     # Status and progress
     status = db.Column(db.String(50), nullable=False, index=True)
@@ -39,12 +170,89 @@ class Transcript(db.Model):
     word_count = db.Column(db.Integer, default=0)
     duration = db.Column(db.Float, default=0)
     language = db.Column(db.String(10), default='en')
-    segments = db.Column(JSONType, default=list)
+    _segments = db.Column('segments', SegmentListType, default=SegmentList)
+    # Word-level timings (see utils.words); deferred so listing transcripts never decodes them
+    words = db.deferred(db.Column(WordListType, nullable=True))
+    timeline = db.Column(JSONType, nullable=True)  # Per-job stage spans, see services.tracing
+    eta_seconds = db.Column(db.Float, nullable=True)  # Estimated time left while processing
+    throughput = db.Column(db.Float, nullable=True)  # Media seconds transcribed per wall second
+    batch_id = db.Column(db.Integer, db.ForeignKey('batches.id'), nullable=True, index=True)
+    
+    # Job queue state, shared by every web and worker node (see services.leases)
+    source_key = db.Column(db.String(512), nullable=True)  # Upload location in shared storage
+    priority = db.Column(db.Integer, default=0)
+    estimated_seconds = db.Column(db.Float, nullable=True)  # Probed media duration
+    schedule_key = db.Column(db.Float, nullable=True, index=True)
+    lease_owner = db.Column(db.String(255), nullable=True, index=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    schedule_id = db.Column(db.Integer, db.ForeignKey('schedules.id'), nullable=True, index=True)
+    job_options = db.Column(JSONType, nullable=True)  # Provider and language overrides for the next run
+    audio_key = db.Column(db.String(80), nullable=True)  # Normalized audio in the audio store, for re-runs
+    
+    # Cold tier: content and segments of old completed transcripts, compressed together (see services.cold_storage)
+    archive = db.Column(db.LargeBinary, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=True)
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    derived_contents = db.relationship('DerivedContent', backref='transcript', lazy='dynamic',
+                                       cascade='all, delete-orphan', passive_deletes=True)
+
+    @hybrid_property
+    def content(self) -> Optional[str]:
+        """Transcript text, decompressed on access if archived"""
+        if self.archive is not None:
+            return self._thawed()[0]
+        return self._content
+
+    @content.setter
+    def content(self, value: Optional[str]) -> None:
+        self.thaw()
+        self._content = value
+
+    @content.expression
+    def content(cls):
+        return cls._content
+
+    @hybrid_property
+    def segments(self) -> Optional[SegmentList]:
+        """Timed segments, decompressed on access if archived"""
+        if self.archive is not None:
+            return self._thawed()[1]
+        return self._segments
+
+    @segments.setter
+    def segments(self, value: Optional[SegmentList]) -> None:
+        self.thaw()
+        self._segments = value
+
+    @segments.expression
+    def segments(cls):
+        return cls._segments
+
+    @property
+    def is_archived(self) -> bool:
+        return self.archive is not None
+
+    def _thawed(self) -> Tuple[str, Optional[SegmentList]]:
+        """Decoded archive, cached on the instance until the blob changes"""
+        cached = getattr(self, '_archive_cache', None)
+        if cached is None or cached[0] is not self.archive:
+            content, segments_json = unpack_transcript(decompress(self.archive, CompressionDictionary.data_for))
+            segments = SegmentList.from_json(segments_json) if segments_json else None
+            cached = self._archive_cache = (self.archive, content, segments)
+        return cached[1], cached[2]
+
+    def thaw(self) -> None:
+        """Move an archived transcript back to plain columns, e.g. before changing it"""
+        if self.archive is None:
+            return
+        self._content, self._segments = self._thawed()
+        self.archive = None
+        self.archived_at = None
+
     @hybrid_property
     def is_processing(self) -> bool:
         """Check if transcript is currently processing"""
@@ -71,42 +279,72 @@ class Transcript(db.Model):
             'error': self.error,
             'word_count': self.word_count,
             'duration': self.duration,
+            'eta_seconds': self.eta_seconds,
+            'throughput': self.throughput,
             'language': self.language,
-            'segments': self.segments or [],
+            'segments': self.segments.to_list() if self.segments else [],
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'is_processing': self.is_processing,
             'is_completed': self.is_completed,
-            'is_failed': self.is_failed
+            'is_failed': self.is_failed,
+            'is_archived': self.is_archived
         }
 
     @classmethod
-    def create(cls, title: str, status: str = 'processing') -> 'Transcript':
-        """Create a new transcript"""
+    def create(cls, title: str, status: str = 'processing', **fields: Any) -> 'Transcript':
+        """Create a new transcript, optionally with job queue columns"""
         transcript = cls(
             title=title,
             status=status,
-            created_at=datetime.utcnow()
+            created_at=datetime.utcnow(),
+            **fields
         )
         db.session.add(transcript)
         db.session.commit()
         return transcript
 
-    def update_status(self, status: str, progress: Optional[float] = None, error: Optional[str] = None) -> None:
+    @classmethod
+    def create_many(cls, titles: List[str], status: str = 'queued', batch: Optional[Batch] = None,
+                    fields: Optional[List[Dict[str, Any]]] = None) -> List['Transcript']:
+        """Create several transcripts in a single transaction, with per-title job queue columns"""
+        now = datetime.utcnow()
+        fields = fields or [{} for _ in titles]
+        transcripts = [
+            cls(title=title, status=status, batch=batch, created_at=now, **extra)
+            for title, extra in zip(titles, fields)
+        ]
+        if batch is not None:
+            db.session.add(batch)
+        db.session.add_all(transcripts)
+        db.session.commit()
+        return transcripts
+
+    def update_status(self, status: str, progress: Optional[float] = None, error: Optional[str] = None,
+                      eta_seconds: Optional[float] = None, throughput: Optional[float] = None) -> None:
         """Update transcript status and progress"""
-        self.status = status
+        if status != self.status:
+            # Only real transitions invalidate cached transcript lists (see services.page_cache)
+            self.status = status
         if progress is not None:
             self.progress = min(100, max(0, progress))
         if error is not None:
             self.error = error
+        if eta_seconds is not None:
+            self.eta_seconds = max(0, eta_seconds)
+        if throughput is not None:
+            self.throughput = throughput
         self.updated_at = datetime.utcnow()
         db.session.commit()
 
-    def update_content(self, content: str, segments: Optional[List[Dict[str, Any]]] = None) -> None:
-        """Update transcript content and segments"""
+    def update_content(self, content: str, segments: Optional[Union[SegmentList, List[Dict[str, Any]]]] = None,
+                       words: Optional[Union[WordList, List[Dict[str, Any]]]] = None) -> None:
+        """Update transcript content, segments and word timings"""
         self.content = content
         if segments is not None:
-            self.segments = segments
+            self.segments = SegmentList.coerce(segments)
+        if words is not None:
+            self.words = WordList.coerce(words)
         self.word_count = len(content.split()) if content else 0
         self.updated_at = datetime.utcnow()
         db.session.commit()
@@ -128,3 +366,120 @@ class Transcript(db.Model):
 
     def __repr__(self) -> str:
         return f'<Transcript {self.title}>'
+
+class StageRate(db.Model):
+    """Rolling measured speed of a pipeline stage, persisted across restarts"""
+    __tablename__ = 'stage_rates'
+    __table_args__ = (db.UniqueConstraint('stage', 'provider', name='uq_stage_rates_stage_provider'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    stage = db.Column(db.String(50), nullable=False)
+    provider = db.Column(db.String(50), nullable=False, default='*')
+    rate = db.Column(db.Float, nullable=False)  # Wall seconds per second of media
+    samples = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f'<StageRate {self.stage}/{self.provider}>'
+
+class TableVersion(db.Model):
+    """Change counter for a table, bumped whenever rows shown in cached pages change"""
+    __tablename__ = 'table_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f'<TableVersion {self.name}={self.version}>'
+
+class Worker(db.Model):
+    """A node that runs jobs from the shared queue, as of its last heartbeat (see services.workers)"""
+    __tablename__ = 'workers'
+
+    id = db.Column(db.String(255), primary_key=True)  # The node's lease owner name
+    slots = db.Column(db.Integer, nullable=False)  # MAX_CONCURRENT_JOBS on that node
+    providers = db.Column(JSONType, nullable=True)  # Provider health as the node last saw it
+    can_spill = db.Column(db.Boolean, nullable=False, default=False)  # Has a local backend to spill to
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    heartbeat_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f'<Worker {self.id}>'
+
+_dictionary_data: Dict[int, bytes] = {}
+
+class CompressionDictionary(db.Model):
+    """Shared preset dictionary for cold-storage compression; rows are immutable once written"""
+    __tablename__ = 'compression_dictionaries'
+
+    id = db.Column(db.Integer, primary_key=True)
+    codec = db.Column(db.String(10), nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    sample_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    @classmethod
+    def data_for(cls, dictionary_id: int) -> bytes:
+        """Dictionary bytes by id, cached for the life of the process"""
+        data = _dictionary_data.get(dictionary_id)
+        if data is None:
+            row = db.session.get(cls, dictionary_id)
+            if row is None:
+                raise LookupError(f'Compression dictionary {dictionary_id} not found')
+            data = _dictionary_data[dictionary_id] = row.data
+        return data
+
+    @classmethod
+    def latest(cls, codec: str) -> Optional['CompressionDictionary']:
+        """Most recently trained dictionary for a codec"""
+        return cls.query.filter_by(codec=codec).order_by(cls.id.desc()).first()
+
+    def __repr__(self) -> str:
+        return f'<CompressionDictionary {self.id} {self.codec}>'
+
+class DerivedContent(db.Model):
+    """Post-processing output for a transcript, such as a summary, chapters or show notes"""
+    __tablename__ = 'derived_contents'
+    __table_args__ = (db.UniqueConstraint('transcript_id', 'kind', name='uq_derived_contents_transcript_kind'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    transcript_id = db.Column(db.Integer, db.ForeignKey('transcripts.id', ondelete='CASCADE'), nullable=False,
+                              index=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(50), nullable=False)
+    content = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    prompt_hash = db.Column(db.String(64), nullable=True)  # Model and prompts the content was made with
+    source_hash = db.Column(db.String(64), nullable=True)  # Transcript windows it was made from
+    windows = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert derived content to dictionary"""
+        return {
+            'id': self.id,
+            'transcript_id': self.transcript_id,
+            'kind': self.kind,
+            'status': self.status,
+            'content': self.content,
+            'error': self.error,
+            'windows': self.windows,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self) -> str:
+        return f'<DerivedContent {self.transcript_id}/{self.kind}>'
+
+class PromptOutput(db.Model):
+    """Cached model output for one prompt and input, shared by every transcript"""
+    __tablename__ = 'prompt_outputs'
+
+    key = db.Column(db.String(64), primary_key=True)  # SHA-256 of model, prompt and input
+    output = db.Column(db.Text, nullable=False)
+    input_tokens = db.Column(db.Integer, default=0)
+    output_tokens = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self) -> str:
+        return f'<PromptOutput {self.key[:12]}>'
@@ -1,8 +1,12 @@
 from flask import Flask
 from .main import main_bp
 from .transcription import transcription_bp
+from .metrics import metrics_bp
+from .schedules import schedules_bp
 
 def register_blueprints(app: Flask):
     """Register Flask blueprints"""
     app.register_blueprint(main_bp)
-    app.register_blueprint(transcription_bp, url_prefix='/api/transcription') 
\ No newline at end of file
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(transcription_bp, url_prefix='/api/transcription')
+    app.register_blueprint(schedules_bp, url_prefix='/api/schedules') 
\ No newline at end of file
@@ -1,7 +1,10 @@
 import logging
 from typing import Tuple
 from flask import jsonify, Response
-from werkzeug.exceptions import NotFound, BadRequest, RequestEntityTooLarge
+from werkzeug.exceptions import Conflict, NotFound, BadRequest, RequestEntityTooLarge
+from services.storage import InsufficientStorageError
+from services.admission import AdmissionError
+from services.postprocess import PostProcessError
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +19,28 @@ def register_error_handlers(app):
     def handle_bad_request(error) -> Tuple[Response, int]:
         return jsonify({'success': False, 'error': str(error)}), 400
 
+    @app.errorhandler(Conflict)
+    def handle_conflict(error) -> Tuple[Response, int]:
+        return jsonify({'success': False, 'error': error.description}), 409
+
     @app.errorhandler(RequestEntityTooLarge)
     def handle_file_too_large(error) -> Tuple[Response, int]:
         return jsonify({'success': False, 'error': 'File too large'}), 413
 
+    @app.errorhandler(InsufficientStorageError)
+    def handle_insufficient_storage(error) -> Tuple[Response, int]:
+        return jsonify({'success': False, 'error': str(error)}), 507
+
+    @app.errorhandler(AdmissionError)
+    def handle_overloaded(error) -> Tuple[Response, int]:
+        response = jsonify({'success': False, 'error': str(error), 'retry_after': error.retry_after})
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response, 503
+
+    @app.errorhandler(PostProcessError)
+    def handle_postprocess_failed(error) -> Tuple[Response, int]:
+        return jsonify({'success': False, 'error': str(error)}), 502
+
     @app.errorhandler(Exception)
     def handle_exception(error) -> Tuple[Response, int]:
         logger.error(f"Unhandled error: {str(error)}", exc_info=True)
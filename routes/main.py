@@ -1,26 +1,42 @@
 from flask import Blueprint, render_template
-from models import Transcript
+from sqlalchemy.orm import load_only
+from models import Schedule, Transcript
+from services.page_cache import page_cache
+from services.postprocess import TASKS, postprocessor
+from utils.common import TranscriptStatus
 
 main_bp = Blueprint('main', __name__)
 
+def _listed_transcripts():
+    """Transcripts for the list pages, loading only the columns they show"""
+    return Transcript.query.options(load_only(
+        Transcript.id, Transcript.title, Transcript.status, Transcript.word_count, Transcript.created_at
+    )).order_by(Transcript.created_at.desc()).all()
+
 @main_bp.route('/')
 def index():
     """Render index page"""
-    transcripts = Transcript.query.order_by(Transcript.created_at.desc()).all()
-    return render_template('index.html', transcripts=transcripts)
+    return page_cache.page('index', lambda: render_template('index.html', transcripts=_listed_transcripts()))
 
 @main_bp.route('/transcribe')
 def transcribe():
     """Render transcribe page"""
-    transcripts = Transcript.query.order_by(Transcript.created_at.desc()).all()
-    return render_template('transcribe.html', transcripts=transcripts, active_page='transcribe')
+    return page_cache.page('transcribe', lambda: render_template(
+        'transcribe.html', transcripts=_listed_transcripts(), active_page='transcribe'
+    ))
 
 @main_bp.route('/create')
 def create():
     """Render create page"""
-    return render_template('create.html', active_page='create')
+    transcripts = Transcript.query.options(load_only(Transcript.id, Transcript.title)).filter(
+        Transcript.status == TranscriptStatus.COMPLETED
+    ).order_by(Transcript.created_at.desc()).all()
+    return render_template('create.html', active_page='create', transcripts=transcripts, kinds=list(TASKS),
+                           enabled=postprocessor.enabled)
 
 @main_bp.route('/schedule')
 def schedule():
     """Render schedule page"""
-    return render_template('schedule.html', active_page='schedule') 
\ No newline at end of file
+    schedules = Schedule.query.order_by(Schedule.created_at.desc()).all()
+    return render_template('schedule.html', active_page='schedule',
+                           schedules=[schedule.to_dict() for schedule in schedules])
@@ -0,0 +1,91 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict
+from flask import Blueprint, jsonify, request
+from werkzeug.exceptions import BadRequest, Conflict
+from models import Schedule, Transcript, db
+from services.schedules import ACTIVE, IDLE, MODES, PAUSED, WINDOW, parse_clock
+from utils.common import TranscriptStatus, api_response
+
+logger = logging.getLogger(__name__)
+
+schedules_bp = Blueprint('schedules', __name__)
+
+def _schedule_fields(data: Dict[str, Any], schedule: Schedule = None) -> Dict[str, Any]:
+    """Validated schedule columns from a request body; on update only the keys present"""
+    fields = {}
+    if 'name' in data:
+        fields['name'] = (data['name'] or None) and str(data['name'])[:255]
+    mode = data.get('mode', schedule.mode if schedule else None)
+    if mode not in MODES:
+        raise BadRequest(f"mode must be one of: {', '.join(MODES)}")
+    fields['mode'] = mode
+    if mode == WINDOW:
+        try:
+            fields['window_start'] = parse_clock(data.get('window_start', schedule and schedule.window_start))
+            fields['window_end'] = parse_clock(data.get('window_end', schedule and schedule.window_end))
+        except ValueError as e:
+            raise BadRequest(f'{str(e)}; window schedules need window_start and window_end as HH:MM')
+    if 'not_before' in data:
+        try:
+            not_before = datetime.fromisoformat(data['not_before']) if data['not_before'] else None
+        except (TypeError, ValueError):
+            raise BadRequest('not_before must be an ISO 8601 timestamp')
+        if not_before is not None and not_before.tzinfo is not None:
+            # Stored as naive UTC; timestamps without an offset are taken as UTC
+            not_before = not_before.astimezone(timezone.utc).replace(tzinfo=None)
+        fields['not_before'] = not_before
+    if 'max_concurrent' in data or schedule is None:
+        try:
+            fields['max_concurrent'] = int(data.get('max_concurrent', 2))
+        except (TypeError, ValueError):
+            raise BadRequest('max_concurrent must be a number')
+        if fields['max_concurrent'] < 1:
+            raise BadRequest('max_concurrent must be at least 1')
+    if 'status' in data:
+        if data['status'] not in (ACTIVE, PAUSED):
+            raise BadRequest(f'status must be {ACTIVE} or {PAUSED}')
+        fields['status'] = data['status']
+    return fields
+
+@schedules_bp.route('', methods=['GET'])
+def list_schedules():
+    """List schedules, newest first, with their transcript counts"""
+    schedules = Schedule.query.order_by(Schedule.created_at.desc()).all()
+    return jsonify(api_response(True, {'schedules': [schedule.to_dict() for schedule in schedules]}))
+
+@schedules_bp.route('', methods=['POST'])
+def create_schedule():
+    """Create a schedule for batch imports to run against"""
+    schedule = Schedule(**_schedule_fields(request.get_json(silent=True) or {}))
+    db.session.add(schedule)
+    db.session.commit()
+    logger.info(f"Created {schedule.mode} schedule {schedule.id}")
+    return jsonify(api_response(True, schedule.to_dict())), 201
+
+@schedules_bp.route('/<int:schedule_id>', methods=['GET'])
+def get_schedule(schedule_id):
+    """Get a schedule with its transcript counts"""
+    return jsonify(api_response(True, db.get_or_404(Schedule, schedule_id).to_dict()))
+
+@schedules_bp.route('/<int:schedule_id>', methods=['PATCH'])
+def update_schedule(schedule_id):
+    """Change a schedule's window, mode or concurrency, or pause and resume it"""
+    schedule = db.get_or_404(Schedule, schedule_id)
+    for name, value in _schedule_fields(request.get_json(silent=True) or {}, schedule).items():
+        setattr(schedule, name, value)
+    if schedule.mode == IDLE:
+        schedule.window_start = schedule.window_end = None
+    db.session.commit()
+    return jsonify(api_response(True, schedule.to_dict()))
+
+@schedules_bp.route('/<int:schedule_id>', methods=['DELETE'])
+def delete_schedule(schedule_id):
+    """Delete a schedule that holds no transcripts"""
+    schedule = db.get_or_404(Schedule, schedule_id)
+    if schedule.transcripts.filter(Transcript.status == TranscriptStatus.SCHEDULED).count():
+        raise Conflict('The schedule still holds transcripts; pause it or let them run first')
+    schedule.transcripts.update({Transcript.schedule_id: None}, synchronize_session=False)
+    db.session.delete(schedule)
+    db.session.commit()
+    return jsonify(api_response(True, {'message': f'Schedule {schedule_id} deleted'}))
@@ -1,17 +1,37 @@
 import os
 from pathlib import Path
+from typing import Optional
 import logging
+import time
 import asyncio
-import shutil
-from datetime import timedelta
-from flask import Blueprint, request, jsonify, current_app
-from werkzeug.exceptions import BadRequest, NotFound
+import json
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from werkzeug.exceptions import BadRequest, Conflict, NotFound
 from werkzeug.utils import secure_filename
-from models import Transcript, db
+from models import Batch, DerivedContent, Schedule, Transcript, db
 from services.file_handler import FileHandler
-from services.audio_processor import extract_audio, AudioProcessingError
-from groq_transcription import GroqTranscriptionService, TranscriptionError
-from utils.common import TranscriptStatus, api_response, timedelta_to_srt_time
+from services.database import db_executor, transcript_store
+from services.storage import storage_manager
+from services.audio_store import audio_store
+from services.shared_storage import shared_storage
+from services.broker import event_broker, transcript_channel
+from services.metrics import JOB_SECONDS, JOBS_IN_FLIGHT
+from services.tracing import JobTrace, export_otlp, timeline_to_otlp
+from services.jobs import Job, job_runner, BATCH, DATABASE_QUEUE, INTERACTIVE, LOCAL_QUEUE
+from services.leases import lease_manager
+from services.scheduler import chunk_scheduler, clamp_priority
+from services.audio_processor import (
+    extract_audio, negotiate_format, AudioProcessingError, PASSTHROUGH, STREAM_COPY, TRANSCODE
+)
+from services.probe import ProbeError, media_prober
+from services.progress import JobProgress, throughput_model
+from services.provider_health import PROVIDERS
+from services.local_whisper import LOCAL, local_whisper
+from services.admission import admission_controller
+from services.postprocess import TASKS, postprocessor
+from services.schedules import ACTIVE, COMPLETED
+from services.responses import not_modified, with_validators
+from utils.common import TranscriptStatus, api_response
 
 logger = logging.getLogger(__name__)
 
@@ -19,85 +39,190 @@ transcription_bp = Blueprint('transcription', __name__)
 
 # Constants
 ALLOWED_EXTENSIONS = {'mp4', 'avi', 'mov', 'wmv', 'mp3', 'wav', 'm4a', 'aac', 'flac'}
+VIDEO_EXTENSIONS = {'mp4', 'avi', 'mov', 'wmv'}
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-async def process_file(file_path: Path, title: str) -> None:
+def _requested_priority(value) -> int:
+    """Clamped priority from a JSON body or form, rejecting values that are not numbers"""
+    try:
+        return clamp_priority(value)
+    except (TypeError, ValueError):
+        raise BadRequest('priority must be a whole number')
+
+def _pipeline_status(stage: str) -> str:
+    """Map a service progress stage onto a processing_* transcript status"""
+    return stage if stage.startswith(TranscriptStatus.PROCESSING.value) else f"{TranscriptStatus.PROCESSING.value}_{stage}"
+
+async def process_file(file_path: Path, title: str, trace: Optional[JobTrace] = None,
+                       transcript_id: Optional[int] = None, job: Optional[Job] = None) -> None:
     """Process uploaded file for transcription"""
-    audio_path = None
-    temp_chunks_dir = None
+    trace = trace or JobTrace(title)
+    outcome = 'failed'
+    started = time.perf_counter()
+    JOBS_IN_FLIGHT.inc()
+    progress = JobProgress(throughput_model)
+    options = job.options if job else {}
+    store_task = None
+    # A queued job runs under this node's lease; if it is requeued meanwhile, its writes are dropped
+    owner = lease_manager.owner if transcript_id is not None else None
+
+    async def report_progress(status):
+        # Progress, ETA and throughput come from the job's measured-rate model
+        snapshot = progress.snapshot()
+        await transcript_store.update_status(
+            transcript_id, _pipeline_status(status['stage']), snapshot['progress'],
+            eta_seconds=snapshot['eta_seconds'], throughput=snapshot['throughput'], owner=owner
+        )
     
     try:
-        # Initialize transcript
-        transcript = Transcript.create(
-            title=title,
-            status=TranscriptStatus.PROCESSING
-        )
-        
-        # Create temp directory
-        temp_dir = Path(current_app.config['UPLOAD_FOLDER']) / 'temp'
-        temp_dir.mkdir(exist_ok=True)
-        
-        # Extract audio if needed
-        file_ext = file_path.suffix.lower()
-        if file_ext not in ['.mp3', '.wav', '.m4a', '.aac', '.flac']:
-            audio_path = temp_dir / f"{title}_audio.wav"
-            await extract_audio(
-                str(file_path), 
-                str(audio_path),
-                lambda status: transcript.update_status(status['stage'], status['progress'])
+        # Initialize transcript, unless it was created when the job was queued
+        if transcript_id is None:
+            transcript_id = await transcript_store.create(
+                title=title,
+                status=TranscriptStatus.PROCESSING
             )
         else:
-            audio_path = file_path
+            await transcript_store.update_status(transcript_id, TranscriptStatus.PROCESSING, owner=owner)
+        
+        if not throughput_model.loaded:
+            await db_executor.run(throughput_model.load)
+        
+        # Negotiate the cheapest provider-ready form of the audio
+        media = await media_prober.probe(file_path)
+        plan = negotiate_format(file_path, media)
+        audio_path = file_path
+        if plan.mode != PASSTHROUGH:
+            audio_path = storage_manager.temp_path(title, 'audio' + plan.extension)
+            progress.plan('extract_audio', media.duration, plan.mode)
+            with trace.span('extract_audio', bytes=file_path.stat().st_size, mode=plan.mode) as span, \
+                    progress.step('extract_audio'):
+                try:
+                    await extract_audio(
+                        str(file_path),
+                        str(audio_path),
+                        report_progress,
+                        stream_copy=plan.mode == STREAM_COPY
+                    )
+                except AudioProcessingError as e:
+                    if plan.mode != STREAM_COPY:
+                        raise
+                    logger.warning(f"Stream copy failed for {title}, transcoding instead: {str(e)}")
+                    span.set(mode=TRANSCODE)
+                    audio_path = storage_manager.temp_path(title, 'audio.wav')
+                    await extract_audio(str(file_path), str(audio_path), report_progress)
+        
+        # Keep the normalized audio for re-runs, alongside the provider requests
+        if audio_store.enabled:
+            async def store_audio(path: Path) -> Optional[str]:
+                with trace.span('store_audio', bytes=path.stat().st_size):
+                    return await audio_store.put(path)
+            store_task = asyncio.ensure_future(store_audio(Path(audio_path)))
         
-        # Initialize transcription service
+        # Initialize transcription service; provider SDKs load with the first job, not at startup
+        from groq_transcription import GroqTranscriptionService
         async with GroqTranscriptionService(
             api_key=os.getenv('GROQ_API_KEY'),
-            openai_api_key=os.getenv('OPENAI_API_KEY')
+            openai_api_key=os.getenv('OPENAI_API_KEY'),
+            temp_dir=str(storage_manager.job_dir(title)),
+            trace=trace,
+            scheduler=chunk_scheduler,
+            priority=job.priority if job else 0,
+            submitted=job.submitted if job else None,
+            progress=progress,
+            provider=options.get('backend'),
+            language=options.get('language')
         ) as service:
             # Update status
-            transcript.update_status(TranscriptStatus.TRANSCRIBING)
+            await transcript_store.update_status(transcript_id, TranscriptStatus.TRANSCRIBING, owner=owner)
             
             # Transcribe audio
-            result = await service.transcribe_audio(
-                str(audio_path),
-                lambda status, progress: transcript.update_status(status, progress)
-            )
+            with trace.span('transcribe', bytes=Path(audio_path).stat().st_size):
+                result = await service.transcribe_audio(
+                    str(audio_path),
+                    report_progress
+                )
             
             # Save results
-            transcript.update_content(
-                content=result['text'],
-                segments=result.get('segments', [])
-            )
-            transcript.language = result.get('language', 'en')
-            transcript.duration = result.get('duration', 0)
-            transcript.status = TranscriptStatus.COMPLETED
-            db.session.commit()
+            with trace.span('save_results', segments=len(result.get('segments') or ())):
+                saved = await transcript_store.complete(
+                    transcript_id,
+                    content=result['text'],
+                    segments=result.get('segments'),
+                    words=result.get('words'),
+                    language=result.get('language', 'en'),
+                    duration=result.get('duration', 0),
+                    owner=owner
+                )
+            if saved:
+                outcome = 'completed'
+                postprocessor.schedule(transcript_id)
+            else:
+                logger.warning(f"Discarded the result of {title}: the job was deleted or requeued")
         
     except Exception as e:
         logger.error(f"Processing error: {str(e)}")
         try:
-            if transcript:
-                transcript.update_status(
+            if transcript_id:
+                await transcript_store.update_status(
+                    transcript_id,
                     TranscriptStatus.FAILED,
-                    error=str(e)
+                    error=str(e),
+                    owner=owner
                 )
         except Exception as db_error:
             logger.error(f"Database error: {str(db_error)}")
     
     finally:
-        # Cleanup
-        file_handler = FileHandler(current_app)
-        file_handler.cleanup_files(file_path)
-        if audio_path and audio_path != file_path:
-            file_handler.cleanup_files(audio_path)
-        if temp_chunks_dir:
-            shutil.rmtree(temp_chunks_dir, ignore_errors=True)
+        audio_key = None
+        if store_task is not None:
+            try:
+                audio_key = await store_task
+            except Exception as store_error:
+                logger.error(f"Error storing audio: {str(store_error)}")
+        # Remove the upload and every temp artifact of the job, releasing its reservation
+        try:
+            if owner is not None and await db_executor.run(lease_manager.superseded, transcript_id):
+                # The run that took over the job still needs the upload
+                storage_manager.hand_off(title)
+        except Exception as db_error:
+            logger.error(f"Error checking job lease: {str(db_error)}")
+        storage_manager.cleanup(title)
+        JOBS_IN_FLIGHT.dec()
+        JOB_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+        try:
+            await db_executor.write(throughput_model.flush)
+        except Exception as db_error:
+            logger.error(f"Error saving stage rates: {str(db_error)}")
+        if transcript_id:
+            timeline = trace.to_dict()
+            try:
+                await transcript_store.save_timeline(transcript_id, timeline, audio_key, owner=owner)
+            except Exception as db_error:
+                logger.error(f"Error saving timeline: {str(db_error)}")
+            await export_otlp(timeline)
+
+def _transcript_exists(transcript_id: int) -> bool:
+    return db.session.query(Transcript.id).filter(Transcript.id == transcript_id).scalar() is not None
+
+async def run_job(job: Job) -> None:
+    """JobRunner handler: process a queued job"""
+    if job.source_key and not shared_storage.is_reference(job.source_key):
+        # The node running a job owns its upload (in database mode it was queued by another node)
+        storage_manager.track(job.title, job.file_path)
+    if job.transcript_id is not None and not await db_executor.run(_transcript_exists, job.transcript_id):
+        # Deleted while it waited in a queue
+        logger.info(f"Skipping job {job.title}: its transcript was deleted")
+        storage_manager.cleanup(job.title)
+        return
+    await process_file(job.file_path, job.title, job.trace, job.transcript_id, job)
 
 @transcription_bp.route('/upload', methods=['POST'])
 async def upload_file():
     """Handle file upload and start transcription"""
+    # Turn uploads away before reading the body when the backlog is already too deep
+    await admission_controller.admit(probed=False)
     if 'file' not in request.files:
         raise BadRequest('No file provided')
     
@@ -107,69 +232,253 @@ async def upload_file():
     
     if not allowed_file(file.filename):
         raise BadRequest('File type not allowed')
+    priority = _requested_priority(request.form.get('priority'))
+    
+    file_handler = FileHandler(current_app)
+    filename = secure_filename(file.filename)
+    title = Path(filename).stem
+    
+    if await transcript_store.get_by_title(title):
+        raise BadRequest('A transcript with this name already exists')
+    
+    # Reserve disk space for the whole job before accepting it
+    upload_size = request.content_length or 0
+    is_video = file.filename.rsplit('.', 1)[1].lower() in VIDEO_EXTENSIONS
+    storage_manager.reserve(title, storage_manager.estimate_job_bytes(upload_size, is_video))
+    source_key = transcript_id = None
     
     try:
-        # Save file and create transcript
-        filename = secure_filename(file.filename)
-        title = Path(filename).stem
+        # Save file and start transcription
+        trace = JobTrace(title)
+        with trace.span('upload_save', bytes=upload_size):
+            file_path = storage_manager.track(title, file_handler.save_upload(file, filename))
         
-        if Transcript.get_by_title(title):
-            raise BadRequest('A transcript with this name already exists')
+        # Reject files that are not readable media and size the reservation from the real duration
+        with trace.span('probe'):
+            try:
+                media = await media_prober.probe(file_path)
+            except ProbeError as e:
+                raise BadRequest(f'Unsupported or corrupt media file: {str(e)}')
+        storage_manager.resize(title, storage_manager.estimate_job_bytes(upload_size, is_video, media))
+        admission = await admission_controller.admit(media.duration)
         
-        file_handler = FileHandler(current_app)
-        file_path = file_handler.save_upload(file, filename)
+        # Publish the upload where every node can read it
+        source_key = shared_storage.put(file_path)
+        file_path = storage_manager.track(title, shared_storage.local_path(source_key))
+        size = file_path.stat().st_size
+        if job_runner.queue_mode == DATABASE_QUEUE:
+            # Whichever node claims the job owns its files from here on
+            storage_manager.hand_off(title)
         
-        # Start processing in background
-        asyncio.create_task(process_file(file_path, title))
+        # Queue for processing, ordered by estimated cost and priority
+        transcript_id = await transcript_store.create(
+            title=title, status=TranscriptStatus.QUEUED, source_key=source_key,
+            **job_runner.queue_fields(priority, media.duration)
+        )
+        job_runner.submit(Job(
+            title=title, file_path=file_path, transcript_id=transcript_id, trace=trace,
+            priority=priority, estimated_seconds=media.duration, source_key=source_key
+        ))
         
-        return jsonify(api_response(True, {
+        data = {
+            'id': transcript_id,
             'title': title,
-            'size': file_path.stat().st_size,
+            'size': size,
             'type': file.content_type
-        })), 200
+        }
+        if admission.deferred:
+            # Accepted, but waiting for a free job slot
+            data.update(queue_position=admission.queue_position, eta_seconds=admission.eta_seconds)
+            return jsonify(api_response(True, data)), 202
+        return jsonify(api_response(True, data)), 200
         
     except Exception as e:
         logger.error(f"Upload error: {str(e)}")
-        if file_path:
-            file_handler.cleanup_files(file_path)
+        storage_manager.cleanup(title)
+        if source_key is not None and transcript_id is None:
+            shared_storage.delete(source_key)
+        raise
+
+def _batch_sources():
+    """Collect (title, path, tracked) sources for a batch from uploaded files or a server-side import"""
+    files = request.files.getlist('files')
+    if files:
+        file_handler = FileHandler(current_app)
+        sources = []
+        for file in files:
+            if not file or not file.filename or not allowed_file(file.filename):
+                raise BadRequest(f'File type not allowed: {file.filename}')
+            filename = secure_filename(file.filename)
+            sources.append((Path(filename).stem, file, filename))
+        return sources, file_handler
+
+    data = request.get_json(silent=True) or {}
+    root = current_app.config.get('BATCH_IMPORT_ROOT')
+    if not root:
+        raise BadRequest('Server-side batch import is not configured')
+    root = Path(root).resolve()
+
+    if 'directory' in data:
+        directory = (root / data['directory']).resolve()
+        if not directory.is_relative_to(root) or not directory.is_dir():
+            raise BadRequest('Invalid import directory')
+        paths = sorted(p for p in directory.iterdir() if p.is_file() and allowed_file(p.name))
+    elif 'manifest' in data:
+        paths = []
+        for entry in data['manifest']:
+            path = (root / entry).resolve()
+            if not path.is_relative_to(root) or not path.is_file() or not allowed_file(path.name):
+                raise BadRequest(f'Invalid manifest entry: {entry}')
+            paths.append(path)
+    else:
+        raise BadRequest('Provide files, a directory or a manifest')
+
+    return [(Path(secure_filename(p.name)).stem, p, None) for p in paths], None
+
+@transcription_bp.route('/batch', methods=['POST'])
+async def create_batch():
+    """Create many transcripts at once and queue them as low-priority batch work, or hold them for a schedule"""
+    sources, file_handler = _batch_sources()
+    if not sources:
+        raise BadRequest('No files to import')
+    data = request.get_json(silent=True) or {}
+    schedule_id = request.form.get('schedule_id', type=int) or data.get('schedule_id')
+    schedule = db.session.get(Schedule, schedule_id) if schedule_id else None
+    if schedule_id and schedule is None:
+        raise BadRequest(f'Unknown schedule: {schedule_id}')
+    priority = _requested_priority(request.form.get('priority') or data.get('priority'))
+
+    # Skip titles that already exist or repeat within the batch
+    # Titles compare case-insensitively, as in Transcript.get_by_title
+    titles = {title.lower() for title, _, _ in sources}
+    existing = {title.lower() for (title,) in db.session.query(Transcript.title).filter(
+        db.func.lower(Transcript.title).in_(titles)
+    )}
+    accepted, skipped, seen = [], [], set()
+    for title, source, filename in sources:
+        if title.lower() in existing or title.lower() in seen:
+            skipped.append({'title': title, 'reason': 'A transcript with this name already exists'})
+            continue
+        seen.add(title.lower())
+        accepted.append((title, source, filename))
+
+    # Save uploads (server-side files are read in place and never deleted)
+    jobs = []
+    try:
+        for title, source, filename in accepted:
+            if file_handler is None:
+                jobs.append((title, source))
+                continue
+            storage_manager.reserve(title, storage_manager.estimate_job_bytes(
+                source.content_length or 0, filename.rsplit('.', 1)[1].lower() in VIDEO_EXTENSIONS
+            ))
+            jobs.append((title, storage_manager.track(title, file_handler.save_upload(source, filename))))
+    except Exception:
+        for title, _ in jobs:
+            storage_manager.cleanup(title)
         raise
 
+    # Skip files that are not readable media
+    readable = []
+    try:
+        probes = await asyncio.gather(*(media_prober.probe(path) for _, path in jobs), return_exceptions=True)
+        for (title, path), media in zip(jobs, probes):
+            if isinstance(media, ProbeError):
+                skipped.append({'title': title, 'reason': f'Unsupported or corrupt media file: {str(media)}'})
+                if file_handler is not None:
+                    storage_manager.cleanup(title)
+            elif isinstance(media, Exception):
+                raise media
+            elif file_handler is None:
+                readable.append((title, path, media, shared_storage.reference(path)))
+            else:
+                key = shared_storage.put(path)
+                readable.append((title, storage_manager.track(title, shared_storage.local_path(key)), media, key))
+                if job_runner.queue_mode == DATABASE_QUEUE:
+                    storage_manager.hand_off(title)
+
+        batch = Batch(name=request.form.get('name') or data.get('name'))
+        if schedule is not None:
+            # Held until the schedule releases them into spare capacity
+            if schedule.status == COMPLETED:
+                schedule.status = ACTIVE
+            transcripts = Transcript.create_many(
+                [title for title, _, _, _ in readable], TranscriptStatus.SCHEDULED, batch,
+                fields=[{'source_key': key, 'schedule_id': schedule.id, 'priority': priority,
+                         'estimated_seconds': media.duration} for _, _, media, key in readable]
+            )
+        else:
+            transcripts = Transcript.create_many(
+                [title for title, _, _, _ in readable], TranscriptStatus.QUEUED, batch,
+                fields=[{'source_key': key, **job_runner.queue_fields(priority, media.duration)}
+                        for _, _, media, key in readable]
+            )
+    except Exception:
+        db.session.rollback()
+        for title, _ in jobs:
+            storage_manager.cleanup(title)
+        for _, _, _, key in readable:
+            shared_storage.delete(key)
+        raise
+
+    if schedule is None:
+        for transcript, (title, path, media, key) in zip(transcripts, readable):
+            job_runner.submit(Job(
+                title=title, file_path=path, transcript_id=transcript.id, lane=BATCH, batch_id=batch.id,
+                priority=priority, estimated_seconds=media.duration, source_key=key
+            ))
+
+    return jsonify(api_response(True, {
+        'batch_id': batch.id,
+        'schedule_id': schedule.id if schedule is not None else None,
+        'accepted': [t.title for t in transcripts],
+        'skipped': skipped
+    })), 200
+
+@transcription_bp.route('/batch/<int:batch_id>', methods=['GET'])
+def get_batch(batch_id):
+    """Get aggregated progress for a batch"""
+    batch = db.get_or_404(Batch, batch_id)
+    items = batch.transcripts.with_entities(
+        Transcript.id, Transcript.title, Transcript.status, Transcript.progress
+    ).order_by(Transcript.id).all()
+    return jsonify(api_response(True, {
+        **batch.to_dict(),
+        'items': [
+            {'id': id, 'title': title, 'status': status, 'progress': progress}
+            for id, title, status, progress in items
+        ]
+    }))
+
 @transcription_bp.route('/word_count/<title>')
 async def get_word_count(title):
     """Get word count and status for a transcript"""
     try:
-        transcript = Transcript.query.filter(
-            Transcript.title.ilike(title)
-        ).first()
+        transcript = await transcript_store.get_by_title(title)
         
         if not transcript:
             raise NotFound('Transcript not found')
         
-        # Estimate duration based on file size if processing
-        estimated_duration = None
-        if transcript.status.startswith('processing'):
-            file_path = None
-            original_ext = os.path.splitext(transcript.original_filename)[1] if transcript.original_filename else '.wav'
-            
-            # Try different possible file paths
-            for ext in [original_ext, '.wav', '.mp4']:
-                temp_path = Path(current_app.config['UPLOAD_FOLDER']) / 'temp' / secure_filename(title + ext)
-                if temp_path.exists():
-                    file_path = temp_path
-                    break
-            
-            if file_path:
-                file_size = file_path.stat().st_size
-                # Rough estimate: 1MB ≈ 1 minute of audio/video
-                estimated_duration = (file_size / (1024 * 1024)) * 60  # seconds
+        # Media duration as probed when the job was queued; queued jobs get a whole-job estimate
+        estimated_duration = transcript['estimated_seconds']
+        eta_seconds = transcript['eta_seconds']
+        queue_position = None
+        if transcript['status'] == TranscriptStatus.QUEUED:
+            if estimated_duration:
+                eta_seconds = throughput_model.estimate_job(estimated_duration)
+            if job_runner.queue_mode == LOCAL_QUEUE:
+                queue_position = job_runner.queue_position(transcript['title'])
             else:
-                estimated_duration = 7200  # 2 hours default
+                queue_position = await transcript_store.queue_position(transcript['id'])
         
         return jsonify(api_response(True, {
-            'word_count': transcript.word_count,
-            'status': transcript.status,
-            'error': transcript.error_message if transcript.status == 'failed' else None,
-            'estimated_duration': estimated_duration
+            'word_count': transcript['word_count'],
+            'status': transcript['status'],
+            'error': transcript['error'] if transcript['status'] == TranscriptStatus.FAILED else None,
+            'estimated_duration': estimated_duration,
+            'eta_seconds': eta_seconds,
+            'throughput': transcript['throughput'],
+            'queue_position': queue_position
         }))
     except Exception as e:
         logger.error(f"Error getting word count: {str(e)}")
@@ -221,20 +530,163 @@ def rename_transcript():
         logger.error(f"Error renaming transcript: {str(e)}")
         raise
 
+@transcription_bp.route('/<int:transcript_id>/retranscribe', methods=['POST'])
+async def retranscribe(transcript_id):
+    """Queue a transcript again from its stored audio, optionally with another backend or language"""
+    data = request.get_json(silent=True) or {}
+    backend = data.get('backend')
+    if backend is not None and backend not in PROVIDERS + (LOCAL,):
+        raise BadRequest(f"Unknown backend: {backend}")
+    if backend == LOCAL and not local_whisper.available:
+        raise BadRequest('Local transcription is not configured')
+    language = data.get('language')
+    if language is not None and (not isinstance(language, str) or not 2 <= len(language) <= 10):
+        raise BadRequest('Invalid language code')
+    priority = _requested_priority(data.get('priority'))
+    options = {key: value for key, value in (('backend', backend), ('language', language)) if value}
+
+    def _requeue():
+        transcript = db.session.get(Transcript, transcript_id)
+        if transcript is None:
+            raise NotFound('Transcript not found')
+        if transcript.status in (TranscriptStatus.QUEUED, TranscriptStatus.SCHEDULED) or transcript.is_processing:
+            raise Conflict('Transcript is already queued or processing')
+        # Starting from the stored audio skips the upload and ffmpeg stages entirely
+        source_key = audio_store.source_key(transcript.audio_key)
+        if source_key is None:
+            raise Conflict('No stored audio for this transcript; upload the file again')
+        estimated_seconds = transcript.estimated_seconds or transcript.duration or None
+        transcript.status = TranscriptStatus.QUEUED
+        transcript.progress = 0
+        transcript.error = None
+        transcript.source_key = source_key
+        transcript.job_options = options
+        for key, value in job_runner.queue_fields(priority, estimated_seconds).items():
+            setattr(transcript, key, value)
+        db.session.commit()
+        return transcript.title, source_key, estimated_seconds, transcript.batch_id
+
+    title, source_key, estimated_seconds, batch_id = await db_executor.write(_requeue)
+    job_runner.submit(Job(
+        title=title, file_path=shared_storage.local_path(source_key), transcript_id=transcript_id,
+        lane=BATCH if batch_id is not None else INTERACTIVE, batch_id=batch_id, trace=JobTrace(title),
+        priority=priority, estimated_seconds=estimated_seconds, source_key=source_key, options=options
+    ))
+    return jsonify(api_response(True, {'id': transcript_id, 'title': title, **options})), 200
+
+def _transcript_validators(transcript_id: int, variant: str):
+    """ETag and Last-Modified for a representation of a transcript, read without loading its content"""
+    updated_at = db.session.query(Transcript.updated_at).filter(Transcript.id == transcript_id).scalar()
+    if updated_at is None:
+        raise NotFound('Transcript not found')
+    return f'{variant}-{transcript_id}-{updated_at.timestamp():.6f}', updated_at
+
 @transcription_bp.route('/<int:transcript_id>', methods=['GET'])
 def get_transcript(transcript_id):
     """Get transcript by ID"""
     try:
+        etag, last_modified = _transcript_validators(transcript_id, 'transcript')
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
         transcript = Transcript.query.get_or_404(transcript_id)
-        return jsonify(transcript.to_dict())
+        return with_validators(jsonify(transcript.to_dict()), etag, last_modified)
     except Exception as e:
         logger.error(f"Error getting transcript: {str(e)}")
         raise
 
+@transcription_bp.route('/<int:transcript_id>/timeline', methods=['GET'])
+def get_transcript_timeline(transcript_id):
+    """Get the per-job stage timeline, optionally as OTLP/JSON"""
+    try:
+        etag, last_modified = _transcript_validators(transcript_id, f"timeline-{request.args.get('format', 'json')}")
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
+        transcript = Transcript.query.get_or_404(transcript_id)
+        if not transcript.timeline:
+            raise NotFound('No timeline recorded for this transcript')
+        
+        if request.args.get('format') == 'otlp':
+            return with_validators(jsonify(timeline_to_otlp(transcript.timeline)), etag, last_modified)
+        
+        return with_validators(jsonify(api_response(True, {
+            'title': transcript.title,
+            'timeline': transcript.timeline
+        })), etag, last_modified)
+    except Exception as e:
+        logger.error(f"Error getting timeline: {str(e)}")
+        raise
+
+@transcription_bp.route('/<int:transcript_id>/events', methods=['GET'])
+def stream_transcript_events(transcript_id):
+    """Stream status and progress updates as server-sent events until the job finishes"""
+    # Subscribe before reading the current state so no update falls in between
+    subscription = event_broker.subscribe(transcript_channel(transcript_id))
+    try:
+        transcript = db.get_or_404(Transcript, transcript_id)
+    except Exception:
+        subscription.close()
+        raise
+    current = {
+        'id': transcript.id, 'status': transcript.status, 'progress': transcript.progress,
+        'error': transcript.error, 'eta_seconds': transcript.eta_seconds, 'throughput': transcript.throughput
+    }
+    finished = (TranscriptStatus.COMPLETED.value, TranscriptStatus.FAILED.value)
+    keepalive = current_app.config.get('EVENTS_KEEPALIVE_SECONDS', 15)
+
+    def generate():
+        try:
+            message = current
+            while True:
+                if message is None:
+                    yield ': keepalive\n\n'
+                else:
+                    yield f"data: {json.dumps(message)}\n\n"
+                    if message['status'] in finished:
+                        return
+                message = subscription.get(timeout=keepalive)
+        finally:
+            subscription.close()
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@transcription_bp.route('/<int:transcript_id>/words', methods=['GET'])
+def get_transcript_words(transcript_id):
+    """Word timings by time window (start/end), by time (at) or by index range (offset/limit)"""
+    etag, last_modified = _transcript_validators(transcript_id, f'words-{request.query_string.decode()}')
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
+    words = db.session.query(Transcript.words).filter(Transcript.id == transcript_id).scalar()
+    if not words:
+        raise NotFound('No word timings recorded for this transcript')
+
+    args = request.args
+    limit = min(args.get('limit', 1000, type=int), 5000)
+    if 'at' in args:
+        index = words.index_at(args.get('at', type=float) or 0.0)
+        indices = range(index, index + 1)
+    elif 'start' in args or 'end' in args:
+        indices = words.window(args.get('start', 0.0, type=float), args.get('end', float('inf'), type=float))
+    else:
+        offset = max(0, args.get('offset', 0, type=int))
+        indices = range(offset, min(len(words), offset + limit))
+
+    return with_validators(jsonify(api_response(True, {
+        'total': len(words),
+        'words': [{'index': i, **words[i]} for i in indices[:limit]]
+    })), etag, last_modified)
+
 @transcription_bp.route('/<int:transcript_id>/srt', methods=['GET'])
 def get_transcript_srt(transcript_id):
     """Get transcript in SRT format"""
     try:
+        etag, last_modified = _transcript_validators(transcript_id, 'srt')
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
         transcript = Transcript.query.get_or_404(transcript_id)
         
         if transcript.status != TranscriptStatus.COMPLETED:
@@ -244,29 +696,42 @@ def get_transcript_srt(transcript_id):
             raise BadRequest('No segments available')
         
         # Generate SRT content from segments
-        srt_content = ''
-        for segment in transcript.segments:
-            # Convert start and end times to timedelta
-            start_time = timedelta(seconds=segment['start'])
-            end_time = timedelta(seconds=segment['end'])
-            
-            # Convert to SRT format
-            start_time_str = timedelta_to_srt_time(start_time)
-            end_time_str = timedelta_to_srt_time(end_time)
-            
-            # Build the subtitle entry
-            srt_content += f"{segment['index']}\n"
-            srt_content += f"{start_time_str} --> {end_time_str}\n"
-            srt_content += f"{segment['text']}\n\n"
+        srt_content = transcript.segments.to_srt()
         
-        return jsonify(api_response(True, {
+        return with_validators(jsonify(api_response(True, {
             'title': transcript.title,
             'srt_content': srt_content
-        }))
+        })), etag, last_modified)
     except Exception as e:
         logger.error(f"Error generating SRT: {str(e)}")
         raise
 
+@transcription_bp.route('/<int:transcript_id>/derived', methods=['GET'])
+def list_derived(transcript_id):
+    """List the derived content generated for a transcript"""
+    transcript = Transcript.query.get_or_404(transcript_id)
+    derived = transcript.derived_contents.order_by(DerivedContent.kind).all()
+    return jsonify(api_response(True, {
+        'kinds': list(TASKS),
+        'derived': [item.to_dict() for item in derived]
+    }))
+
+@transcription_bp.route('/<int:transcript_id>/derived/<kind>', methods=['POST'])
+async def generate_derived(transcript_id, kind):
+    """Generate a summary, chapters or show notes, reusing cached work for unchanged windows"""
+    if kind not in TASKS:
+        raise NotFound(f'Unknown content kind: {kind}')
+    if not postprocessor.enabled:
+        raise BadRequest('Post-processing is not configured')
+    transcript = db.session.get(Transcript, transcript_id)
+    if transcript is None:
+        raise NotFound('Transcript not found')
+    if transcript.status != TranscriptStatus.COMPLETED:
+        raise Conflict('Transcript is not completed yet')
+    refresh = bool((request.get_json(silent=True) or {}).get('refresh'))
+    derived = await asyncio.wrap_future(postprocessor.run(transcript_id, kind, refresh))
+    return jsonify(api_response(True, derived))
+
 @transcription_bp.route('/<int:transcript_id>', methods=['DELETE'])
 def delete_transcript(transcript_id):
     """Delete transcript and associated files"""
@@ -274,18 +739,20 @@ def delete_transcript(transcript_id):
         transcript = Transcript.query.get_or_404(transcript_id)
         title = transcript.title
 
-        # Clean up any in-progress files
-        if transcript.status == TranscriptStatus.PROCESSING:
-            temp_dir = Path(current_app.config['UPLOAD_FOLDER']) / 'temp'
-            for ext in ['.wav', '.mp4', '.avi', '.mov', '.wmv', '.mp3']:
-                temp_path = temp_dir / secure_filename(title + ext)
-                if temp_path.exists():
-                    temp_path.unlink()
-                    logger.info(f"Removed temp file: {temp_path}")
+        # Clean up any in-progress files, and the uploads of jobs that have not started
+        waiting = transcript.status in (TranscriptStatus.QUEUED, TranscriptStatus.SCHEDULED)
+        if transcript.status == TranscriptStatus.QUEUED:
+            job_runner.cancel(title)
+        if transcript.is_processing or waiting:
+            storage_manager.cleanup(title)
+        if waiting and transcript.source_key:
+            # In database mode the upload was handed off to whichever node claims the job
+            shared_storage.delete(transcript.source_key)
 
         # Delete database record
         db.session.delete(transcript)
         db.session.commit()
+        event_broker.close(transcript_channel(transcript_id))
         logger.info(f"Transcript {title} deleted successfully")
 
         return jsonify(api_response(True, {
@@ -0,0 +1,185 @@
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from flask import Flask
+from sqlalchemy import func
+from models import db, Transcript
+from services.database import db_executor
+from services.jobs import job_runner, DATABASE_QUEUE, INTERACTIVE
+from services.local_whisper import local_whisper
+from services.metrics import UPLOADS_DEFERRED, UPLOADS_REJECTED
+from services.progress import throughput_model
+from services.provider_health import PROVIDERS, provider_health
+from services.workers import Cluster, worker_registry
+from utils.common import TranscriptStatus
+
+logger = logging.getLogger(__name__)
+
+class AdmissionError(Exception):
+    """Raised when the service is too loaded to accept a job"""
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+@dataclass(frozen=True)
+class Load:
+    """Work in the system when a job asks to be admitted"""
+    active: int
+    queued: int  # Both lanes
+    queued_seconds: float
+    capacity: int
+    interactive_queued: int = 0  # What an upload waits behind; batch work yields to it
+    interactive_seconds: float = 0.0
+
+@dataclass(frozen=True)
+class Admission:
+    """An accepted job; deferred jobs wait for a slot behind queue_position - 1 others"""
+    deferred: bool
+    queue_position: Optional[int] = None
+    eta_seconds: Optional[float] = None
+
+class AdmissionController:
+    """Decide whether an upload is accepted now, accepted to wait, or turned away.
+
+    Uploads are refused with ``AdmissionError`` (503 with ``Retry-After``)
+    when more than ``ADMISSION_MAX_QUEUED_JOBS`` jobs or
+    ``ADMISSION_MAX_QUEUED_MINUTES`` of audio are already waiting, or when
+    every provider is rate limiting or mostly failing and there is no local
+    backend to spill to. Only the interactive lane counts against those
+    limits, since batch imports queue in their own lane behind uploads.
+    Below them an upload that finds all job slots busy is accepted but
+    deferred, and told its queue position and expected start. Retry hints come from the
+    measured throughput, so clients back off for about as long as the
+    backlog needs to drain instead of piling onto timeouts.
+
+    With ``JOB_QUEUE=database`` the queue is counted in the database, and
+    slots and provider health come from the job nodes' heartbeats (see
+    services.workers), since a web node may make no provider calls itself.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.enabled = True
+        self._cached: Optional[Tuple[Load, Cluster]] = None
+        self._cached_at = 0.0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure limits from the application"""
+        self.enabled = app.config.get('ADMISSION_CONTROL', True)
+        self.max_queued_jobs = app.config.get('ADMISSION_MAX_QUEUED_JOBS', job_runner.max_jobs * 8)
+        self.max_queued_seconds = app.config.get('ADMISSION_MAX_QUEUED_MINUTES', 240) * 60
+        self.min_retry_after = app.config.get('ADMISSION_MIN_RETRY_AFTER', 5)
+        self.max_retry_after = app.config.get('ADMISSION_MAX_RETRY_AFTER', 300)
+        # The shared queue is counted in the database; cache it briefly so bursts cost one query
+        self.cache_seconds = app.config.get('ADMISSION_CACHE_SECONDS', 2.0)
+        app.extensions['admission_controller'] = self
+
+    # Load
+
+    @staticmethod
+    def shared_state() -> Tuple[Load, Cluster]:
+        """Load on the shared queue and the live job nodes serving it, read in the caller's session"""
+        interactive = Transcript.batch_id.is_(None)
+        queued, queued_seconds, interactive_queued, interactive_seconds = db.session.query(
+            func.count(Transcript.id),
+            func.coalesce(func.sum(Transcript.estimated_seconds), 0.0),
+            func.count(Transcript.id).filter(interactive),
+            func.coalesce(func.sum(Transcript.estimated_seconds).filter(interactive), 0.0),
+        ).filter(Transcript.status == TranscriptStatus.QUEUED).one()
+        active = db.session.query(func.count(Transcript.id)).filter(
+            Transcript.status.like(f'{TranscriptStatus.PROCESSING.value}%')
+        ).scalar()
+        cluster = worker_registry.cluster()
+        load = Load(active, queued, float(queued_seconds), cluster.capacity,
+                    interactive_queued, float(interactive_seconds))
+        return load, cluster
+
+    async def _state(self) -> Tuple[Load, Optional[Cluster]]:
+        """Current load and, with the shared queue, the job nodes serving it"""
+        if job_runner.queue_mode != DATABASE_QUEUE:
+            load = Load(job_runner.active, job_runner.queued, job_runner.queued_media_seconds(), job_runner.max_jobs,
+                        job_runner.queued_in(INTERACTIVE), job_runner.queued_media_seconds(INTERACTIVE))
+            return load, None
+        with self._lock:
+            if self._cached is not None and time.monotonic() - self._cached_at < self.cache_seconds:
+                return self._cached
+        state = await db_executor.run(self.shared_state)
+        with self._lock:
+            self._cached, self._cached_at = state, time.monotonic()
+        return state
+
+    async def load(self) -> Load:
+        """Jobs running and waiting, from this runner or the shared queue, against the slots serving them"""
+        return (await self._state())[0]
+
+    async def cluster(self) -> Optional[Cluster]:
+        """The live job nodes when jobs run from the shared queue, else None"""
+        return (await self._state())[1]
+
+    @staticmethod
+    def providers_down(cluster: Optional[Cluster]) -> Optional[float]:
+        """Seconds until a provider expects requests again, if none can take work and nothing can spill"""
+        if cluster is None:
+            if local_whisper.can_spill or provider_health.any_healthy(PROVIDERS):
+                return None
+            return min(provider_health.limited_for(provider) for provider in PROVIDERS)
+        # With no live job node there is nothing to judge the providers by
+        if not cluster.workers or cluster.can_spill or cluster.any_healthy():
+            return None
+        return min(cluster.limited_for(provider) for provider in PROVIDERS)
+
+    # Decisions
+
+    def _retry_after(self, wall_seconds: float) -> int:
+        return int(min(self.max_retry_after, max(self.min_retry_after, math.ceil(wall_seconds))))
+
+    def _drain_seconds(self, media_seconds: float, capacity: int) -> float:
+        """Wall seconds for the runners to work through media_seconds of queued audio"""
+        return throughput_model.estimate_job(media_seconds) / max(1, capacity)
+
+    def _reject(self, reason: str, message: str, retry_after: int) -> None:
+        UPLOADS_REJECTED.inc(reason=reason)
+        logger.warning(f"Upload refused ({reason}): {message}; retry after {retry_after}s")
+        raise AdmissionError(message, retry_after)
+
+    async def admit(self, media_seconds: Optional[float] = None, probed: bool = True) -> Admission:
+        """Admit a job of media_seconds or raise AdmissionError; probed=False for the check before the upload is read"""
+        if not self.enabled:
+            return Admission(deferred=False)
+
+        load, cluster = await self._state()
+        # Local transcription takes the overflow while the providers are unavailable
+        wait = self.providers_down(cluster)
+        if wait is not None:
+            self._reject('providers', 'Transcription providers are unavailable', self._retry_after(wait or 30))
+
+        queued, queued_seconds = load.interactive_queued, load.interactive_seconds
+        if queued >= self.max_queued_jobs:
+            # Time for the excess jobs to start, at the backlog's average length
+            per_job = queued_seconds / queued if queued else 0
+            excess = (queued - self.max_queued_jobs + 1) * per_job
+            self._reject('queue_jobs', f'{queued} jobs are already waiting',
+                         self._retry_after(self._drain_seconds(excess, load.capacity)))
+        waiting = queued_seconds + (media_seconds or 0)
+        if waiting > self.max_queued_seconds:
+            excess = waiting - self.max_queued_seconds
+            self._reject('queue_minutes', f'{queued_seconds / 60:.0f} minutes of audio are already waiting',
+                         self._retry_after(self._drain_seconds(excess, load.capacity)))
+
+        if load.active < load.capacity:
+            return Admission(deferred=False)
+        if probed:
+            # Uploads are checked again once probed; count each deferred upload once
+            UPLOADS_DEFERRED.inc()
+        return Admission(
+            deferred=True,
+            queue_position=queued + 1,
+            eta_seconds=round(self._drain_seconds(queued_seconds, load.capacity), 1)
+        )
+
+admission_controller = AdmissionController()
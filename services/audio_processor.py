@@ -1,8 +1,12 @@
 import os
+import shutil
+import wave
 import logging
 import asyncio
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, Callable
+from services.probe import MediaInfo
 
 logger = logging.getLogger(__name__)
 
@@ -10,18 +14,85 @@ class AudioProcessingError(Exception):
     """Raised when audio processing fails"""
     pass
 
-async def extract_audio(video_path: str, audio_path: str, progress_callback: Optional[Callable] = None) -> str:
-    """Extract audio from video file using ffmpeg"""
+# What the transcription providers accept as uploads
+PROVIDER_EXTENSIONS = {'.flac', '.mp3', '.mp4', '.mpeg', '.mpga', '.m4a', '.ogg', '.opus', '.wav', '.webm'}
+PROVIDER_MAX_BYTES = 25 * 1024 * 1024
+# Audio codecs the providers decode, and the container to stream-copy them into
+COPY_CONTAINERS = {'aac': '.m4a', 'alac': '.m4a', 'mp3': '.mp3', 'flac': '.flac', 'opus': '.ogg', 'vorbis': '.ogg'}
+# Target of a full transcode: 16 kHz mono 16-bit PCM WAV
+TARGET_CODEC = 'pcm_s16le'
+TARGET_SAMPLE_RATE = 16000
+TARGET_CHANNELS = 1
+
+PASSTHROUGH = 'passthrough'
+STREAM_COPY = 'copy'
+TRANSCODE = 'transcode'
+
+@dataclass(frozen=True)
+class AudioPlan:
+    """How to turn an input file into something a provider accepts"""
+    mode: str
+    extension: str
+
+def is_target_pcm(media: MediaInfo) -> bool:
+    """True for WAV audio already at (or below) the transcription sample format"""
+    return (media.format_name == 'wav' and media.codec == TARGET_CODEC
+            and (media.sample_rate or 0) <= TARGET_SAMPLE_RATE and media.channels == TARGET_CHANNELS)
+
+def negotiate_format(file_path: Path, media: MediaInfo) -> AudioPlan:
+    """Pick the cheapest way to get provider-ready audio: pass through, stream copy or transcode.
+
+    Audio-only files the providers accept are passed through untouched; the
+    chunker resamples oversized PCM per chunk if it has to.
+    """
+    extension = Path(file_path).suffix.lower()
+    if media.codec is None:
+        # Not probed (no ffprobe): fall back to extension rules
+        if extension in PROVIDER_EXTENSIONS and extension != '.mp4':
+            return AudioPlan(PASSTHROUGH, extension)
+        return AudioPlan(TRANSCODE, '.wav')
+
+    if not media.has_video and extension in PROVIDER_EXTENSIONS:
+        return AudioPlan(PASSTHROUGH, extension)
+    if media.codec in COPY_CONTAINERS:
+        return AudioPlan(STREAM_COPY, COPY_CONTAINERS[media.codec])
+    return AudioPlan(TRANSCODE, '.wav')
+
+def ffmpeg_available() -> bool:
+    return shutil.which('ffmpeg') is not None
+
+CHUNK_SLICE = 'slice'
+CHUNK_COPY = 'copy'
+CHUNK_TRANSCODE = 'transcode'
+
+def chunk_export_mode(media: MediaInfo, file_path: str) -> str:
+    """How to cut chunks from a file: slice 16 kHz PCM, stream-copy compressed audio, else transcode"""
+    if is_target_pcm(media):
+        return CHUNK_SLICE
+    if (media.codec and not media.codec.startswith('pcm_') and ffmpeg_available()
+            and Path(file_path).suffix.lower() in PROVIDER_EXTENSIONS):
+        return CHUNK_COPY
+    return CHUNK_TRANSCODE
+
+async def _run_ffmpeg(cmd: list) -> None:
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise AudioProcessingError(f"FFmpeg error: {stderr.decode()}")
+
+async def extract_audio(video_path: str, audio_path: str, progress_callback: Optional[Callable] = None,
+                        stream_copy: bool = False) -> str:
+    """Extract audio from video file using ffmpeg, copying the audio stream as-is when stream_copy is set"""
     try:
         # Check if input file exists
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video file not found: {video_path}")
 
-        # Check available disk space
-        free_space = os.statvfs(os.path.dirname(audio_path)).f_frsize * os.statvfs(os.path.dirname(audio_path)).f_bavail
-        video_size = os.path.getsize(video_path)
-        if free_space < video_size * 2:  # Ensure we have at least 2x the video size available
-            raise OSError("Insufficient disk space for audio extraction")
+        # Disk space is reserved per job by StorageManager before admission
 
         if progress_callback:
             await progress_callback({
@@ -30,27 +101,22 @@ async def extract_audio(video_path: str, audio_path: str, progress_callback: Opt
                 'text': 'Extracting audio from video...'
             })
 
-        # Use ffmpeg to extract audio with optimal settings for transcription
-        cmd = [
-            'ffmpeg', '-i', video_path,
-            '-vn',  # Disable video
-            '-acodec', 'pcm_s16le',  # Use WAV format
-            '-ar', '16000',  # 16kHz sample rate
-            '-ac', '1',  # Mono audio
-            '-y',  # Overwrite output file
-            audio_path
-        ]
-
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-
-        stdout, stderr = await process.communicate()
+        if stream_copy:
+            # Remux the existing audio track without decoding it
+            cmd = ['ffmpeg', '-i', video_path, '-vn', '-acodec', 'copy', '-y', audio_path]
+        else:
+            # Use ffmpeg to extract audio with optimal settings for transcription
+            cmd = [
+                'ffmpeg', '-i', video_path,
+                '-vn',  # Disable video
+                '-acodec', TARGET_CODEC,  # Use WAV format
+                '-ar', str(TARGET_SAMPLE_RATE),  # 16kHz sample rate
+                '-ac', str(TARGET_CHANNELS),  # Mono audio
+                '-y',  # Overwrite output file
+                audio_path
+            ]
 
-        if process.returncode != 0:
-            raise AudioProcessingError(f"FFmpeg error: {stderr.decode()}")
+        await _run_ffmpeg(cmd)
 
         if progress_callback:
             await progress_callback({
@@ -63,4 +129,69 @@ async def extract_audio(video_path: str, audio_path: str, progress_callback: Opt
 
     except Exception as e:
         logger.error(f"Error extracting audio: {str(e)}")
-        raise AudioProcessingError(str(e)) 
\ No newline at end of file
+        raise AudioProcessingError(str(e))
+
+def slice_wav(source_path: str, dest_path: str, start_ms: int, end_ms: int) -> str:
+    """Copy a time range of a PCM WAV file into a new WAV file without decoding"""
+    with wave.open(source_path, 'rb') as source:
+        rate = source.getframerate()
+        start_frame = start_ms * rate // 1000
+        frame_count = max(0, min(source.getnframes(), end_ms * rate // 1000) - start_frame)
+        source.setpos(start_frame)
+        with wave.open(dest_path, 'wb') as dest:
+            dest.setparams(source.getparams())
+            # Copy in bounded blocks to keep memory flat for long chunks
+            block = rate * 30
+            while frame_count > 0:
+                frames = source.readframes(min(block, frame_count))
+                if not frames:
+                    break
+                dest.writeframes(frames)
+                frame_count -= min(block, frame_count)
+    return dest_path
+
+async def copy_segment(source_path: str, dest_path: str, start_ms: int, end_ms: int) -> str:
+    """Cut a time range out of a compressed file with ffmpeg stream copy"""
+    await _run_ffmpeg([
+        'ffmpeg', '-ss', f'{start_ms / 1000:.3f}', '-i', source_path,
+        '-t', f'{(end_ms - start_ms) / 1000:.3f}',
+        '-vn', '-acodec', 'copy', '-y', dest_path
+    ])
+    return dest_path
+
+async def encode_flac(source_path: str, dest_path: str) -> str:
+    """Losslessly compress PCM audio to FLAC, roughly halving it for storage"""
+    await _run_ffmpeg(['ffmpeg', '-i', source_path, '-vn', '-acodec', 'flac', '-y', dest_path])
+    return dest_path
+
+# CPU-bound helpers below run in the audio worker pool, so they take and return paths.
+# pydub is imported inside them so that only processes doing audio work load it.
+
+def transcode_chunk(source_path: str, dest_path: str, start_ms: int, end_ms: int) -> str:
+    """Resample a time range of a file to 16 kHz mono 16-bit WAV"""
+    from pydub import AudioSegment
+    segment = None
+    if Path(source_path).suffix.lower() == '.wav':
+        try:
+            # Read only the frames in range instead of decoding the whole file
+            with wave.open(source_path, 'rb') as source:
+                rate = source.getframerate()
+                start_frame = start_ms * rate // 1000
+                source.setpos(min(start_frame, source.getnframes()))
+                frames = source.readframes(max(0, end_ms * rate // 1000 - start_frame))
+                segment = AudioSegment(
+                    data=frames, sample_width=source.getsampwidth(), frame_rate=rate,
+                    channels=source.getnchannels()
+                )
+        except wave.Error:
+            segment = None
+    if segment is None:
+        segment = AudioSegment.from_file(source_path)[start_ms:end_ms]
+    segment = segment.set_frame_rate(TARGET_SAMPLE_RATE).set_channels(TARGET_CHANNELS).set_sample_width(2)
+    segment.export(dest_path, format='wav')
+    return dest_path
+
+def decode_duration(source_path: str) -> float:
+    """Measure a file by decoding it; only used when no prober could read its header"""
+    from pydub import AudioSegment
+    return len(AudioSegment.from_file(source_path)) / 1000
@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Collection, Optional, Set, Union
+from flask import Flask
+from sqlalchemy import or_
+from models import db, Transcript
+from services.audio_processor import encode_flac, ffmpeg_available
+from services.database import db_executor
+from services.shared_storage import REFERENCE_PREFIX, shared_storage
+from utils.common import TranscriptStatus
+
+logger = logging.getLogger(__name__)
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class AudioStore:
+    """Content-addressed store of provider-ready audio, so transcripts can be redone without the upload.
+
+    Each job's normalized audio (the extracted track, or the upload itself
+    when it was passed through) is kept under ``AUDIO_STORE_ROOT`` keyed by
+    the SHA-256 of its content, so identical audio is stored once. PCM WAV
+    is compressed to lossless FLAC when ffmpeg is available; already
+    compressed audio is kept as is. Reads refresh a file's mtime and, once
+    the store exceeds ``AUDIO_STORE_MAX_BYTES``, the least recently used
+    files are evicted, except those queued or running jobs still read.
+    Disabled unless ``AUDIO_STORE_ROOT`` is set; in a
+    multi-node deployment it must be on the shared mount.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.root: Optional[Path] = None
+        self.max_bytes = 10 * 1024 ** 3
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure the store root and size cap from the application"""
+        root = app.config.get('AUDIO_STORE_ROOT')
+        self.root = Path(root).resolve() if root else None
+        self.max_bytes = app.config.get('AUDIO_STORE_MAX_BYTES', 10 * 1024 ** 3)
+        if self.root is not None:
+            self.root.mkdir(parents=True, exist_ok=True)
+        app.extensions['audio_store'] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def path(self, key: str) -> Path:
+        """Location of a stored object; keys fan out over 256 directories"""
+        name = Path(key).name
+        return self.root / name[:2] / name
+
+    def get(self, key: Optional[str]) -> Optional[Path]:
+        """Path of a stored object, marking it recently used, or None if absent or evicted"""
+        if not self.enabled or not key:
+            return None
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def source_key(self, key: str) -> Optional[str]:
+        """Read-only shared storage key for a stored object, for queueing a job from it"""
+        path = self.get(key)
+        return shared_storage.reference(path) if path is not None else None
+
+    def _in_use(self) -> Set[str]:
+        """Keys of stored objects that queued, scheduled or running jobs read from (see /retranscribe)"""
+        rows = db.session.query(Transcript.source_key).filter(
+            Transcript.source_key.like(f'{REFERENCE_PREFIX}%'),
+            or_(Transcript.status.in_((TranscriptStatus.QUEUED, TranscriptStatus.SCHEDULED)),
+                Transcript.status.like(f'{TranscriptStatus.PROCESSING.value}%'))
+        ).all()
+        paths = (shared_storage.local_path(key) for (key,) in rows)
+        return {path.name for path in paths if path.is_relative_to(self.root)}
+
+    async def put(self, audio_path: Union[str, Path]) -> Optional[str]:
+        """Store a job's audio and return its key; a file already in the store is only touched.
+
+        Returns None if the object did not fit in the store and was evicted straight away.
+        """
+        if not self.enabled:
+            return None
+        audio_path = Path(audio_path).resolve()
+        if audio_path.is_relative_to(self.root):
+            self.get(audio_path.name)
+            return audio_path.name
+
+        digest = await asyncio.to_thread(_sha256, audio_path)
+        suffix = audio_path.suffix.lower()
+        encode = suffix == '.wav' and ffmpeg_available()
+        key = digest + ('.flac' if encode else suffix)
+        if self.get(key) is not None:
+            return key
+
+        dest = self.path(key)
+        dest.parent.mkdir(exist_ok=True)
+        # Write next to the destination and rename, so readers never see a partial file
+        partial = dest.with_name(f'.{uuid.uuid4().hex}{dest.suffix}')
+        try:
+            if encode:
+                await encode_flac(str(audio_path), str(partial))
+            else:
+                await asyncio.to_thread(shutil.copyfile, audio_path, partial)
+            os.replace(partial, dest)
+        finally:
+            partial.unlink(missing_ok=True)
+        logger.info(f"Stored audio {key} ({dest.stat().st_size} bytes)")
+        await asyncio.to_thread(self.evict, await db_executor.run(self._in_use))
+        if not dest.exists():
+            logger.warning(f"Audio {key} is larger than AUDIO_STORE_MAX_BYTES and was not kept")
+            return None
+        return key
+
+    def evict(self, keep: Collection[str] = ()) -> int:
+        """Remove least recently used objects, other than keep, until the store fits in AUDIO_STORE_MAX_BYTES"""
+        if not self.enabled:
+            return 0
+        with self._lock:
+            entries = []
+            for path in self.root.glob('*/*'):
+                if path.name.startswith('.'):
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path.name in keep:
+                    continue
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            if removed:
+                logger.info(f"Evicted {removed} stored audio files")
+            return removed
+
+audio_store = AudioStore()
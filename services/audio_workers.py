@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+from flask import Flask
+from services.metrics import AUDIO_TASKS_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+class AudioWorkerPool:
+    """Process pool for CPU-bound audio work (decode, resample, encode).
+
+    Work is handed over as file paths and comes back as files, so nothing
+    large is pickled between processes. Workers are spawned rather than
+    forked because the parent runs several threads (job runner, DB
+    executor, sweeper). The pool starts on first use; ``AUDIO_WORKERS = 0``
+    runs tasks on a thread instead, which still keeps the event loop free.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.workers = os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure pool size from the application"""
+        self.workers = app.config.get('AUDIO_WORKERS', os.cpu_count() or 1)
+        app.extensions['audio_workers'] = self
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+                logger.info(f"Started audio worker pool with {self.workers} processes")
+            return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a picklable function in the pool without blocking the event loop"""
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        AUDIO_TASKS_IN_FLIGHT.inc()
+        try:
+            if executor is None:
+                return await asyncio.to_thread(fn, *args, **kwargs)
+            return await loop.run_in_executor(executor, partial(fn, *args, **kwargs))
+        finally:
+            AUDIO_TASKS_IN_FLIGHT.dec()
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+audio_workers = AudioWorkerPool()
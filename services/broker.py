@@ -0,0 +1,239 @@
+import json
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
+from flask import Flask
+from werkzeug.utils import secure_filename
+
+logger = logging.getLogger(__name__)
+
+class BrokerError(Exception):
+    """Raised when the event broker is misconfigured"""
+    pass
+
+class Subscription:
+    """A subscriber's view of one channel"""
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next message, or None if none arrived within timeout seconds"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+class _QueueSubscription(Subscription):
+    def __init__(self, broker: 'InProcessBroker', channel: str):
+        self.broker = broker
+        self.channel = channel
+        self.queue: 'queue.Queue[Dict[str, Any]]' = queue.Queue(maxsize=256)
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self.broker._unsubscribe(self)
+
+class InProcessBroker:
+    """Fan messages out to subscribers in this process (single node, one worker process)"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[_QueueSubscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                # A stalled reader only needs the latest state; drop its oldest message
+                try:
+                    subscription.queue.get_nowait()
+                except queue.Empty:
+                    pass
+                subscription.queue.put_nowait(message)
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = _QueueSubscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def close(self, channel: str) -> None:
+        # Subscriber queues go away with their subscriptions; nothing is kept per channel
+        pass
+
+    def _unsubscribe(self, subscription: _QueueSubscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+class _SpoolSubscription(Subscription):
+    def __init__(self, path: Path, poll_interval: float):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.offset = path.stat().st_size if path.exists() else 0
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                with open(self.path, 'rb') as f:
+                    f.seek(self.offset)
+                    line = f.readline()
+            except FileNotFoundError:
+                line = b''
+                self.offset = 0
+            if not line and self.offset and self._truncated():
+                # The channel was closed and reopened by a new run; read the new file from the start
+                self.offset = 0
+                continue
+            # Only consume complete lines; a writer may be mid-append
+            if line.endswith(b'\n'):
+                self.offset += len(line)
+                try:
+                    return json.loads(line)
+                except ValueError:
+                    continue
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def _truncated(self) -> bool:
+        try:
+            return self.path.stat().st_size < self.offset
+        except FileNotFoundError:
+            return True
+
+class SpoolBroker:
+    """Fan messages out across processes on one host through append-only spool files.
+
+    Each channel is a JSON-lines file that publishers append to and
+    subscribers tail. It stands in for a network broker when several worker
+    processes share a machine (and in tests); it does not span hosts.
+
+    A closed channel's file is removed ``close_grace`` seconds later, once
+    subscribers have read the final message, unless it was written to again
+    in between. Files idle for ``max_idle`` seconds (left by a process that
+    died) are swept as well.
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 0.2, close_grace: float = 30.0,
+                 max_idle: float = 24 * 3600):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.poll_interval = poll_interval
+        self.close_grace = close_grace
+        self.max_idle = max_idle
+        self._closing: Dict[Path, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+    def _path(self, channel: str) -> Path:
+        return self.directory / f'{secure_filename(channel)}.jsonl'
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        # One write per message on an O_APPEND file keeps concurrent publishers' lines whole
+        with open(self._path(channel), 'ab') as f:
+            f.write(json.dumps(message).encode() + b'\n')
+        self._prune()
+
+    def subscribe(self, channel: str) -> Subscription:
+        return _SpoolSubscription(self._path(channel), self.poll_interval)
+
+    def close(self, channel: str) -> None:
+        path = self._path(channel)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._closing[path] = (time.monotonic() + self.close_grace, size)
+        self._prune()
+
+    def _prune(self) -> None:
+        """Remove closed channels past their grace period and, now and then, long idle ones"""
+        now = time.monotonic()
+        with self._lock:
+            due = [(path, size) for path, (deadline, size) in self._closing.items() if deadline <= now]
+            for path, _ in due:
+                del self._closing[path]
+            sweep = now - self._last_sweep >= 60
+            if sweep:
+                self._last_sweep = now
+        for path, size in due:
+            try:
+                if path.stat().st_size == size:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+        if sweep:
+            cutoff = time.time() - self.max_idle
+            for path in self.directory.glob('*.jsonl'):
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                except FileNotFoundError:
+                    pass
+
+def create_broker(url: str):
+    """Build a broker from a URL: ``memory://`` or ``spool:///path/to/dir``"""
+    parsed = urlparse(url)
+    if parsed.scheme == 'memory':
+        return InProcessBroker()
+    if parsed.scheme == 'spool':
+        if not parsed.path:
+            raise BrokerError(f"Spool broker URL needs a directory: {url}")
+        return SpoolBroker(parsed.path)
+    raise BrokerError(f"Unsupported BROKER_URL scheme: {url}")
+
+class EventBroker:
+    """Publishes job progress to whichever node holds the subscriber.
+
+    Progress is written by the node running a job but streamed by the web
+    node a client is connected to, so updates travel through a pluggable
+    backend chosen by ``BROKER_URL``.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.backend = InProcessBroker()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Select the backend from the application config"""
+        self.backend = create_broker(app.config.get('BROKER_URL', 'memory://'))
+        app.extensions['event_broker'] = self
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """Send a message; delivery is best effort and never fails the publisher"""
+        try:
+            self.backend.publish(channel, message)
+        except Exception as e:
+            logger.warning(f"Could not publish to {channel}: {str(e)}")
+
+    def subscribe(self, channel: str) -> Subscription:
+        return self.backend.subscribe(channel)
+
+    def close(self, channel: str) -> None:
+        """Mark a channel finished so the backend can drop what it keeps for it"""
+        try:
+            self.backend.close(channel)
+        except Exception as e:
+            logger.warning(f"Could not close {channel}: {str(e)}")
+
+def transcript_channel(transcript_id: int) -> str:
+    return f'transcript.{transcript_id}'
+
+event_broker = EventBroker()
@@ -0,0 +1,232 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+import click
+from flask import Flask
+from flask.cli import AppGroup
+from sqlalchemy import func, type_coerce, update
+from models import db, CompressionDictionary, Transcript
+from services.metrics import COLD_STORAGE_BYTES, COLD_STORAGE_TRANSCRIPTS
+from utils.common import TranscriptStatus
+from utils.compression import ZSTD, compress, decompress, pack_transcript, resolve_codec, train_dictionary, unpack_transcript
+
+logger = logging.getLogger(__name__)
+
+class ColdStorage:
+    """Compress the content and segments of completed transcripts that have gone cold.
+
+    Transcripts last updated more than ``COLD_STORAGE_AFTER_DAYS`` ago are
+    packed into a single ``archive`` blob (zstd when the zstandard package is
+    installed, zlib otherwise), optionally against a shared dictionary
+    trained on recent transcripts, which helps short transcripts most. The
+    model decompresses on access and moves a transcript back to the plain
+    columns when its content is rewritten. Compaction runs every
+    ``COLD_STORAGE_INTERVAL`` seconds on nodes that run jobs, and on demand
+    via ``flask cold-storage compact``.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.app = None
+        self._compactor = None
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Bind the compactor to an application and register its CLI commands"""
+        self.app = app
+        self.after_days = app.config.get('COLD_STORAGE_AFTER_DAYS', 30)
+        self.codec = resolve_codec(app.config.get('COLD_STORAGE_CODEC', ZSTD))
+        self.level = app.config.get('COLD_STORAGE_LEVEL')  # None: the codec's strongest practical level
+        self.use_dictionary = app.config.get('COLD_STORAGE_DICTIONARY', False)
+        self.dictionary_samples = app.config.get('COLD_STORAGE_DICTIONARY_SAMPLES', 200)
+        self.batch_size = app.config.get('COLD_STORAGE_BATCH_SIZE', 100)
+        self.interval = app.config.get('COLD_STORAGE_INTERVAL', 6 * 3600)
+        app.cli.add_command(self._command_group())
+        app.extensions['cold_storage'] = self
+
+    # Dictionaries
+
+    def train(self) -> Optional[CompressionDictionary]:
+        """Train and store a dictionary from the most recent uncompressed transcripts"""
+        rows = db.session.query(Transcript._content, type_coerce(Transcript._segments, db.Text)).filter(
+            Transcript.status == TranscriptStatus.COMPLETED,
+            Transcript.archive.is_(None),
+            Transcript._content.isnot(None)
+        ).order_by(Transcript.updated_at.desc()).limit(self.dictionary_samples).all()
+        samples = [pack_transcript(content, segments) for content, segments in rows]
+        if len(samples) < 10:
+            logger.info(f"Not enough transcripts to train a compression dictionary ({len(samples)})")
+            return None
+        try:
+            data = train_dictionary(samples, self.codec)
+        except Exception as e:
+            logger.warning(f"Compression dictionary training failed: {str(e)}")
+            return None
+        dictionary = CompressionDictionary(codec=self.codec, data=data, sample_count=len(samples))
+        db.session.add(dictionary)
+        db.session.commit()
+        logger.info(f"Trained {self.codec} dictionary {dictionary.id} ({len(data)} bytes, {len(samples)} samples)")
+        return dictionary
+
+    def _dictionary(self) -> Optional[Tuple[int, bytes]]:
+        if not self.use_dictionary:
+            return None
+        dictionary = CompressionDictionary.latest(self.codec) or self.train()
+        return (dictionary.id, dictionary.data) if dictionary else None
+
+    # Compaction
+
+    def compact(self, older_than_days: Optional[float] = None, limit: Optional[int] = None) -> Dict[str, int]:
+        """Archive completed transcripts not updated for older_than_days; needs an app context"""
+        days = self.after_days if older_than_days is None else older_than_days
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        dictionary = self._dictionary()
+        stats = {'archived': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+        last_id = 0
+        while limit is None or stats['archived'] < limit:
+            size = self.batch_size if limit is None else min(self.batch_size, limit - stats['archived'])
+            # Raw segments JSON goes straight into the archive without a decode/encode round trip
+            rows = db.session.query(
+                Transcript.id, Transcript.updated_at, Transcript._content, type_coerce(Transcript._segments, db.Text)
+            ).filter(
+                Transcript.id > last_id,
+                Transcript.status == TranscriptStatus.COMPLETED,
+                Transcript.archive.is_(None),
+                Transcript._content.isnot(None),
+                Transcript.updated_at < cutoff
+            ).order_by(Transcript.id).limit(size).all()
+            if not rows:
+                break
+
+            now = datetime.utcnow()
+            for transcript_id, updated_at, content, segments in rows:
+                payload = pack_transcript(content, segments)
+                blob = compress(payload, self.codec, self.level, dictionary)
+                # Skip rows rewritten since they were read; keep updated_at so client validators stay valid
+                result = db.session.execute(
+                    update(Transcript)
+                    .where(Transcript.id == transcript_id, Transcript.updated_at == updated_at,
+                           Transcript.archive.is_(None))
+                    .values({
+                        Transcript._content: None,
+                        Transcript._segments: None,
+                        Transcript.archive: blob,
+                        Transcript.archived_at: now,
+                        Transcript.updated_at: Transcript.updated_at,
+                    })
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount:
+                    stats['archived'] += 1
+                    stats['raw_bytes'] += len(payload)
+                    stats['stored_bytes'] += len(blob)
+                    COLD_STORAGE_BYTES.inc(len(payload), form='raw')
+                    COLD_STORAGE_BYTES.inc(len(blob), form='stored')
+                    COLD_STORAGE_TRANSCRIPTS.inc()
+            # One short transaction per batch keeps the write lock free for the job pipeline
+            db.session.commit()
+            last_id = rows[-1][0]
+
+        if stats['archived']:
+            logger.info(
+                f"Archived {stats['archived']} transcripts: {stats['raw_bytes']} -> {stats['stored_bytes']} bytes "
+                f"({self.codec}{', dictionary' if dictionary else ''})"
+            )
+        return stats
+
+    def restore(self, limit: Optional[int] = None) -> int:
+        """Move archived transcripts back to the plain columns, e.g. before a downgrade"""
+        restored = 0
+        while limit is None or restored < limit:
+            size = self.batch_size if limit is None else min(self.batch_size, limit - restored)
+            rows = db.session.query(Transcript.id, Transcript.archive).filter(
+                Transcript.archive.isnot(None)
+            ).order_by(Transcript.id).limit(size).all()
+            if not rows:
+                break
+            for transcript_id, blob in rows:
+                content, segments = unpack_transcript(decompress(blob, CompressionDictionary.data_for))
+                db.session.execute(
+                    update(Transcript)
+                    .where(Transcript.id == transcript_id, Transcript.archive == blob)
+                    .values({
+                        Transcript._content: content,
+                        Transcript._segments: type_coerce(segments or None, db.Text),
+                        Transcript.archive: None,
+                        Transcript.archived_at: None,
+                        Transcript.updated_at: Transcript.updated_at,
+                    })
+                    .execution_options(synchronize_session=False)
+                )
+                restored += 1
+            db.session.commit()
+        return restored
+
+    def usage(self) -> Dict[str, int]:
+        """Transcript counts and text bytes in the plain and compressed tiers"""
+        hot_count, hot_bytes = db.session.query(
+            func.count(Transcript.id), func.coalesce(func.sum(func.length(Transcript._content)), 0)
+        ).filter(Transcript.archive.is_(None)).one()
+        cold_count, cold_bytes = db.session.query(
+            func.count(Transcript.id), func.coalesce(func.sum(func.length(Transcript.archive)), 0)
+        ).filter(Transcript.archive.isnot(None)).one()
+        return {'hot_transcripts': hot_count, 'hot_content_bytes': hot_bytes,
+                'cold_transcripts': cold_count, 'cold_bytes': cold_bytes}
+
+    def start_compactor(self) -> None:
+        """Run compact() every COLD_STORAGE_INTERVAL seconds on a daemon thread"""
+        if self._compactor is not None or not self.interval:
+            return
+
+        def _loop():
+            while not self._stop.wait(self.interval):
+                try:
+                    with self.app.app_context():
+                        self.compact()
+                except Exception as e:
+                    logger.error(f"Cold storage compaction failed: {str(e)}")
+
+        self._compactor = threading.Thread(target=_loop, name='cold-storage', daemon=True)
+        self._compactor.start()
+
+    def stop_compactor(self) -> None:
+        self._stop.set()
+
+    def _command_group(self) -> AppGroup:
+        group = AppGroup('cold-storage', help='Compressed storage for old completed transcripts.')
+
+        @group.command('compact')
+        @click.option('--older-than-days', type=float, default=None, help='Defaults to COLD_STORAGE_AFTER_DAYS')
+        @click.option('--limit', type=int, default=None, help='Stop after this many transcripts')
+        def compact_command(older_than_days, limit):
+            """Compress completed transcripts that have not changed recently."""
+            stats = self.compact(older_than_days, limit)
+            ratio = stats['stored_bytes'] / stats['raw_bytes'] if stats['raw_bytes'] else 0
+            click.echo(f"Archived {stats['archived']} transcripts: {stats['raw_bytes']} -> "
+                       f"{stats['stored_bytes']} bytes ({ratio:.1%})")
+
+        @group.command('train-dictionary')
+        def train_command():
+            """Train a new shared dictionary from recent transcripts."""
+            dictionary = self.train()
+            if dictionary is None:
+                raise click.ClickException('No dictionary trained; see the log for details')
+            click.echo(f'Trained {dictionary.codec} dictionary {dictionary.id} ({len(dictionary.data)} bytes)')
+
+        @group.command('restore')
+        @click.option('--limit', type=int, default=None, help='Stop after this many transcripts')
+        def restore_command(limit):
+            """Decompress archived transcripts back into plain columns."""
+            click.echo(f'Restored {self.restore(limit)} transcripts')
+
+        @group.command('stats')
+        def stats_command():
+            """Show how many transcripts are in each tier."""
+            for key, value in self.usage().items():
+                click.echo(f'{key:<18} {value}')
+
+        return group
+
+cold_storage = ColdStorage()
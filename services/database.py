@@ -0,0 +1,288 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, Transcript
+from services.broker import event_broker, transcript_channel
+from services.metrics import DB_COMMITS, DB_WRITE_QUEUE_DEPTH, DB_WRITE_SECONDS
+from utils.common import TranscriptStatus
+
+logger = logging.getLogger(__name__)
+
+def is_sqlite(app: Flask) -> bool:
+    """Check whether the app is configured against SQLite"""
+    return app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite')
+
+def _is_sqlite_memory(uri: str) -> bool:
+    return uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri
+
+def configure_sqlite(app: Flask, engine_options: bool = True) -> None:
+    """Apply the SQLite production profile to the app config.
+
+    Must run before ``db.init_app`` so the engine is built with these options.
+    Pass ``engine_options=False`` to keep explicitly configured engine options.
+    """
+    config = app.config
+    config.setdefault('SQLITE_JOURNAL_MODE', 'WAL')
+    config.setdefault('SQLITE_SYNCHRONOUS', 'NORMAL')
+    config.setdefault('SQLITE_BUSY_TIMEOUT_MS', 30000)
+    config.setdefault('SQLITE_CACHE_SIZE_KB', 64 * 1024)
+    config.setdefault('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
+    config.setdefault('DB_SERIALIZE_WRITES', True)
+
+    if not engine_options:
+        return
+    options = {
+        'connect_args': {
+            'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+            'check_same_thread': False,
+        },
+    }
+    if not _is_sqlite_memory(config['SQLALCHEMY_DATABASE_URI']):
+        # WAL lets readers run alongside the single writer, so size the pool for the readers
+        options.update({
+            'pool_size': config.get('DB_EXECUTOR_WORKERS', 4) + 2,
+            'max_overflow': 4,
+            'pool_timeout': 30,
+        })
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+def register_sqlite_pragmas(app: Flask) -> None:
+    """Apply journal, sync, timeout and cache pragmas on every new SQLite connection"""
+    config = app.config
+    pragmas = [
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA cache_size=-{int(config['SQLITE_CACHE_SIZE_KB'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA foreign_keys=ON",
+    ]
+    if not _is_sqlite_memory(config['SQLALCHEMY_DATABASE_URI']):
+        pragmas.insert(0, f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}")
+
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', _on_connect)
+
+@event.listens_for(Session, 'after_commit')
+def _count_commit(session):
+    DB_COMMITS.inc()
+
+class DatabaseExecutor:
+    """Run blocking SQLAlchemy work off the event loop on dedicated threads.
+
+    Reads go to a small thread pool. Writes go through ``write``, which uses a
+    single thread when ``DB_SERIALIZE_WRITES`` is set (the SQLite profile) so
+    commits queue up in-process instead of contending for the database lock.
+
+    Each call gets its own app context (and therefore its own session), so
+    ORM objects must not escape the callable; return plain values instead.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.app = None
+        self._executor = None
+        self._writer = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Bind the executor to an application"""
+        self.app = app
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config.get('DB_EXECUTOR_WORKERS', 4),
+            thread_name_prefix='db'
+        )
+        if app.config.get('DB_SERIALIZE_WRITES'):
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+        else:
+            self._writer = self._executor
+        DB_WRITE_QUEUE_DEPTH.set_function(self._writer._work_queue.qsize)
+        app.extensions['db_executor'] = self
+
+    def _write_call(self, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        with DB_WRITE_SECONDS.time():
+            return self._call(fn, args, kwargs)
+
+    def _call(self, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        with self.app.app_context():
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                db.session.rollback()
+                raise
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the DB executor and await its result"""
+        if self._executor is None:
+            raise RuntimeError('DatabaseExecutor is not bound to an application')
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(self._call, fn, args, kwargs)
+        )
+
+    async def write(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a committing fn(*args, **kwargs) on the writer path"""
+        if self._writer is None:
+            raise RuntimeError('DatabaseExecutor is not bound to an application')
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._writer, functools.partial(self._write_call, fn, args, kwargs)
+        )
+
+_FINISHED = (TranscriptStatus.COMPLETED, TranscriptStatus.FAILED)
+
+def _lost_lease(transcript: Transcript, owner: Optional[str]) -> bool:
+    """Whether a job run for owner was requeued and may now belong to another node"""
+    return owner is not None and transcript.lease_owner != owner
+
+def _publish_status(transcript: Transcript) -> None:
+    """Fan a committed status change out to subscribers on any node"""
+    event_broker.publish(transcript_channel(transcript.id), {
+        'id': transcript.id,
+        'status': transcript.status,
+        'progress': transcript.progress,
+        'error': transcript.error,
+        'eta_seconds': transcript.eta_seconds,
+        'throughput': transcript.throughput,
+    })
+    if transcript.status in _FINISHED:
+        event_broker.close(transcript_channel(transcript.id))
+
+class TranscriptStore:
+    """Async access to transcripts for the processing pipeline and async routes"""
+
+    def __init__(self, executor: DatabaseExecutor):
+        self.executor = executor
+        self._pending_status: Dict[int, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+
+    async def create(self, title: str, status: str, **fields: Any) -> int:
+        """Create a transcript and return its id"""
+        return await self.executor.write(lambda: Transcript.create(title=title, status=status, **fields).id)
+
+    async def get_by_title(self, title: str) -> Optional[Dict[str, Any]]:
+        """Get a lightweight status snapshot of a transcript by title"""
+        def _get():
+            transcript = Transcript.get_by_title(title)
+            if not transcript:
+                return None
+            return {
+                'id': transcript.id,
+                'title': transcript.title,
+                'status': transcript.status,
+                'progress': transcript.progress,
+                'error': transcript.error,
+                'word_count': transcript.word_count,
+                'duration': transcript.duration,
+                'eta_seconds': transcript.eta_seconds,
+                'throughput': transcript.throughput,
+                'estimated_seconds': transcript.estimated_seconds,
+            }
+        return await self.executor.run(_get)
+
+    async def queue_position(self, transcript_id: int) -> Optional[int]:
+        """1-based position of a queued job in the shared queue (interactive lane first), if queued"""
+        def _position():
+            transcript = db.session.get(Transcript, transcript_id)
+            if transcript is None or transcript.status != TranscriptStatus.QUEUED:
+                return None
+            queued = Transcript.query.filter(Transcript.status == TranscriptStatus.QUEUED)
+            if transcript.batch_id is not None:
+                ahead = queued.filter(Transcript.batch_id.is_(None)).count()
+                queued = queued.filter(Transcript.batch_id.isnot(None))
+            else:
+                ahead = 0
+                queued = queued.filter(Transcript.batch_id.is_(None))
+            key = transcript.schedule_key if transcript.schedule_key is not None else float('inf')
+            return ahead + queued.filter(Transcript.schedule_key < key).count() + 1
+        return await self.executor.run(_position)
+
+    async def update_status(self, transcript_id: int, status: str, progress: Optional[float] = None,
+                            error: Optional[str] = None, eta_seconds: Optional[float] = None,
+                            throughput: Optional[float] = None, owner: Optional[str] = None) -> None:
+        """Update transcript status and progress.
+
+        Updates for a transcript that already has a write queued are folded
+        into that write, so a busy writer never falls behind on stale progress.
+        The write still runs if the caller is cancelled, since later updates
+        may have been folded into it. With an owner, the update is dropped
+        unless that node still holds the job's lease (see services.leases).
+        """
+        update = {
+            'status': status, 'progress': progress, 'error': error,
+            'eta_seconds': eta_seconds, 'throughput': throughput
+        }
+        with self._pending_lock:
+            pending = self._pending_status.get(transcript_id)
+            if pending is not None:
+                pending['status'] = status
+                pending['owner'] = owner
+                for key, value in update.items():
+                    if value is not None:
+                        pending[key] = value
+                return
+            self._pending_status[transcript_id] = {**update, 'owner': owner}
+
+        def _update():
+            with self._pending_lock:
+                latest = self._pending_status.pop(transcript_id)
+            owner = latest.pop('owner')
+            transcript = db.session.get(Transcript, transcript_id)
+            if not transcript or _lost_lease(transcript, owner):
+                return
+            if transcript.status in _FINISHED and latest['status'] not in _FINISHED:
+                # Progress folded into a write that lands after the job finished must not reopen it
+                return
+            transcript.update_status(**latest)
+            _publish_status(transcript)
+        await asyncio.shield(self.executor.write(_update))
+
+    async def complete(self, transcript_id: int, content: str, segments=None,
+                       language: str = 'en', duration: float = 0, words=None, owner: Optional[str] = None) -> bool:
+        """Store the transcription result and mark the transcript completed in one commit.
+
+        Returns False, writing nothing, if the transcript is gone or owner no
+        longer holds its lease.
+        """
+        def _complete():
+            transcript = db.session.get(Transcript, transcript_id)
+            if not transcript or _lost_lease(transcript, owner):
+                return False
+            transcript.language = language
+            transcript.duration = duration
+            transcript.status = TranscriptStatus.COMPLETED
+            transcript.progress = 100
+            transcript.eta_seconds = 0
+            transcript.update_content(content, segments, words)
+            _publish_status(transcript)
+            return True
+        return await self.executor.write(_complete)
+
+    async def save_timeline(self, transcript_id: int, timeline: Dict[str, Any],
+                            audio_key: Optional[str] = None, owner: Optional[str] = None) -> None:
+        """Store the job's stage timeline and, if it was kept, where its normalized audio is stored"""
+        def _save():
+            transcript = db.session.get(Transcript, transcript_id)
+            if transcript and not _lost_lease(transcript, owner):
+                transcript.timeline = timeline
+                if audio_key is not None:
+                    transcript.audio_key = audio_key
+                db.session.commit()
+        await self.executor.write(_save)
+
+db_executor = DatabaseExecutor()
+transcript_store = TranscriptStore(db_executor)
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+from flask import Flask
+
+class HedgePolicy:
+    """When to back up a slow provider request with one to the fallback provider.
+
+    Learns each provider's recent latency as wall seconds per media second
+    (so short and long chunks share one distribution) and, with
+    ``HEDGE_REQUESTS`` on, hedges a request once it has run longer than
+    the ``HEDGE_PERCENTILE`` of that distribution for its chunk. Hedges are
+    capped at ``HEDGE_BUDGET`` of recent requests so a slow provider cannot
+    double the load on the other one.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.enabled = False
+        self.percentile = 95.0
+        self.budget = 0.1
+        self.min_delay = 2.0
+        self.min_samples = 20
+        self.window = 60.0
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._requests: Deque[float] = deque()
+        self._hedges: Deque[float] = deque()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure the hedging policy from the application"""
+        self.enabled = app.config.get('HEDGE_REQUESTS', False)
+        self.percentile = app.config.get('HEDGE_PERCENTILE', 95.0)
+        self.budget = app.config.get('HEDGE_BUDGET', 0.1)
+        self.min_delay = app.config.get('HEDGE_MIN_DELAY', 2.0)
+        self.min_samples = app.config.get('HEDGE_MIN_SAMPLES', 20)
+        self.window = app.config.get('HEDGE_BUDGET_WINDOW', 60.0)
+        app.extensions['hedge_policy'] = self
+
+    def observe(self, provider: str, media_seconds: Optional[float], wall_seconds: float) -> None:
+        """Record the latency of a successful request"""
+        if not media_seconds or media_seconds <= 0:
+            return
+        with self._lock:
+            self._latencies.setdefault(provider, deque(maxlen=500)).append(wall_seconds / media_seconds)
+
+    def delay(self, provider: str, media_seconds: Optional[float]) -> Optional[float]:
+        """Seconds to wait on a request before hedging it, or None to never hedge it"""
+        if not self.enabled or not media_seconds:
+            return None
+        with self._lock:
+            samples = sorted(self._latencies.get(provider, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return max(self.min_delay, samples[index] * media_seconds)
+
+    def _trim(self, events: Deque[float], now: float) -> None:
+        while events and events[0] < now - self.window:
+            events.popleft()
+
+    def track_request(self) -> None:
+        """Count a primary request towards the hedging budget"""
+        with self._lock:
+            self._requests.append(time.monotonic())
+
+    def acquire(self) -> bool:
+        """Take a hedge from the budget if recent hedges leave room for one"""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(self._requests, now)
+            self._trim(self._hedges, now)
+            if len(self._hedges) >= max(1.0, self.budget * len(self._requests)):
+                return False
+            self._hedges.append(now)
+            return True
+
+hedge_policy = HedgePolicy()
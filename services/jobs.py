@@ -0,0 +1,343 @@
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from flask import Flask
+from services.database import db_executor
+from services.leases import lease_manager
+from services.metrics import JOBS_QUEUED
+from services.scheduler import DEFAULT_AGING_RATE, schedule_key
+from services.shared_storage import shared_storage
+from services.tracing import JobTrace
+from services.workers import worker_registry
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+
+# Where queued jobs live: this process's memory, or the transcripts table shared by all nodes
+LOCAL_QUEUE = 'local'
+DATABASE_QUEUE = 'database'
+
+@dataclass
+class Job:
+    """A unit of transcription work waiting for a runner slot"""
+    title: str
+    file_path: Path
+    transcript_id: Optional[int] = None
+    lane: str = INTERACTIVE
+    batch_id: Optional[int] = None
+    trace: Optional[JobTrace] = None
+    priority: int = 0
+    estimated_seconds: Optional[float] = None  # Media duration, used as the job's cost
+    source_key: Optional[str] = None  # Input location in shared storage
+    options: Dict[str, Any] = field(default_factory=dict)  # Provider and language overrides
+    submitted: float = field(default_factory=time.monotonic)
+
+    def key(self, aging_rate: float = DEFAULT_AGING_RATE) -> float:
+        """Scheduling key; lower runs first"""
+        return schedule_key(self.estimated_seconds, self.priority, self.submitted, aging_rate)
+
+class JobRunner:
+    """Runs transcription jobs on a dedicated event loop thread.
+
+    Jobs wait in two lanes. Interactive uploads take any free slot first;
+    batch jobs are guaranteed ``BATCH_MIN_SLOTS`` slots while interactive
+    work is waiting (so imports always make progress) and may use every idle
+    slot when it is not. Within a lane the job with the lowest scheduling key
+    (estimated cost, user priority and age) goes next.
+
+    With ``JOB_QUEUE = 'database'`` the transcripts table is the queue: web
+    nodes only write rows, and every node with ``RUN_JOBS`` polls for free
+    slots and claims rows under a lease (see services.leases). In either mode
+    a heartbeat renews the leases of this node's jobs, and jobs whose lease
+    lapsed are requeued and claimed again, so a crashed process's work is
+    picked up by the others (or by itself once restarted). In local mode
+    that recovery is the only time the runner reads the table.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.app = None
+        self.handler: Optional[Callable[[Job], Awaitable[None]]] = None
+        self._queues: Dict[str, List[Job]] = {INTERACTIVE: [], BATCH: []}
+        # Submitted from another thread but not yet picked up by the loop; counted as queued
+        self._incoming: List[Job] = []
+        self._incoming_lock = threading.Lock()
+        self._running: Dict[str, int] = {INTERACTIVE: 0, BATCH: 0}
+        self._active: Dict[str, Job] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._tasks = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._draining = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Bind the runner to an application"""
+        self.app = app
+        self.max_jobs = app.config.get('MAX_CONCURRENT_JOBS', 4)
+        self.batch_min_slots = max(1, app.config.get('BATCH_MIN_SLOTS', self.max_jobs // 4))
+        self.aging_rate = app.config.get('SCHEDULER_AGING_RATE', DEFAULT_AGING_RATE)
+        self.queue_mode = app.config.get('JOB_QUEUE', LOCAL_QUEUE)
+        self.run_jobs = app.config.get('RUN_JOBS', True)
+        self.poll_interval = app.config.get('JOB_POLL_INTERVAL', 2.0)
+        app.extensions['job_runner'] = self
+
+    def set_handler(self, handler: Callable[[Job], Awaitable[None]]) -> None:
+        """Coroutine function that processes a job"""
+        self.handler = handler
+
+    # Lifecycle
+
+    def start(self) -> None:
+        """Start the runner thread if it is not already running"""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            ready = threading.Event()
+
+            def _run():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                self._wakeup = asyncio.Event()
+                self._loop.call_soon(self._start_background)
+                self._loop.call_soon(ready.set)
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=_run, name='job-runner', daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def _start_background(self) -> None:
+        if self.queue_mode == DATABASE_QUEUE and not self.run_jobs:
+            # The loop only hosts other coroutines here (e.g. post-processing); worker nodes run the jobs
+            return
+        background = [self._heartbeat(), self._poll() if self.queue_mode == DATABASE_QUEUE else self._recover()]
+        for coro in background:
+            task = self._loop.create_task(coro)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Stop claiming new jobs and wait for running ones; False if they outlast timeout"""
+        self._draining = True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.active or self.queued:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.5)
+        return True
+
+    def run_coroutine(self, coro) -> 'asyncio.Future':
+        """Schedule a coroutine on the runner loop from any thread"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    # Queueing
+
+    def queue_fields(self, priority: int, estimated_seconds: Optional[float]) -> Dict[str, Any]:
+        """Transcript columns that place a new job in the shared queue"""
+        fields = {
+            'priority': priority,
+            'estimated_seconds': estimated_seconds,
+            # Wall clock rather than monotonic time, so keys compare across nodes
+            'schedule_key': schedule_key(estimated_seconds, priority, time.time(), self.aging_rate),
+        }
+        if self.queue_mode == LOCAL_QUEUE:
+            # This node runs the job itself, so it holds the lease from the start
+            fields.update(lease_manager.initial_lease())
+        return fields
+
+    def submit(self, job: Job) -> None:
+        """Queue a job from any thread.
+
+        In database mode the job's row already is the queue entry, so this
+        only nudges the local poller (if this node runs jobs).
+        """
+        if self.queue_mode == DATABASE_QUEUE:
+            if self.run_jobs:
+                self.start()
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            return
+        self.start()
+        with self._incoming_lock:
+            self._incoming.append(job)
+        self._loop.call_soon_threadsafe(self._enqueue, job)
+
+    def _enqueue(self, job: Job) -> None:
+        with self._incoming_lock:
+            if job in self._incoming:
+                self._incoming.remove(job)
+        self._queues[job.lane].append(job)
+        self._update_gauges()
+        self._dispatch()
+
+    def cancel(self, title: str) -> bool:
+        """Drop a job still waiting in this node's queue; False if it is not queued here"""
+        if self._loop is None:
+            return False
+        # Runs after any earlier submit has been enqueued, since both go through the loop in order
+        return asyncio.run_coroutine_threadsafe(self._cancel(title), self._loop).result()
+
+    async def _cancel(self, title: str) -> bool:
+        for queue in self._queues.values():
+            job = next((job for job in queue if job.title == title), None)
+            if job is not None:
+                queue.remove(job)
+                self._update_gauges()
+                return True
+        return False
+
+    @property
+    def queued(self) -> int:
+        return len(self._incoming) + sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def active(self) -> int:
+        return sum(self._running.values())
+
+    def _waiting(self, lane: Optional[str] = None) -> List[Job]:
+        with self._incoming_lock:
+            waiting = self._incoming + [job for queue in list(self._queues.values()) for job in list(queue)]
+        return [job for job in waiting if lane is None or job.lane == lane]
+
+    def queued_in(self, lane: str) -> int:
+        """Jobs waiting in one lane"""
+        return len(self._waiting(lane))
+
+    def queued_media_seconds(self, lane: Optional[str] = None) -> float:
+        """Estimated media seconds of the queued jobs, of one lane or all, for admission control"""
+        return sum(job.estimated_seconds or 0 for job in self._waiting(lane))
+
+    def get(self, title: str) -> Optional[Job]:
+        """A queued or running job by title"""
+        job = self._active.get(title)
+        if job is not None:
+            return job
+        return next((job for job in self._snapshot() if job.title == title), None)
+
+    def queue_position(self, title: str) -> Optional[int]:
+        """1-based position of a queued job across lanes in dispatch order, if queued"""
+        for position, job in enumerate(self._snapshot(), start=1):
+            if job.title == title:
+                return position
+        return None
+
+    def _snapshot(self) -> List[Job]:
+        key = lambda job: job.key(self.aging_rate)
+        return sorted(self._queues[INTERACTIVE], key=key) + sorted(self._queues[BATCH], key=key)
+
+    def _next_lane(self) -> Optional[str]:
+        interactive, batch = self._queues[INTERACTIVE], self._queues[BATCH]
+        if interactive and (not batch or self._running[BATCH] >= self.batch_min_slots):
+            return INTERACTIVE
+        if batch:
+            return BATCH
+        return None
+
+    def _dispatch(self) -> None:
+        while self.active < self.max_jobs and not self._draining:
+            lane = self._next_lane()
+            if lane is None:
+                break
+            queue = self._queues[lane]
+            job = min(queue, key=lambda j: j.key(self.aging_rate))
+            queue.remove(job)
+            self._running[lane] += 1
+            self._active[job.title] = job
+            task = self._loop.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        self._update_gauges()
+
+    async def _run(self, job: Job) -> None:
+        try:
+            with self.app.app_context():
+                await self.handler(job)
+        except Exception as e:
+            logger.error(f"Job {job.title} failed: {str(e)}", exc_info=True)
+        finally:
+            if job.transcript_id is not None:
+                try:
+                    await db_executor.write(lease_manager.release, job.transcript_id)
+                except Exception as e:
+                    logger.warning(f"Could not release lease on {job.title}: {str(e)}")
+            self._running[job.lane] -= 1
+            self._active.pop(job.title, None)
+            self._dispatch()
+
+    # Shared queue and leases
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(max(lease_manager.lease_seconds / 3, 1))
+            ids = [job.transcript_id for job in list(self._active.values()) + self._snapshot()
+                   if job.transcript_id is not None]
+            try:
+                await db_executor.write(lease_manager.renew, ids)
+                if self.queue_mode == DATABASE_QUEUE:
+                    # Tell web nodes this node's slots and provider health (see services.workers)
+                    await db_executor.write(worker_registry.beat, self.max_jobs)
+            except Exception as e:
+                logger.warning(f"Could not renew job leases: {str(e)}")
+
+    async def _poll(self) -> None:
+        last_recovery = 0.0
+        while True:
+            try:
+                if time.monotonic() - last_recovery >= lease_manager.lease_seconds:
+                    last_recovery = time.monotonic()
+                    await db_executor.write(lease_manager.requeue_expired)
+                await self._claim()
+            except Exception as e:
+                logger.error(f"Polling the job queue failed: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _recover(self) -> None:
+        """Local mode: requeue and run jobs orphaned by a process sharing this database that died"""
+        while True:
+            await asyncio.sleep(lease_manager.lease_seconds)
+            try:
+                await db_executor.write(lease_manager.requeue_expired)
+                await self._claim()
+            except Exception as e:
+                logger.error(f"Recovering orphaned jobs failed: {str(e)}")
+
+    async def _claim(self) -> None:
+        """Fill free slots from the shared queue, honouring the batch lane's share"""
+        while self.active + self.queued < self.max_jobs and not self._draining:
+            # Same preference as _next_lane: batch first until it holds its guaranteed slots
+            lanes = [BATCH, INTERACTIVE] if self._running[BATCH] < self.batch_min_slots else [INTERACTIVE, BATCH]
+            row = None
+            for lane in lanes:
+                row = await db_executor.write(lease_manager.claim, lane == BATCH)
+                if row is not None:
+                    break
+            if row is None:
+                return
+            self._enqueue(Job(
+                title=row['title'],
+                file_path=shared_storage.local_path(row['source_key']),
+                source_key=row['source_key'],
+                transcript_id=row['id'],
+                lane=BATCH if row['batch_id'] is not None else INTERACTIVE,
+                batch_id=row['batch_id'],
+                priority=row['priority'],
+                estimated_seconds=row['estimated_seconds'],
+                options=row['options'],
+            ))
+
+    def _update_gauges(self) -> None:
+        JOBS_QUEUED.set(self.queued)
+
+job_runner = JobRunner()
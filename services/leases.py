@@ -0,0 +1,122 @@
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from flask import Flask
+from sqlalchemy import or_, update
+from models import db, Transcript
+from services.page_cache import bump_version
+from utils.common import TranscriptStatus
+
+logger = logging.getLogger(__name__)
+
+class LeaseManager:
+    """Job ownership through time-limited leases on transcript rows.
+
+    A node owns a job while it holds an unexpired lease, which it renews by
+    heartbeat. Claims are conditional UPDATEs, so two nodes can never take
+    the same row, and jobs whose owner died become claimable again once the
+    lease lapses. Methods run inside an app context (via the DB executor).
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.lease_seconds = 60
+        self.owner = f'{socket.gethostname()}:{os.getpid()}'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure lease length and node identity from the application"""
+        self.lease_seconds = app.config.get('JOB_LEASE_SECONDS', 60)
+        self.owner = app.config.get('WORKER_ID') or f'{socket.gethostname()}:{os.getpid()}'
+        app.extensions['lease_manager'] = self
+
+    def _expiry(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    def _claimable(self, now: datetime):
+        return or_(Transcript.lease_owner.is_(None), Transcript.lease_expires_at < now)
+
+    def initial_lease(self) -> Dict[str, Any]:
+        """Lease columns for a job this node queues and runs itself"""
+        return {'lease_owner': self.owner, 'lease_expires_at': self._expiry()}
+
+    def claim(self, batch: bool) -> Optional[Dict[str, Any]]:
+        """Take the queued job with the lowest scheduling key from one lane, if any"""
+        now = datetime.utcnow()
+        lane = Transcript.batch_id.isnot(None) if batch else Transcript.batch_id.is_(None)
+        candidates = db.session.query(Transcript.id).filter(
+            Transcript.status == TranscriptStatus.QUEUED,
+            Transcript.source_key.isnot(None),
+            self._claimable(now),
+            lane
+        ).order_by(Transcript.schedule_key.is_(None), Transcript.schedule_key, Transcript.id).limit(5).all()
+
+        for (transcript_id,) in candidates:
+            # Another node may have raced us to this row; the conditional update decides
+            result = db.session.execute(
+                update(Transcript)
+                .where(Transcript.id == transcript_id, Transcript.status == TranscriptStatus.QUEUED,
+                       self._claimable(now))
+                .values(lease_owner=self.owner, lease_expires_at=self._expiry())
+            )
+            db.session.commit()
+            if result.rowcount == 1:
+                transcript = db.session.get(Transcript, transcript_id)
+                return {
+                    'id': transcript.id,
+                    'title': transcript.title,
+                    'source_key': transcript.source_key,
+                    'batch_id': transcript.batch_id,
+                    'priority': transcript.priority or 0,
+                    'estimated_seconds': transcript.estimated_seconds,
+                    'options': transcript.job_options or {},
+                }
+        return None
+
+    def renew(self, transcript_ids: List[int]) -> int:
+        """Extend this node's leases on the given jobs"""
+        if not transcript_ids:
+            return 0
+        result = db.session.execute(
+            update(Transcript)
+            .where(Transcript.id.in_(transcript_ids), Transcript.lease_owner == self.owner)
+            .values(lease_expires_at=self._expiry())
+        )
+        db.session.commit()
+        return result.rowcount
+
+    def superseded(self, transcript_id: int) -> bool:
+        """Whether a job this node is running was requeued, so another node may have taken it over"""
+        row = db.session.query(Transcript.lease_owner).filter(Transcript.id == transcript_id).first()
+        return row is not None and row[0] != self.owner
+
+    def release(self, transcript_id: int) -> None:
+        """Give up this node's lease on a finished job"""
+        db.session.execute(
+            update(Transcript)
+            .where(Transcript.id == transcript_id, Transcript.lease_owner == self.owner)
+            .values(lease_owner=None, lease_expires_at=None)
+        )
+        db.session.commit()
+
+    def requeue_expired(self) -> int:
+        """Put jobs whose owner stopped renewing mid-run back in the queue"""
+        result = db.session.execute(
+            update(Transcript)
+            .where(
+                Transcript.status.like(f'{TranscriptStatus.PROCESSING.value}%'),
+                Transcript.source_key.isnot(None),
+                Transcript.lease_expires_at < datetime.utcnow()
+            )
+            .values(status=TranscriptStatus.QUEUED, progress=0, lease_owner=None, lease_expires_at=None)
+        )
+        if result.rowcount:
+            bump_version(db.session)
+        db.session.commit()
+        if result.rowcount:
+            logger.warning(f"Requeued {result.rowcount} jobs with expired leases")
+        return result.rowcount
+
+lease_manager = LeaseManager()
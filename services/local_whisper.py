@@ -0,0 +1,131 @@
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Optional
+from flask import Flask
+
+logger = logging.getLogger(__name__)
+
+# Backend name next to the remote providers
+LOCAL = 'local'
+
+# Per worker process: the model is loaded once by the pool initializer
+_pipeline = None
+
+def _load_model(model_dir: str, compute_type: str, cpu_threads: int) -> None:
+    """Worker initializer: load the model from disk, never from the network"""
+    global _pipeline
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
+    model = WhisperModel(model_dir, device='cpu', compute_type=compute_type, cpu_threads=cpu_threads,
+                         local_files_only=True)
+    _pipeline = BatchedInferencePipeline(model=model)
+
+def _transcribe_file(audio_path: str, language: Optional[str], batch_size: int) -> Dict[str, Any]:
+    """Transcribe one file in a worker, returning the providers' verbose_json shape"""
+    segments, info = _pipeline.transcribe(audio_path, language=language, batch_size=batch_size,
+                                          word_timestamps=True)
+    result_segments, words = [], []
+    # Segments are a generator; decoding happens as it is consumed
+    for segment in segments:
+        result_segments.append({'start': segment.start, 'end': segment.end, 'text': segment.text})
+        words.extend({'start': word.start, 'end': word.end, 'word': word.word.strip()}
+                     for word in segment.words or ())
+    return {
+        'text': ''.join(segment['text'] for segment in result_segments).strip(),
+        'segments': result_segments,
+        'words': words,
+        'language': info.language,
+        'duration': info.duration,
+    }
+
+class LocalWhisper:
+    """Whisper on the local CPU, for offline use and as overflow when providers push back.
+
+    Loads a CTranslate2 Whisper model (faster-whisper) from the
+    pre-provisioned ``LOCAL_WHISPER_MODEL_DIR`` into each of
+    ``LOCAL_WHISPER_WORKERS`` spawned processes, which decode
+    ``LOCAL_WHISPER_BATCH_SIZE`` voice-activity windows of a chunk at a
+    time. Nothing is downloaded, so it also serves as a network-free
+    backend for load tests. Disabled unless the model directory exists
+    and faster-whisper is installed.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.model_dir: Optional[Path] = None
+        self.workers = 1
+        self.cpu_threads = os.cpu_count() or 1
+        self.batch_size = 8
+        self.compute_type = 'int8'
+        self.spillover = True
+        self._installed = False
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure the model and worker pool from the application"""
+        model_dir = app.config.get('LOCAL_WHISPER_MODEL_DIR')
+        self.model_dir = Path(model_dir).resolve() if model_dir else None
+        self.workers = max(1, app.config.get('LOCAL_WHISPER_WORKERS', 1))
+        # Split the cores between workers rather than oversubscribing them
+        self.cpu_threads = app.config.get('LOCAL_WHISPER_CPU_THREADS', max(1, (os.cpu_count() or 1) // self.workers))
+        self.batch_size = app.config.get('LOCAL_WHISPER_BATCH_SIZE', 8)
+        self.compute_type = app.config.get('LOCAL_WHISPER_COMPUTE_TYPE', 'int8')
+        self.spillover = app.config.get('LOCAL_WHISPER_SPILLOVER', True)
+        self._installed = importlib.util.find_spec('faster_whisper') is not None
+        if self.model_dir is not None and not self._installed:
+            logger.warning("LOCAL_WHISPER_MODEL_DIR is set but faster-whisper is not installed")
+        app.extensions['local_whisper'] = self
+
+    @property
+    def available(self) -> bool:
+        return self._installed and self.model_dir is not None and self.model_dir.is_dir()
+
+    @property
+    def can_spill(self) -> bool:
+        """Whether chunks may overflow here when the remote providers are unavailable"""
+        return self.spillover and self.available
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_load_model, initargs=(str(self.model_dir), self.compute_type, self.cpu_threads)
+                )
+                logger.info(f"Started local Whisper pool with {self.workers} processes from {self.model_dir}")
+            return self._executor
+
+    async def transcribe(self, audio_path: str, language: Optional[str] = None) -> Dict[str, Any]:
+        """Transcribe a file in the worker pool; language None lets the model detect it"""
+        if not self.available:
+            raise RuntimeError('Local transcription is not configured')
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                executor, partial(_transcribe_file, str(audio_path), language, self.batch_size)
+            )
+        except BrokenProcessPool:
+            # A worker died (usually out of memory); start a fresh pool for the next request
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+local_whisper = LocalWhisper()
@@ -0,0 +1,265 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Buckets span sub-millisecond DB commits up to hour-long jobs
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600
+)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    """Base class for labelled metrics"""
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        if not items and not self.labelnames:
+            items = [((), 0)]
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}' for key, v in items]
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time"""
+    kind = 'gauge'
+
+    def __init__(self, *args, callback: Optional[Callable[[], float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, callback: Callable[[], float]) -> None:
+        """Compute the (unlabelled) value at scrape time"""
+        self._callback = callback
+
+    def value(self, **labels) -> float:
+        if self._callback is not None:
+            return self._callback()
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        if self._callback is not None:
+            try:
+                return [f'{self.name} {_format_value(self._callback())}']
+            except Exception:
+                return []
+        with self._lock:
+            items = list(self._values.items())
+        if not items and not self.labelnames:
+            items = [((), 0)]
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}' for key, v in items]
+
+class Histogram(_Metric):
+    """Cumulative histogram of observed values"""
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * len(self.buckets)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall time of the enclosed block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}')
+        return lines
+
+class Registry:
+    """Collection of metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, **kwargs))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+# Pipeline metrics
+STAGE_SECONDS = REGISTRY.histogram(
+    'bentobox_stage_seconds', 'Wall time spent in each pipeline stage', ['stage']
+)
+PROVIDER_REQUEST_SECONDS = REGISTRY.histogram(
+    'bentobox_provider_request_seconds', 'Latency of transcription provider requests', ['provider', 'outcome']
+)
+PROVIDER_FALLBACKS = REGISTRY.counter(
+    'bentobox_provider_fallbacks_total', 'Requests retried on a fallback provider', ['from_provider', 'to_provider']
+)
+PROVIDER_SPILLOVERS = REGISTRY.counter(
+    'bentobox_provider_spillovers_total', 'Chunks sent to local transcription while remote providers were unavailable',
+    ['from_provider']
+)
+PROVIDER_HEDGES = REGISTRY.counter(
+    'bentobox_provider_hedges_total', 'Backup requests sent for slow provider requests, by whether the backup won',
+    ['provider', 'outcome']
+)
+JOB_SECONDS = REGISTRY.histogram(
+    'bentobox_job_seconds', 'End-to-end processing time per job', ['outcome']
+)
+JOBS_IN_FLIGHT = REGISTRY.gauge(
+    'bentobox_jobs_in_flight', 'Jobs currently being processed'
+)
+JOBS_QUEUED = REGISTRY.gauge(
+    'bentobox_jobs_queued', 'Jobs accepted but not yet started'
+)
+STAGE_RATE = REGISTRY.gauge(
+    'bentobox_stage_seconds_per_media_second', 'Rolling wall seconds per second of media, per stage and provider',
+    ['stage', 'provider']
+)
+AUDIO_TASKS_IN_FLIGHT = REGISTRY.gauge(
+    'bentobox_audio_tasks_in_flight', 'Audio preprocessing tasks submitted to the worker pool'
+)
+
+UPLOADS_REJECTED = REGISTRY.counter(
+    'bentobox_uploads_rejected_total', 'Uploads refused by admission control', ['reason']
+)
+UPLOADS_DEFERRED = REGISTRY.counter(
+    'bentobox_uploads_deferred_total', 'Uploads accepted while every job slot was busy'
+)
+SCHEDULED_JOBS_RELEASED = REGISTRY.counter(
+    'bentobox_scheduled_jobs_released_total', 'Held transcripts released to the job queue by their schedule', ['mode']
+)
+
+# Database metrics
+DB_WRITE_SECONDS = REGISTRY.histogram(
+    'bentobox_db_write_seconds', 'Time to run and commit a write on the DB writer path'
+)
+DB_COMMITS = REGISTRY.counter(
+    'bentobox_db_commits_total', 'Committed database transactions'
+)
+DB_WRITE_QUEUE_DEPTH = REGISTRY.gauge(
+    'bentobox_db_write_queue_depth', 'Writes waiting for the DB writer thread'
+)
+
+# Cold storage metrics
+COLD_STORAGE_TRANSCRIPTS = REGISTRY.counter(
+    'bentobox_cold_storage_transcripts_total', 'Completed transcripts moved to compressed cold storage'
+)
+COLD_STORAGE_BYTES = REGISTRY.counter(
+    'bentobox_cold_storage_bytes_total', 'Transcript bytes before and after cold-storage compression', ['form']
+)
+
+# Post-processing metrics
+POSTPROCESS_CALLS = REGISTRY.counter(
+    'bentobox_postprocess_calls_total', 'Post-processing prompts, answered from the cache or by the model',
+    ['kind', 'source']
+)
+POSTPROCESS_TOKENS = REGISTRY.counter(
+    'bentobox_postprocess_tokens_total', 'Model tokens spent on post-processing', ['kind', 'direction']
+)
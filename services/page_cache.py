@@ -0,0 +1,114 @@
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from flask import Flask, Response, make_response, request
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session, attributes
+from models import db, TableVersion, Transcript
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPTS = 'transcripts'
+# Columns the transcript lists show; progress, ETA and lease updates leave cached pages valid
+LISTED_COLUMNS = ('title', 'status', 'word_count')
+
+def seed_versions() -> None:
+    """Create the counter rows bump_version advances (the migrations do this for migrated databases)"""
+    if db.session.get(TableVersion, TRANSCRIPTS) is None:
+        db.session.add(TableVersion(name=TRANSCRIPTS, version=0))
+        db.session.commit()
+
+def bump_version(session: Session, name: str = TRANSCRIPTS) -> None:
+    """Advance a table's change counter inside the session's current transaction.
+
+    Call this after bulk UPDATE/DELETE statements, which bypass the ORM
+    events that bump the counter automatically. The counter row is seeded up
+    front (see seed_versions), since creating it here would race between
+    concurrent first writers.
+    """
+    session.connection().execute(
+        update(TableVersion).where(TableVersion.name == name).values(version=TableVersion.version + 1)
+    )
+
+@event.listens_for(Session, 'before_flush')
+def _track_listed_changes(session, flush_context, instances):
+    if session.info.get('bump_transcripts'):
+        return
+    changed = any(isinstance(obj, Transcript) for obj in session.new | session.deleted) or any(
+        isinstance(obj, Transcript)
+        and any(attributes.get_history(obj, column).has_changes() for column in LISTED_COLUMNS)
+        for obj in session.dirty
+    )
+    if changed:
+        session.info['bump_transcripts'] = True
+
+@event.listens_for(Session, 'after_flush')
+def _bump_listed_version(session, flush_context):
+    if session.info.pop('bump_transcripts', False):
+        bump_version(session)
+
+def _template_fingerprint(app: Flask) -> str:
+    """Short hash of the templates on disk, so a deploy invalidates client ETags"""
+    digest = hashlib.sha1()
+    folder = Path(app.root_path) / (app.template_folder or 'templates')
+    for path in sorted(folder.rglob('*')):
+        if path.is_file():
+            digest.update(f'{path.relative_to(folder)}:{path.stat().st_mtime_ns}'.encode())
+    return digest.hexdigest()[:8]
+
+class PageCache:
+    """Rendered pages keyed by the change counter of the table they list.
+
+    A page is rendered once per version of its data: views read the
+    counter (a primary-key lookup) instead of scanning the table, serve the
+    cached body, and answer 304 when the client's ETag is current. Counters
+    live in the database, so invalidations reach every process and node;
+    each process keeps only the latest render of each page.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.build = ''
+        self._pages: Dict[str, Tuple[int, str]] = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Fingerprint the application's templates"""
+        self.build = _template_fingerprint(app)
+        app.extensions['page_cache'] = self
+
+    @staticmethod
+    def version(name: str = TRANSCRIPTS) -> int:
+        """Current change counter of a table"""
+        row = db.session.get(TableVersion, name)
+        return row.version if row else 0
+
+    def page(self, key: str, render: Callable[[], str], table: str = TRANSCRIPTS) -> Response:
+        """Response for a page, rendering it only if its table changed since the last render"""
+        version = self.version(table)
+        etag = f'{key}-{version}-{self.build}'
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            with self._lock:
+                cached = self._pages.get(key)
+            if cached is not None and cached[0] == version:
+                body = cached[1]
+            else:
+                body = render()
+                with self._lock:
+                    self._pages[key] = (version, body)
+            response = make_response(body)
+        response.set_etag(etag)
+        # Let browsers keep the page but revalidate it on every view
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+page_cache = PageCache()
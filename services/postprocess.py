@@ -0,0 +1,273 @@
+import asyncio
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+from flask import Flask
+from models import db, DerivedContent, PromptOutput, Transcript
+from services.database import db_executor
+from services.jobs import job_runner
+from services.metrics import POSTPROCESS_CALLS, POSTPROCESS_TOKENS
+from utils.common import TranscriptStatus
+from utils.segments import SegmentList
+
+logger = logging.getLogger(__name__)
+
+class PostProcessError(Exception):
+    """Raised when derived content cannot be generated"""
+    pass
+
+@dataclass(frozen=True)
+class Task:
+    """A kind of derived content: a prompt run on each window and one merging their results"""
+    window_prompt: str
+    merge_prompt: str
+    max_tokens: int = 1024
+
+TASKS = {
+    'summary': Task(
+        window_prompt='Summarize this part of a transcript in one short paragraph. Keep names, figures and '
+                      'decisions; leave out filler. Reply with the summary only.',
+        merge_prompt='These are summaries of consecutive parts of one transcript, each headed by its time range. '
+                     'Combine them into a single summary of one to three paragraphs. Reply with the summary only.',
+    ),
+    'chapters': Task(
+        window_prompt='Split this part of a transcript into chapters where the topic changes. Reply with one '
+                      'chapter per line as "[HH:MM:SS] Title", using the timestamps in the text.',
+        merge_prompt='These are chapter lists for consecutive parts of one transcript. Merge them into one list of '
+                     'five to fifteen chapters in order, joining chapters that continue across parts. Reply with '
+                     'one chapter per line as "[HH:MM:SS] Title".',
+    ),
+    'show_notes': Task(
+        window_prompt='Write show notes for this part of a podcast transcript: two or three sentences on what is '
+                      'covered, then bullet points for key points and any people, products or links mentioned.',
+        merge_prompt='These are show notes for consecutive parts of one episode. Merge them into one set of show '
+                     'notes: a short description, then de-duplicated bullet points for key points and mentions. '
+                     'Reply in Markdown.',
+        max_tokens=1536,
+    ),
+}
+
+@dataclass(frozen=True)
+class Window:
+    """A stretch of transcript aligned to segment boundaries, with timestamps inline"""
+    start: float
+    end: float
+    text: str
+
+def _timestamp(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours:02d}:{minutes:02d}:{secs:02d}'
+
+def _digest(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def transcript_windows(content: Optional[str], segments: Optional[SegmentList], window_seconds: float,
+                       max_chars: int) -> List[Window]:
+    """Windows of a transcript: by segment start time, or by length when there are no segments"""
+    if segments:
+        return [
+            Window(part.starts[0], part.ends[-1],
+                   '\n'.join(f"[{_timestamp(segment['start'])}] {segment['text'].strip()}" for segment in part))
+            for part in segments.windows(window_seconds)
+        ]
+    windows, text = [], (content or '').strip()
+    while text:
+        cut = len(text) if len(text) <= max_chars else (text.rfind(' ', 0, max_chars) + 1 or max_chars)
+        windows.append(Window(0.0, 0.0, text[:cut].strip()))
+        text = text[cut:].lstrip()
+    return windows
+
+class PostProcessor:
+    """Derived content (summaries, chapters, show notes) written from transcripts by a chat model.
+
+    Transcripts are split into windows of ``POSTPROCESS_WINDOW_SECONDS`` by
+    segment start time, so a re-run or correction only changes the windows
+    it touches. Windows are prompted concurrently, at most
+    ``POSTPROCESS_CONCURRENCY`` calls at a time, and their results merged in
+    groups of ``POSTPROCESS_MERGE_FAN_IN``. Every call is cached in
+    ``prompt_outputs`` by model, prompt and input, so unchanged windows cost
+    no tokens; the final content is stored per transcript with the hashes
+    it was made from. Kinds listed in ``POSTPROCESS_TASKS`` are generated
+    after each transcription completes.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.auto_tasks: List[str] = []
+        self.api_key: Optional[str] = None
+        self._client = None
+        self._limit: Optional[asyncio.Semaphore] = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure the model, windows and automatic tasks from the application"""
+        tasks = app.config.get('POSTPROCESS_TASKS') or ()
+        if isinstance(tasks, str):
+            tasks = [task.strip() for task in tasks.split(',') if task.strip()]
+        for task in tasks:
+            if task not in TASKS:
+                logger.warning(f"Ignoring unknown post-processing task {task!r}")
+        self.auto_tasks = [task for task in tasks if task in TASKS]
+        self.model = app.config.get('POSTPROCESS_MODEL', 'gpt-4o-mini')
+        self.api_key = app.config.get('POSTPROCESS_API_KEY') or os.getenv('OPENAI_API_KEY')
+        self.base_url = app.config.get('POSTPROCESS_BASE_URL') or os.getenv('OPENAI_BASE_URL')
+        self.concurrency = app.config.get('POSTPROCESS_CONCURRENCY', 4)
+        self.window_seconds = app.config.get('POSTPROCESS_WINDOW_SECONDS', 600)
+        self.max_window_chars = app.config.get('POSTPROCESS_MAX_WINDOW_CHARS', 12000)
+        self.merge_fan_in = max(2, app.config.get('POSTPROCESS_MERGE_FAN_IN', 8))
+        app.extensions['postprocessor'] = self
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    # Model calls (on the job runner loop, which owns the client)
+
+    def _get_client(self):
+        if self._client is None:
+            from openai import AsyncOpenAI
+            self._client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+            self._limit = asyncio.Semaphore(self.concurrency)
+        return self._client
+
+    async def _ask(self, kind: str, prompt: str, text: str, max_tokens: int) -> Tuple[str, int, int]:
+        client = self._get_client()
+        async with self._limit:
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=[{'role': 'system', 'content': prompt}, {'role': 'user', 'content': text}],
+                max_tokens=max_tokens,
+                temperature=0.2
+            )
+        usage = response.usage
+        input_tokens, output_tokens = (usage.prompt_tokens, usage.completion_tokens) if usage else (0, 0)
+        POSTPROCESS_CALLS.inc(kind=kind, source='model')
+        POSTPROCESS_TOKENS.inc(input_tokens, kind=kind, direction='input')
+        POSTPROCESS_TOKENS.inc(output_tokens, kind=kind, direction='output')
+        return (response.choices[0].message.content or '').strip(), input_tokens, output_tokens
+
+    @staticmethod
+    def _cached_outputs(keys: Set[str]) -> Dict[str, str]:
+        return dict(db.session.query(PromptOutput.key, PromptOutput.output).filter(PromptOutput.key.in_(keys)).all())
+
+    @staticmethod
+    def _store_outputs(outputs: Dict[str, Tuple[str, int, int]]) -> None:
+        for key, (output, input_tokens, output_tokens) in outputs.items():
+            db.session.merge(PromptOutput(key=key, output=output, input_tokens=input_tokens,
+                                          output_tokens=output_tokens))
+        db.session.commit()
+
+    async def _complete_all(self, kind: str, prompt: str, inputs: List[str], max_tokens: int,
+                            refresh: bool = False) -> List[str]:
+        """Answer prompt for each input, calling the model only for inputs not answered before"""
+        keys = [_digest(self.model, prompt, text) for text in inputs]
+        answers = {} if refresh else await db_executor.run(self._cached_outputs, set(keys))
+        missing = {key: text for key, text in zip(keys, inputs) if key not in answers}
+        POSTPROCESS_CALLS.inc(len(keys) - len(missing), kind=kind, source='cache')
+        if missing:
+            results = await asyncio.gather(
+                *(self._ask(kind, prompt, text, max_tokens) for text in missing.values()), return_exceptions=True
+            )
+            # Keep what succeeded so a retry only repeats the calls that failed
+            fresh = {key: result for key, result in zip(missing, results) if not isinstance(result, BaseException)}
+            if fresh:
+                await db_executor.write(self._store_outputs, fresh)
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            answers.update({key: result[0] for key, result in fresh.items()})
+        return [answers[key] for key in keys]
+
+    async def _merge(self, kind: str, task: Task, parts: List[str], refresh: bool) -> str:
+        """Merge window results in groups until one remains"""
+        while len(parts) > 1:
+            groups = [parts[i:i + self.merge_fan_in] for i in range(0, len(parts), self.merge_fan_in)]
+            merged = iter(await self._complete_all(
+                kind, task.merge_prompt, ['\n\n'.join(group) for group in groups if len(group) > 1],
+                task.max_tokens, refresh
+            ))
+            parts = [next(merged) if len(group) > 1 else group[0] for group in groups]
+        return parts[0]
+
+    # Derived content
+
+    def _load_windows(self, transcript_id: int) -> List[Window]:
+        transcript = db.session.get(Transcript, transcript_id)
+        if transcript is None or transcript.status != TranscriptStatus.COMPLETED or not transcript.content:
+            raise PostProcessError('Transcript has no completed content')
+        return transcript_windows(transcript.content, transcript.segments, self.window_seconds,
+                                  self.max_window_chars)
+
+    @staticmethod
+    def _current(transcript_id: int, kind: str) -> Optional[Dict[str, Any]]:
+        derived = DerivedContent.query.filter_by(transcript_id=transcript_id, kind=kind).first()
+        if derived is None:
+            return None
+        return {**derived.to_dict(), 'prompt_hash': derived.prompt_hash, 'source_hash': derived.source_hash}
+
+    @staticmethod
+    def _save(transcript_id: int, kind: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        derived = DerivedContent.query.filter_by(transcript_id=transcript_id, kind=kind).first()
+        if derived is None:
+            if db.session.get(Transcript, transcript_id) is None:
+                return None  # Deleted while generating
+            derived = DerivedContent(transcript_id=transcript_id, kind=kind)
+            db.session.add(derived)
+        for name, value in fields.items():
+            setattr(derived, name, value)
+        db.session.commit()
+        return derived.to_dict()
+
+    async def generate(self, transcript_id: int, kind: str, refresh: bool = False) -> Dict[str, Any]:
+        """Create or update one kind of derived content; refresh ignores every cached answer"""
+        task = TASKS[kind]
+        windows = await db_executor.run(self._load_windows, transcript_id)
+        if not windows:
+            raise PostProcessError('Transcript is empty')
+        prompt_hash = _digest(self.model, task.window_prompt, task.merge_prompt)
+        source_hash = _digest(*(window.text for window in windows))
+        current = await db_executor.run(self._current, transcript_id, kind)
+        if (not refresh and current is not None and current['status'] == TranscriptStatus.COMPLETED
+                and current['prompt_hash'] == prompt_hash and current['source_hash'] == source_hash):
+            return {key: value for key, value in current.items() if not key.endswith('_hash')}
+
+        await db_executor.write(self._save, transcript_id, kind, status=TranscriptStatus.PROCESSING, error=None)
+        try:
+            outputs = await self._complete_all(kind, task.window_prompt, [window.text for window in windows],
+                                               task.max_tokens, refresh)
+            if len(outputs) == 1:
+                content = outputs[0]
+            else:
+                parts = [f'[{_timestamp(window.start)} - {_timestamp(window.end)}]\n{output}'
+                         for window, output in zip(windows, outputs)]
+                content = await self._merge(kind, task, parts, refresh)
+        except Exception as e:
+            logger.error(f"Post-processing {kind} for transcript {transcript_id} failed: {str(e)}")
+            await db_executor.write(self._save, transcript_id, kind, status=TranscriptStatus.FAILED, error=str(e))
+            raise PostProcessError(f'Could not generate {kind}: {str(e)}') from e
+
+        logger.info(f"Generated {kind} for transcript {transcript_id} from {len(windows)} windows")
+        return await db_executor.write(
+            self._save, transcript_id, kind, status=TranscriptStatus.COMPLETED, content=content, error=None,
+            prompt_hash=prompt_hash, source_hash=source_hash, windows=len(windows)
+        )
+
+    def run(self, transcript_id: int, kind: str, refresh: bool = False):
+        """Generate on the job runner loop from any thread; returns a concurrent future"""
+        return job_runner.run_coroutine(self.generate(transcript_id, kind, refresh))
+
+    def schedule(self, transcript_id: int) -> None:
+        """Generate the POSTPROCESS_TASKS kinds for a transcript that just completed, in the background"""
+        if not self.enabled:
+            return
+        for kind in self.auto_tasks:
+            self.run(transcript_id, kind)
+
+postprocessor = PostProcessor()
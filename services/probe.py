@@ -0,0 +1,219 @@
+import asyncio
+import json
+import logging
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+from flask import Flask
+
+logger = logging.getLogger(__name__)
+
+class ProbeError(Exception):
+    """Raised when a file is not readable media"""
+    pass
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """Container and audio stream properties of a media file"""
+    size: int
+    duration: Optional[float] = None  # Seconds; None when no prober could tell
+    format_name: Optional[str] = None
+    codec: Optional[str] = None
+    channels: Optional[int] = None
+    sample_rate: Optional[int] = None
+    bit_rate: Optional[int] = None
+    has_video: bool = False
+
+    @property
+    def duration_ms(self) -> Optional[int]:
+        return int(self.duration * 1000) if self.duration is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+# WAVE format tags that matter for codec naming
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_ALAW = 0x0006
+WAVE_FORMAT_MULAW = 0x0007
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+def _wav_codec(tag: int, bits: int) -> str:
+    if tag == WAVE_FORMAT_PCM:
+        return 'pcm_u8' if bits == 8 else f'pcm_s{bits}le'
+    if tag == WAVE_FORMAT_IEEE_FLOAT:
+        return f'pcm_f{bits}le'
+    if tag == WAVE_FORMAT_ALAW:
+        return 'pcm_alaw'
+    if tag == WAVE_FORMAT_MULAW:
+        return 'pcm_mulaw'
+    return f'wav_0x{tag:04x}'
+
+def parse_wav_header(path: Union[str, Path]) -> Optional[MediaInfo]:
+    """Read duration and format from a RIFF/RF64 WAV header without decoding samples.
+
+    Returns None if the file is not a WAV file and raises ProbeError if it
+    claims to be one but the header is unusable.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] not in (b'RIFF', b'RF64') or header[8:12] != b'WAVE':
+            return None
+
+        fmt = None
+        ds64_data_size = None
+        data_size = data_offset = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                break
+            chunk_id, chunk_size = chunk[:4], struct.unpack('<I', chunk[4:])[0]
+            if chunk_id == b'data':
+                data_size, data_offset = chunk_size, f.tell()
+                break
+            if chunk_id in (b'fmt ', b'ds64'):
+                body = f.read(chunk_size)
+                if chunk_id == b'fmt ' and len(body) >= 16:
+                    tag, channels, sample_rate, byte_rate, _, bits = struct.unpack('<HHIIHH', body[:16])
+                    if tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                        tag = struct.unpack('<H', body[24:26])[0]
+                    fmt = (tag, channels, sample_rate, byte_rate, bits)
+                elif chunk_id == b'ds64' and len(body) >= 16:
+                    ds64_data_size = struct.unpack('<Q', body[8:16])[0]
+                if chunk_size & 1:
+                    f.seek(1, 1)
+            else:
+                # Chunks are word aligned
+                f.seek(chunk_size + (chunk_size & 1), 1)
+
+    if fmt is None or data_offset is None:
+        raise ProbeError(f"Malformed WAV header in {path.name}")
+    tag, channels, sample_rate, byte_rate, bits = fmt
+
+    if data_size == 0xFFFFFFFF and ds64_data_size is not None:
+        data_size = ds64_data_size
+    # Streamed or truncated files carry a placeholder size; trust the file length instead
+    if data_size in (0, 0xFFFFFFFF) or data_offset + data_size > size:
+        data_size = size - data_offset
+
+    return MediaInfo(
+        size=size,
+        duration=data_size / byte_rate if byte_rate else None,
+        format_name='wav',
+        codec=_wav_codec(tag, bits),
+        channels=channels,
+        sample_rate=sample_rate,
+        bit_rate=byte_rate * 8,
+    )
+
+def _int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+async def ffprobe(path: Union[str, Path]) -> Optional[MediaInfo]:
+    """Read container metadata with ffprobe; None if ffprobe is not installed"""
+    path = Path(path)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            'ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', str(path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError:
+        return None
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise ProbeError(f"ffprobe could not read {path.name}: {stderr.decode(errors='replace').strip()}")
+
+    try:
+        data = json.loads(stdout)
+    except ValueError as e:
+        raise ProbeError(f"Invalid ffprobe output for {path.name}: {str(e)}")
+    streams = data.get('streams', [])
+    container = data.get('format', {})
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+    if audio is None:
+        raise ProbeError(f"No audio stream in {path.name}")
+    has_video = any(
+        s.get('codec_type') == 'video' and not s.get('disposition', {}).get('attached_pic')
+        for s in streams
+    )
+
+    return MediaInfo(
+        size=path.stat().st_size,
+        duration=_float(container.get('duration')) or _float(audio.get('duration')),
+        format_name=container.get('format_name'),
+        codec=audio.get('codec_name'),
+        channels=_int(audio.get('channels')),
+        sample_rate=_int(audio.get('sample_rate')),
+        bit_rate=_int(audio.get('bit_rate')) or _int(container.get('bit_rate')),
+        has_video=has_video,
+    )
+
+class MediaProber:
+    """Probe media files from their headers, caching results per file version.
+
+    WAV files are read natively; everything else goes through ffprobe. The
+    cache is keyed by path, size and mtime, so a file that changes on disk is
+    probed again.
+    """
+
+    def __init__(self, app: Optional[Flask] = None, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[Tuple[str, int, int], MediaInfo]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._warned_missing = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure cache size from the application"""
+        self.cache_size = app.config.get('PROBE_CACHE_SIZE', self.cache_size)
+        app.extensions['media_prober'] = self
+
+    async def probe(self, path: Union[str, Path]) -> MediaInfo:
+        """Return media properties for a file or raise ProbeError"""
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except OSError as e:
+            raise ProbeError(f"Cannot read {path.name}: {str(e)}")
+        key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            info = self._cache.get(key)
+            if info is not None:
+                self._cache.move_to_end(key)
+                return info
+
+        info = parse_wav_header(path) or await ffprobe(path)
+        if info is None:
+            if not self._warned_missing:
+                logger.warning("ffprobe not found; media duration and format checks are limited to WAV files")
+                self._warned_missing = True
+            return MediaInfo(size=stat.st_size)
+
+        with self._lock:
+            self._cache[key] = info
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return info
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+media_prober = MediaProber()
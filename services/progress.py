@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from flask import Flask
+from models import db, StageRate
+from services.metrics import STAGE_RATE
+
+logger = logging.getLogger(__name__)
+
+ANY_PROVIDER = '*'
+
+# Starting points (wall seconds per media second) until a stage has been measured
+DEFAULT_RATES = {
+    'extract_audio': 0.02,
+    'chunk_export': 0.005,
+    'provider_request': 0.05,
+}
+
+# Backends far off the cross-provider rate until measured: local CPU decoding runs near real time
+DEFAULT_PROVIDER_RATES = {
+    ('provider_request', 'local'): 0.5,
+}
+
+class ThroughputModel:
+    """Rolling per-stage, per-provider speeds measured from finished work.
+
+    Each stage's cost is modelled as linear in media duration: an
+    exponentially weighted average of wall seconds per media second, kept
+    both per provider and across providers. Rates are loaded from and
+    flushed to the ``stage_rates`` table so estimates survive restarts.
+    """
+
+    def __init__(self, app: Optional[Flask] = None, smoothing: float = 0.2):
+        self.smoothing = smoothing
+        self._rates: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self.loaded = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure smoothing from the application"""
+        self.smoothing = app.config.get('THROUGHPUT_SMOOTHING', self.smoothing)
+        app.extensions['throughput_model'] = self
+
+    def rate(self, stage: str, provider: str = ANY_PROVIDER) -> float:
+        """Wall seconds per media second for a stage, falling back to the cross-provider rate and defaults"""
+        with self._lock:
+            entry = self._rates.get((stage, provider))
+            if entry is None and (stage, provider) not in DEFAULT_PROVIDER_RATES:
+                entry = self._rates.get((stage, ANY_PROVIDER))
+        if entry:
+            return entry[0]
+        return DEFAULT_PROVIDER_RATES.get((stage, provider), DEFAULT_RATES.get(stage, 0.0))
+
+    def estimate(self, stage: str, media_seconds: Optional[float], provider: str = ANY_PROVIDER) -> float:
+        """Expected wall seconds for a stage over media_seconds of audio"""
+        return self.rate(stage, provider) * (media_seconds or 0)
+
+    def estimate_job(self, media_seconds: Optional[float], extract: bool = False) -> float:
+        """Expected wall seconds for a whole job, for queued ETAs and capacity planning"""
+        stages = ['chunk_export', 'provider_request'] + (['extract_audio'] if extract else [])
+        return sum(self.estimate(stage, media_seconds) for stage in stages)
+
+    def observe(self, stage: str, media_seconds: Optional[float], wall_seconds: float,
+                provider: str = ANY_PROVIDER) -> None:
+        """Fold a measured stage run into the rolling rates"""
+        if not media_seconds or media_seconds <= 0:
+            return
+        sample = wall_seconds / media_seconds
+        keys = {(stage, provider), (stage, ANY_PROVIDER)}
+        with self._lock:
+            for key in keys:
+                rate, samples = self._rates.get(key, (sample, 0))
+                rate = sample if samples == 0 else rate + self.smoothing * (sample - rate)
+                self._rates[key] = (rate, samples + 1)
+                self._dirty.add(key)
+        for stage_key, provider_key in keys:
+            STAGE_RATE.set(self._rates[(stage_key, provider_key)][0], stage=stage_key, provider=provider_key)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current rates keyed by 'stage/provider'"""
+        with self._lock:
+            return {
+                f'{stage}/{provider}': {'rate': rate, 'samples': samples}
+                for (stage, provider), (rate, samples) in sorted(self._rates.items())
+            }
+
+    # Persistence (call through the DB executor)
+
+    def load(self) -> None:
+        """Read persisted rates; measurements already taken in this process win"""
+        rows = StageRate.query.all()
+        with self._lock:
+            for row in rows:
+                key = (row.stage, row.provider)
+                if key not in self._rates:
+                    self._rates[key] = (row.rate, row.samples)
+                    STAGE_RATE.set(row.rate, stage=row.stage, provider=row.provider)
+            self.loaded = True
+
+    def flush(self) -> None:
+        """Write rates that changed since the last flush"""
+        with self._lock:
+            dirty = {key: self._rates[key] for key in self._dirty}
+            self._dirty.clear()
+        if not dirty:
+            return
+        rows = {
+            (row.stage, row.provider): row
+            for row in StageRate.query.filter(StageRate.stage.in_({stage for stage, _ in dirty})).all()
+        }
+        for (stage, provider), (rate, samples) in dirty.items():
+            row = rows.get((stage, provider))
+            if row is None:
+                db.session.add(StageRate(stage=stage, provider=provider, rate=rate, samples=samples))
+            else:
+                row.rate, row.samples = rate, samples
+        db.session.commit()
+
+@dataclass
+class _Step:
+    stage: str
+    provider: str
+    media_seconds: float
+    expected: float
+    started: Optional[float] = None
+    done: bool = False
+
+class JobProgress:
+    """Progress, ETA and throughput for one job from its planned steps and measured rates.
+
+    Steps are planned as soon as they are known (audio extraction, then each
+    chunk's export and provider request) and marked off as they run; the
+    running step is credited with its elapsed time, capped below its
+    expected cost.
+    """
+
+    def __init__(self, model: ThroughputModel):
+        self.model = model
+        self.started = time.perf_counter()
+        self._steps: List[_Step] = []
+        self._transcribed = 0.0
+        self._reported = 0.0
+
+    def plan(self, stage: str, media_seconds: Optional[float], provider: str = ANY_PROVIDER) -> None:
+        """Add an upcoming step"""
+        media_seconds = media_seconds or 0
+        self._steps.append(_Step(stage, provider, media_seconds, self.model.estimate(stage, media_seconds, provider)))
+
+    @contextmanager
+    def step(self, stage: str, media_seconds: Optional[float] = None, provider: str = ANY_PROVIDER,
+             observe: bool = True) -> Iterator[None]:
+        """Mark the next planned step of this stage as running for the enclosed block.
+
+        On success the step's wall time is fed back into the model unless
+        ``observe`` is False (provider requests record their own, per provider).
+        """
+        step = next((s for s in self._steps if s.stage == stage and not s.done and s.started is None), None)
+        if step is None:
+            self.plan(stage, media_seconds, provider)
+            step = self._steps[-1]
+        step.started = time.perf_counter()
+        yield
+        step.done = True
+        if observe:
+            self.model.observe(stage, step.media_seconds, time.perf_counter() - step.started, step.provider)
+        if stage == 'provider_request':
+            self._transcribed += step.media_seconds
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """Percent complete, seconds left and media seconds transcribed per wall second"""
+        now = time.perf_counter()
+        total = done = 0.0
+        for step in self._steps:
+            total += step.expected
+            if step.done:
+                done += step.expected
+            elif step.started is not None:
+                done += min(now - step.started, 0.95 * step.expected)
+        elapsed = now - self.started
+        # Planning later steps grows the total, so never report going backwards
+        percent = 100 * done / total if total else 0.0
+        self._reported = max(self._reported, min(percent, 99.0))
+        return {
+            'progress': round(self._reported, 1),
+            'eta_seconds': round(max(total - done, 0.0), 1) if total else None,
+            'throughput': round(self._transcribed / elapsed, 3) if elapsed > 0 and self._transcribed else None,
+        }
+
+throughput_model = ThroughputModel()
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple
+from flask import Flask
+
+# Transcription providers; a job starts with one and falls back to the other
+PROVIDERS = ('groq', 'openai')
+
+SUCCESS = 'success'
+ERROR = 'error'
+RATE_LIMITED = 'rate_limited'
+
+class ProviderHealth:
+    """Recent request outcomes per transcription provider, as seen by this process.
+
+    Keeps a sliding window of outcomes for the error rate and, when a
+    provider answers 429, how long it asked callers to back off.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.window = 60.0
+        self.min_samples = 5
+        self.max_error_rate = 0.5
+        self._outcomes: Dict[str, Deque[Tuple[float, bool]]] = {}
+        self._limited_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure the window and error threshold from the application"""
+        self.window = app.config.get('PROVIDER_HEALTH_WINDOW', 60.0)
+        self.min_samples = app.config.get('PROVIDER_HEALTH_MIN_SAMPLES', 5)
+        self.max_error_rate = app.config.get('PROVIDER_MAX_ERROR_RATE', 0.5)
+        app.extensions['provider_health'] = self
+
+    def record(self, provider: str, outcome: str, retry_after: Optional[float] = None) -> None:
+        """Fold one finished request into the provider's window; cancelled requests are ignored"""
+        if outcome not in (SUCCESS, ERROR, RATE_LIMITED):
+            return
+        now = time.monotonic()
+        with self._lock:
+            outcomes = self._outcomes.setdefault(provider, deque())
+            outcomes.append((now, outcome == SUCCESS))
+            self._trim(outcomes, now)
+            if outcome == RATE_LIMITED:
+                until = now + (retry_after if retry_after is not None else 1.0)
+                self._limited_until[provider] = max(self._limited_until.get(provider, 0.0), until)
+
+    def _trim(self, outcomes: Deque[Tuple[float, bool]], now: float) -> None:
+        while outcomes and outcomes[0][0] < now - self.window:
+            outcomes.popleft()
+
+    def error_rate(self, provider: str) -> Optional[float]:
+        """Share of failed requests in the window, or None with too few samples to tell"""
+        with self._lock:
+            outcomes = self._outcomes.get(provider)
+            if outcomes is None:
+                return None
+            self._trim(outcomes, time.monotonic())
+            if len(outcomes) < self.min_samples:
+                return None
+            return sum(1 for _, ok in outcomes if not ok) / len(outcomes)
+
+    def limited_for(self, provider: str) -> float:
+        """Seconds until a rate-limited provider said it would accept requests again"""
+        with self._lock:
+            return max(0.0, self._limited_until.get(provider, 0.0) - time.monotonic())
+
+    def healthy(self, provider: str) -> bool:
+        """Not backing off a rate limit and not mostly failing"""
+        if self.limited_for(provider) > 0:
+            return False
+        error_rate = self.error_rate(provider)
+        return error_rate is None or error_rate < self.max_error_rate
+
+    def any_healthy(self, providers: Iterable[str]) -> bool:
+        return any(self.healthy(provider) for provider in providers)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._outcomes.clear()
+            self._limited_until.clear()
+
+provider_health = ProviderHealth()
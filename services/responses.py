@@ -0,0 +1,151 @@
+import gzip
+import logging
+import mimetypes
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+import click
+from flask import Flask, Response, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml', 'text/csv',
+    'text/css', 'text/html', 'text/javascript', 'text/plain', 'text/xml',
+}
+# Precompressed static variants, best first
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def _compress(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def _accepts(encoding: str) -> bool:
+    return request.accept_encodings[encoding] > 0
+
+def negotiate_encoding() -> Optional[str]:
+    """Best encoding this server can produce that the client accepts"""
+    if brotli is not None and _accepts('br'):
+        return 'br'
+    if _accepts('gzip'):
+        return 'gzip'
+    return None
+
+class ResponseCompressor:
+    """gzip/brotli for dynamic responses and precompressed variants for static files.
+
+    Dynamic bodies of compressible types above ``COMPRESS_MIN_BYTES`` are
+    compressed after the view runs; streamed and file responses are left
+    alone. Static files are served from a ``.br`` or ``.gz`` sibling when
+    the client accepts it and it is not older than the original; ``flask
+    compress-static`` writes those siblings at deploy time.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.min_bytes = 1024
+        self.level = 6
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Install the compression hook, the precompressed static view and the CLI command"""
+        self.min_bytes = app.config.get('COMPRESS_MIN_BYTES', 1024)
+        self.level = app.config.get('COMPRESS_LEVEL', 6)
+        app.after_request(self.compress_response)
+        if app.has_static_folder:
+            static_folder = Path(app.static_folder)
+            app.view_functions['static'] = lambda filename: self.send_static(static_folder, filename)
+            app.cli.add_command(self._compress_static_command(static_folder))
+        app.extensions['response_compressor'] = self
+
+    def compress_response(self, response: Response) -> Response:
+        """Compress a dynamic response body when worthwhile and accepted"""
+        response.vary.add('Accept-Encoding')
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_bytes:
+            return response
+
+        response.set_data(_compress(data, encoding, self.level))
+        response.headers['Content-Encoding'] = encoding
+        # Each encoding is a different byte sequence of the same representation
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def send_static(self, static_folder: Path, filename: str) -> Response:
+        """Serve a static file, preferring a fresh precompressed variant the client accepts"""
+        source = static_folder / filename
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        for encoding, suffix in STATIC_ENCODINGS:
+            variant = source.with_name(source.name + suffix)
+            if (_accepts(encoding) and variant.is_file() and source.is_file()
+                    and variant.stat().st_mtime >= source.stat().st_mtime):
+                response = send_from_directory(static_folder, filename + suffix, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                response.vary.add('Accept-Encoding')
+                return response
+        return send_from_directory(static_folder, filename)
+
+    def _compress_static_command(self, static_folder: Path) -> click.Command:
+        @click.command('compress-static')
+        def compress_static():
+            """Write .gz (and, with brotli installed, .br) variants of compressible static files."""
+            written = 0
+            for path in sorted(static_folder.rglob('*')):
+                if (not path.is_file() or path.suffix in ('.gz', '.br')
+                        or mimetypes.guess_type(path.name)[0] not in COMPRESSIBLE_TYPES
+                        or path.stat().st_size < self.min_bytes):
+                    continue
+                data = path.read_bytes()
+                for encoding, suffix in STATIC_ENCODINGS:
+                    if encoding == 'br' and brotli is None:
+                        continue
+                    path.with_name(path.name + suffix).write_bytes(_compress(data, encoding, 11 if encoding == 'br' else 9))
+                    written += 1
+            click.echo(f'Wrote {written} precompressed files')
+        return compress_static
+
+def _http_date(value: datetime) -> datetime:
+    """Naive UTC timestamps from the database as aware HTTP dates, rounded up to the next whole second.
+
+    Rounding down would date a later write in the same second no newer
+    than the copy a client already holds.
+    """
+    return value.replace(tzinfo=value.tzinfo or timezone.utc, microsecond=0) + timedelta(seconds=1)
+
+def not_modified(etag: str, last_modified: Optional[datetime]) -> Optional[Response]:
+    """A 304 response if the client's cached copy is current, else None"""
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(etag)
+    else:
+        since = request.if_modified_since
+        fresh = since is not None and last_modified is not None and _http_date(last_modified) <= since
+    if not fresh:
+        return None
+    return with_validators(Response(status=304), etag, last_modified)
+
+def with_validators(response: Response, etag: str, last_modified: Optional[datetime]) -> Response:
+    """Attach ETag and Last-Modified and require revalidation before reuse"""
+    response.set_etag(etag)
+    if last_modified is not None:
+        http_date = _http_date(last_modified)
+        # Until that second has passed, another write could still land inside it unnoticed
+        if http_date <= datetime.now(timezone.utc):
+            response.last_modified = http_date
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+response_compressor = ResponseCompressor()
@@ -0,0 +1,98 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Tuple
+from flask import Flask
+
+# Seconds of estimated media a job "earns back" per second it waits, so long
+# jobs are never starved by a steady stream of short ones
+DEFAULT_AGING_RATE = 10.0
+MIN_PRIORITY = -5
+MAX_PRIORITY = 5
+
+def clamp_priority(level: Optional[int]) -> int:
+    """Clamp a user-supplied priority to the supported range"""
+    return max(MIN_PRIORITY, min(MAX_PRIORITY, int(level or 0)))
+
+def schedule_key(cost_seconds: Optional[float], priority: int, submitted: float,
+                 aging_rate: float = DEFAULT_AGING_RATE) -> float:
+    """Ordering key for work items; lower runs first.
+
+    Cost is the estimated media seconds left, halved for every priority level.
+    Age is folded in through the absolute submit time, so keys stay comparable
+    as time passes without being recomputed.
+    """
+    cost = cost_seconds if cost_seconds is not None else 600.0
+    return cost * (2.0 ** -priority) + aging_rate * submitted
+
+class ChunkScheduler:
+    """Priority slots for provider requests shared by all running jobs.
+
+    Every chunk request acquires a slot keyed by its job's remaining cost,
+    priority and age. Because a job gives its slot back between chunks, a
+    short or urgent job that arrives later is served at the next chunk
+    boundary instead of after the whole long job (preemption at chunk
+    granularity), and chunks from different jobs interleave.
+
+    A job sends its chunks one at a time, so it never holds more than one
+    slot. ``MAX_CONCURRENT_CHUNKS`` therefore defaults to one less than
+    ``MAX_CONCURRENT_JOBS``. That leaves a job slot for a newcomer, which
+    then waits in the slot queue and overtakes the running jobs at their
+    next chunk boundary. With as many slots as jobs nothing would ever wait.
+    """
+
+    def __init__(self, slots: int = 4, aging_rate: float = DEFAULT_AGING_RATE):
+        self.slots = slots
+        self.aging_rate = aging_rate
+        self._free = slots
+        self._waiters: List[Tuple[float, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    def init_app(self, app: Flask) -> None:
+        """Configure slot count from the application"""
+        self.slots = app.config.get('MAX_CONCURRENT_CHUNKS', max(1, app.config.get('MAX_CONCURRENT_JOBS', 4) - 1))
+        self.aging_rate = app.config.get('SCHEDULER_AGING_RATE', DEFAULT_AGING_RATE)
+        self._free = self.slots
+        app.extensions['chunk_scheduler'] = self
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    @asynccontextmanager
+    async def slot(self, remaining_seconds: Optional[float], priority: int = 0,
+                   submitted: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold a provider slot for one chunk request"""
+        key = schedule_key(remaining_seconds, priority,
+                           submitted if submitted is not None else time.monotonic(), self.aging_rate)
+        await self._acquire(key)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, key: float) -> None:
+        if self._free > 0 and not self.waiting:
+            self._free -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (key, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # If the slot was handed to us just as we were cancelled, pass it on
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._free += 1
+
+chunk_scheduler = ChunkScheduler()
@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from flask import Flask
+from sqlalchemy import func, update
+from models import db, Schedule, Transcript
+from services.admission import Load, admission_controller
+from services.database import db_executor
+from services.jobs import BATCH, DATABASE_QUEUE, Job, job_runner
+from services.local_whisper import local_whisper
+from services.metrics import SCHEDULED_JOBS_RELEASED
+from services.page_cache import bump_version
+from services.provider_health import PROVIDERS, provider_health
+from services.shared_storage import shared_storage
+from services.workers import Cluster
+from utils.common import TranscriptStatus
+
+logger = logging.getLogger(__name__)
+
+# Schedule modes: a daily time window, or whenever the service is idle
+WINDOW = 'window'
+IDLE = 'idle'
+MODES = (WINDOW, IDLE)
+
+# Schedule statuses
+ACTIVE = 'active'
+PAUSED = 'paused'
+COMPLETED = 'completed'
+
+_CLOCK = re.compile(r'^([01]?\d|2[0-3]):([0-5]\d)$')
+
+def parse_clock(value: Any) -> str:
+    """Normalize an HH:MM time of day, raising ValueError if it is not one"""
+    match = _CLOCK.match(str(value or '').strip())
+    if not match:
+        raise ValueError(f'Invalid time of day: {value!r}')
+    return f'{int(match.group(1)):02d}:{match.group(2)}'
+
+def _minutes(clock: str) -> int:
+    hours, minutes = clock.split(':')
+    return int(hours) * 60 + int(minutes)
+
+def window_open(start: str, end: str, minute_of_day: int) -> bool:
+    """Whether a daily window contains a minute of the day; an end before the start spans midnight"""
+    start, end = _minutes(start), _minutes(end)
+    if start == end:
+        return True
+    if start < end:
+        return start <= minute_of_day < end
+    return minute_of_day >= start or minute_of_day < end
+
+class ScheduleManager:
+    """Release held transcripts to the job queue when their schedule and the spare capacity allow.
+
+    Transcripts created against a schedule wait in ``scheduled`` status with
+    their upload staged. Every ``SCHEDULE_INTERVAL`` seconds the releaser
+    (on the job runner loop of nodes that run jobs) works out the headroom:
+    job slots left after running and queued work and the
+    ``SCHEDULE_RESERVED_SLOTS`` kept for interactive uploads, halved while a
+    provider is rate limiting or failing and zero while none can take work.
+    With ``JOB_QUEUE=database`` the slots and provider health are the
+    cluster's (see services.workers). Window schedules release into it
+    during their daily window in ``SCHEDULE_TIMEZONE``; idle schedules only
+    while nothing is queued and fewer than ``SCHEDULE_IDLE_UTILIZATION`` of
+    the slots are busy. No schedule runs more than its ``max_concurrent``
+    jobs at once. A release locks the open schedules' rows and counts the
+    load inside that transaction, so releasers on several nodes take turns
+    and never spend the same headroom twice.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.interval = 15.0
+        self.timezone = ZoneInfo('UTC')
+        self.reserved_slots = 1
+        self.idle_utilization = 0.5
+        self._future = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure release timing and headroom from the application"""
+        self.interval = app.config.get('SCHEDULE_INTERVAL', 15.0)
+        self.timezone = ZoneInfo(app.config.get('SCHEDULE_TIMEZONE', 'UTC'))
+        self.reserved_slots = app.config.get('SCHEDULE_RESERVED_SLOTS', 1)
+        self.idle_utilization = app.config.get('SCHEDULE_IDLE_UTILIZATION', 0.5)
+        app.extensions['schedule_manager'] = self
+
+    def is_open(self, schedule: Dict[str, Any], now: datetime) -> bool:
+        """Whether a schedule may release work at now (naive UTC)"""
+        if schedule['status'] != ACTIVE:
+            return False
+        if schedule['not_before'] is not None and now < schedule['not_before']:
+            return False
+        if schedule['mode'] == IDLE:
+            return True
+        local = now.replace(tzinfo=ZoneInfo('UTC')).astimezone(self.timezone)
+        return window_open(schedule['window_start'], schedule['window_end'], local.hour * 60 + local.minute)
+
+    def headroom(self, load: Load, cluster: Optional[Cluster] = None) -> Tuple[int, int]:
+        """Jobs that may be released now, for window schedules and for idle ones.
+
+        Pass the cluster when load counts the shared queue, so provider health
+        is judged across the job nodes rather than by this node alone.
+        """
+        if cluster is None:
+            healthy = sum(1 for provider in PROVIDERS if provider_health.healthy(provider))
+            can_spill = local_whisper.can_spill
+        else:
+            healthy = sum(
+                1 for provider in PROVIDERS if cluster.healthy.get(provider) and not cluster.limited_for(provider)
+            )
+            can_spill = cluster.can_spill
+        if not healthy and not can_spill:
+            return 0, 0
+        reserved = min(self.reserved_slots, max(0, load.capacity - 1))
+        free = load.capacity - reserved - load.active - load.queued
+        if healthy < len(PROVIDERS):
+            # Leave the remaining provider's headroom to interactive work
+            free //= 2
+        idle = 0
+        if load.queued == 0:
+            idle = min(free, int(load.capacity * self.idle_utilization) - load.active)
+        return max(0, free), max(0, idle)
+
+    # Database work (through the DB executor)
+
+    @staticmethod
+    def _due() -> List[Dict[str, Any]]:
+        """Active schedules with held work, completing those with nothing left"""
+        pending = (TranscriptStatus.SCHEDULED, TranscriptStatus.QUEUED)
+        rows = db.session.query(
+            Schedule,
+            func.count(Transcript.id).filter(Transcript.status == TranscriptStatus.SCHEDULED),
+            func.count(Transcript.id).filter(
+                Transcript.status.in_(pending) | Transcript.status.like(f'{TranscriptStatus.PROCESSING.value}%')
+            )
+        ).outerjoin(Transcript, Transcript.schedule_id == Schedule.id).filter(
+            Schedule.status == ACTIVE
+        ).group_by(Schedule.id).order_by(Schedule.id).all()
+
+        due = []
+        for schedule, held, unfinished in rows:
+            if held:
+                due.append({
+                    'id': schedule.id, 'mode': schedule.mode, 'status': schedule.status,
+                    'window_start': schedule.window_start, 'window_end': schedule.window_end,
+                    'not_before': schedule.not_before, 'max_concurrent': schedule.max_concurrent,
+                })
+            elif not unfinished and schedule.transcripts.count():
+                schedule.status = COMPLETED
+                logger.info(f"Schedule {schedule.id} completed")
+        db.session.commit()
+        return due
+
+    def _release(self, schedules: List[Dict[str, Any]], load: Optional[Load]) -> List[Dict[str, Any]]:
+        """Move held transcripts of the open schedules into the job queue, up to the headroom.
+
+        Pass this runner's load in local-queue mode; with the shared queue
+        (load None) it is counted here, after the schedules are locked.
+        """
+        # Locking the schedule rows makes concurrent releases wait for this one and then count its jobs
+        locked = db.session.execute(
+            update(Schedule)
+            .where(Schedule.id.in_([schedule['id'] for schedule in schedules]), Schedule.status == ACTIVE)
+            .values(updated_at=datetime.utcnow())
+        )
+        if not locked.rowcount:
+            db.session.commit()
+            return []
+        active_ids = {schedule_id for (schedule_id,) in db.session.query(Schedule.id).filter(
+            Schedule.id.in_([schedule['id'] for schedule in schedules]), Schedule.status == ACTIVE
+        )}
+        cluster = None
+        if load is None:
+            load, cluster = admission_controller.shared_state()
+        window_room, idle_room = self.headroom(load, cluster)
+
+        released: List[Tuple[int, str]] = []
+        changed = False
+        # Windows are commitments, so they are served before idle schedules
+        for schedule in sorted(schedules, key=lambda s: (s['mode'] == IDLE, s['id'])):
+            if schedule['id'] not in active_ids:
+                continue
+            room = (idle_room if schedule['mode'] == IDLE else window_room) - len(released)
+            in_flight = db.session.query(func.count(Transcript.id)).filter(
+                Transcript.schedule_id == schedule['id'],
+                (Transcript.status == TranscriptStatus.QUEUED)
+                | Transcript.status.like(f'{TranscriptStatus.PROCESSING.value}%')
+            ).scalar()
+            limit = min(room, schedule['max_concurrent'] - in_flight)
+            if limit <= 0:
+                continue
+            candidates = db.session.query(
+                Transcript.id, Transcript.source_key, Transcript.priority, Transcript.estimated_seconds
+            ).filter(
+                Transcript.schedule_id == schedule['id'], Transcript.status == TranscriptStatus.SCHEDULED
+            ).order_by(Transcript.priority.desc(), Transcript.id).limit(limit).all()
+            for transcript_id, source_key, priority, estimated_seconds in candidates:
+                if not source_key or not shared_storage.local_path(source_key).exists():
+                    values = {'status': TranscriptStatus.FAILED, 'error': 'The upload is no longer available'}
+                else:
+                    values = {'status': TranscriptStatus.QUEUED,
+                              **job_runner.queue_fields(priority or 0, estimated_seconds)}
+                result = db.session.execute(
+                    update(Transcript)
+                    .where(Transcript.id == transcript_id, Transcript.status == TranscriptStatus.SCHEDULED)
+                    .values(values)
+                )
+                if result.rowcount and values['status'] == TranscriptStatus.QUEUED:
+                    released.append((transcript_id, schedule['mode']))
+                changed = changed or bool(result.rowcount)
+        if changed:
+            bump_version(db.session)
+        db.session.commit()
+
+        modes = dict(released)
+        rows = db.session.query(
+            Transcript.id, Transcript.title, Transcript.source_key, Transcript.batch_id, Transcript.priority,
+            Transcript.estimated_seconds, Transcript.job_options
+        ).filter(Transcript.id.in_(modes)).all() if released else []
+        return [
+            {'id': row[0], 'title': row[1], 'source_key': row[2], 'batch_id': row[3], 'priority': row[4] or 0,
+             'estimated_seconds': row[5], 'options': row[6] or {}, 'mode': modes[row[0]]}
+            for row in rows
+        ]
+
+    # Release loop
+
+    async def tick(self) -> int:
+        """Release whatever the open schedules and current headroom allow; returns the jobs released"""
+        now = datetime.utcnow()
+        schedules = [schedule for schedule in await db_executor.write(self._due) if self.is_open(schedule, now)]
+        if not schedules:
+            return 0
+        load = None
+        if job_runner.queue_mode != DATABASE_QUEUE:
+            load = await admission_controller.load()
+        rows = await db_executor.write(self._release, schedules, load)
+        for row in rows:
+            job_runner.submit(Job(
+                title=row['title'], file_path=shared_storage.local_path(row['source_key']),
+                transcript_id=row['id'], lane=BATCH, batch_id=row['batch_id'], priority=row['priority'],
+                estimated_seconds=row['estimated_seconds'], source_key=row['source_key'], options=row['options']
+            ))
+            SCHEDULED_JOBS_RELEASED.inc(mode=row['mode'])
+        if rows:
+            logger.info(f"Released {len(rows)} scheduled jobs")
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            # Sleep first so the schema is in place before the first query
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f"Releasing scheduled jobs failed: {str(e)}")
+
+    def start(self) -> None:
+        """Run the releaser on the job runner loop every SCHEDULE_INTERVAL seconds"""
+        if self._future is not None or not self.interval:
+            return
+        self._future = job_runner.run_coroutine(self._run())
+
+schedule_manager = ScheduleManager()
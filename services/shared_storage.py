@@ -0,0 +1,73 @@
+import logging
+import shutil
+from pathlib import Path
+from typing import Optional, Union
+from flask import Flask
+from werkzeug.utils import secure_filename
+
+logger = logging.getLogger(__name__)
+
+# Keys for files the job may read but must not remove (server-side batch imports)
+REFERENCE_PREFIX = 'file://'
+
+class SharedStorage:
+    """Resolve job uploads by key so that any node can reach them.
+
+    Without ``SHARED_STORAGE_ROOT`` (a single node) keys are plain local
+    paths and nothing moves. With it, accepted uploads are moved under that
+    directory, which must be mounted on every web and worker node, and keys
+    are paths relative to it. An object store backend would implement the
+    same three methods, downloading in ``local_path``.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.root: Optional[Path] = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Configure the shared root from the application"""
+        root = app.config.get('SHARED_STORAGE_ROOT')
+        self.root = Path(root).resolve() if root else None
+        if self.root is not None:
+            (self.root / 'uploads').mkdir(parents=True, exist_ok=True)
+        app.extensions['shared_storage'] = self
+
+    @property
+    def shared(self) -> bool:
+        return self.root is not None
+
+    def put(self, local_path: Union[str, Path]) -> str:
+        """Publish a job's upload and return its key"""
+        local_path = Path(local_path)
+        if self.root is None:
+            return str(local_path.resolve())
+        # Upload names derive from unique transcript titles, so they make unique keys
+        key = f'uploads/{secure_filename(local_path.name)}'
+        shutil.move(str(local_path), self.root / key)
+        return key
+
+    def reference(self, path: Union[str, Path]) -> str:
+        """Key for a read-only file that every node can already reach at the same path"""
+        return REFERENCE_PREFIX + str(Path(path).resolve())
+
+    @staticmethod
+    def is_reference(key: str) -> bool:
+        return key.startswith(REFERENCE_PREFIX)
+
+    def local_path(self, key: str) -> Path:
+        """Path this node can read the object from"""
+        if self.is_reference(key):
+            return Path(key[len(REFERENCE_PREFIX):])
+        return Path(key) if self.root is None else self.root / key
+
+    def delete(self, key: str) -> None:
+        """Remove an object; references are left alone"""
+        if self.is_reference(key):
+            return
+        try:
+            self.local_path(key).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not delete shared object {key}: {str(e)}")
+
+shared_storage = SharedStorage()
@@ -0,0 +1,213 @@
+import logging
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Set
+from flask import Flask
+from werkzeug.utils import secure_filename
+from models import db, Transcript
+from services.file_handler import FileHandler
+from services.probe import MediaInfo
+from services.shared_storage import shared_storage
+from utils.common import TranscriptStatus
+
+logger = logging.getLogger(__name__)
+
+class InsufficientStorageError(Exception):
+    """Raised when a job cannot reserve enough disk space"""
+    pass
+
+class StorageManager:
+    """Reserve disk space per job and own every temporary artifact it creates.
+
+    Jobs reserve an estimate of the space they will need before they are
+    admitted; reservations are counted against free space so concurrent jobs
+    cannot jointly overcommit the disk. Files created for a job live under
+    ``<UPLOAD_FOLDER>/temp/<job>/`` or are registered with ``track`` and are
+    removed together by ``cleanup``. The age-based sweep keeps the uploads of
+    unfinished transcripts, which may be held by a schedule for days or owned
+    by another process, so it only runs on nodes that run jobs.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.app = None
+        self._lock = threading.Lock()
+        self._reservations: Dict[str, int] = {}
+        self._artifacts: Dict[str, Set[Path]] = {}
+        self._sweeper = None
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Bind the manager to an application"""
+        self.app = app
+        self.file_handler = FileHandler(app)
+        self.upload_dir = self.file_handler.upload_dir
+        self.temp_dir = self.file_handler.temp_dir
+        self.headroom = app.config.get('STORAGE_HEADROOM_BYTES', 1024 * 1024 * 1024)
+        self.sweep_interval = app.config.get('STORAGE_SWEEP_INTERVAL', 3600)
+        app.extensions['storage_manager'] = self
+
+    # Space reservations
+
+    def free_bytes(self) -> int:
+        """Free bytes on the upload volume"""
+        return shutil.disk_usage(self.upload_dir).free
+
+    def reserved_bytes(self) -> int:
+        """Bytes currently reserved by admitted jobs"""
+        with self._lock:
+            return sum(self._reservations.values())
+
+    def available_bytes(self) -> int:
+        """Free bytes not already promised to a job, minus headroom"""
+        return self.free_bytes() - self.reserved_bytes() - self.headroom
+
+    def reserve(self, job_id: str, nbytes: int) -> None:
+        """Reserve nbytes for a job or raise InsufficientStorageError"""
+        with self._lock:
+            available = self.free_bytes() - sum(self._reservations.values()) - self.headroom
+            if nbytes > available:
+                raise InsufficientStorageError(
+                    f"Insufficient disk space: job needs {nbytes} bytes, {max(available, 0)} available"
+                )
+            self._reservations[job_id] = self._reservations.get(job_id, 0) + nbytes
+            self._artifacts.setdefault(job_id, set())
+
+    def release(self, job_id: str) -> None:
+        """Drop a job's reservation without touching its files"""
+        with self._lock:
+            self._reservations.pop(job_id, None)
+
+    def resize(self, job_id: str, nbytes: int) -> None:
+        """Replace a job's reservation with a better estimate, checking only growth"""
+        with self._lock:
+            current = self._reservations.get(job_id, 0)
+            available = self.free_bytes() - sum(self._reservations.values()) - self.headroom
+            if nbytes - current > available:
+                raise InsufficientStorageError(
+                    f"Insufficient disk space: job needs {nbytes - current} more bytes, {max(available, 0)} available"
+                )
+            self._reservations[job_id] = nbytes
+
+    @staticmethod
+    def estimate_job_bytes(upload_size: int, is_video: bool, media: Optional[MediaInfo] = None) -> int:
+        """Estimate peak disk use for a job from its upload size and, once probed, its media info"""
+        # Video jobs keep the upload plus an extracted 16 kHz mono WAV alongside
+        # it; every job needs room for one exported chunk of up to 10 minutes.
+        if media is None or media.duration is None:
+            chunk_bytes = 10 * 60 * 16000 * 2
+            return upload_size * 2 + chunk_bytes if is_video else upload_size + chunk_bytes
+        extracted = int(media.duration * 16000 * 2) if is_video else 0
+        bytes_per_second = 16000 * 2 if is_video else (media.sample_rate or 16000) * (media.channels or 1) * 2
+        chunk_bytes = int(min(media.duration, 10 * 60) * bytes_per_second)
+        return upload_size + extracted + chunk_bytes
+
+    # Artifact tracking
+
+    def job_dir(self, job_id: str) -> Path:
+        """Per-job temp directory, created on first use"""
+        path = self.temp_dir / secure_filename(job_id)
+        path.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._artifacts.setdefault(job_id, set()).add(path)
+        return path
+
+    def temp_path(self, job_id: str, name: str) -> Path:
+        """Path for a named temp artifact inside the job directory"""
+        return self.job_dir(job_id) / secure_filename(name)
+
+    def track(self, job_id: str, path: Path) -> Path:
+        """Register a file outside the job directory as belonging to the job"""
+        with self._lock:
+            self._artifacts.setdefault(job_id, set()).add(Path(path))
+        return path
+
+    def hand_off(self, job_id: str) -> None:
+        """Forget a job another node will run: drop its reservation and stop owning its files"""
+        with self._lock:
+            self._artifacts.pop(job_id, None)
+            self._reservations.pop(job_id, None)
+
+    def active_jobs(self) -> Set[str]:
+        with self._lock:
+            return set(self._artifacts) | set(self._reservations)
+
+    def cleanup(self, job_id: str) -> None:
+        """Remove every artifact of a job and release its reservation"""
+        with self._lock:
+            paths = self._artifacts.pop(job_id, set())
+            self._reservations.pop(job_id, None)
+        for path in sorted(paths, key=lambda p: p.is_dir()):
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+                logger.info(f"Cleaned up job directory: {path}")
+            else:
+                self.file_handler.cleanup_files(path)
+
+    # Age-based sweeps
+
+    def _pending_uploads(self) -> Set[Path]:
+        """Uploads of transcripts that are not finished yet, whichever process created them"""
+        with self.app.app_context():
+            keys = db.session.query(Transcript.source_key).filter(
+                Transcript.source_key.isnot(None),
+                Transcript.status.notin_((TranscriptStatus.COMPLETED, TranscriptStatus.FAILED))
+            ).all()
+        return {
+            shared_storage.local_path(key).resolve() for (key,) in keys if not shared_storage.is_reference(key)
+        }
+
+    def sweep(self) -> None:
+        """Remove stale temp files, job directories and orphaned uploads"""
+        # Read first, so a failed query skips the pass instead of sweeping held uploads
+        pending = self._pending_uploads()
+        self.file_handler.cleanup_old_files()
+        active = self.active_jobs()
+        with self._lock:
+            active_paths = set().union(*self._artifacts.values()) if self._artifacts else set()
+        active_dirs = {secure_filename(job_id) for job_id in active}
+        now = datetime.now()
+        for directory, want_dirs in ((self.temp_dir, True), (self.upload_dir, False)):
+            for path in directory.iterdir():
+                if path in active_paths or path.is_dir() != want_dirs:
+                    continue
+                if want_dirs and path.name in active_dirs:
+                    continue
+                if not want_dirs and path.resolve() in pending:
+                    continue
+                try:
+                    age = now - datetime.fromtimestamp(path.stat().st_mtime)
+                    if age <= self.file_handler.max_age:
+                        continue
+                    if path.is_dir():
+                        shutil.rmtree(path, ignore_errors=True)
+                    else:
+                        path.unlink()
+                    logger.info(f"Swept stale artifact: {path}")
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    logger.error(f"Error sweeping {path}: {str(e)}")
+
+    def start_sweeper(self) -> None:
+        """Run sweep() every STORAGE_SWEEP_INTERVAL seconds on a daemon thread"""
+        if self._sweeper is not None or not self.sweep_interval:
+            return
+
+        def _loop():
+            while not self._stop.wait(self.sweep_interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    logger.error(f"Storage sweep failed: {str(e)}")
+
+        self._sweeper = threading.Thread(target=_loop, name='storage-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+
+storage_manager = StorageManager()
@@ -0,0 +1,157 @@
+import asyncio
+import contextvars
+import logging
+import os
+import secrets
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+from services.metrics import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Span:
+    """A timed pipeline stage within a job"""
+    stage: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    duration: float = 0.0
+    status: str = 'ok'
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, **attributes) -> None:
+        """Attach attributes such as bytes or provider"""
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'stage': self.stage,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': self.start,
+            'duration': round(self.duration, 6),
+            'status': self.status,
+            'attributes': self.attributes,
+        }
+
+class JobTrace:
+    """Records a per-job timeline of stage spans.
+
+    Spans nest by async context: a span opened while another is active in the
+    same task becomes its child. Every span is also observed in the
+    ``bentobox_stage_seconds`` histogram.
+    """
+
+    def __init__(self, job_id: str, trace_id: Optional[str] = None):
+        self.job_id = job_id
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.root_id = secrets.token_hex(8)
+        self.started = time.time()
+        self._started_perf = time.perf_counter()
+        self.spans: List[Span] = []
+        self._current = contextvars.ContextVar(f'span_{self.root_id}', default=self.root_id)
+
+    @contextmanager
+    def span(self, stage: str, **attributes) -> Iterator[Span]:
+        """Time the enclosed block as a stage of this job"""
+        span = Span(
+            stage=stage,
+            span_id=secrets.token_hex(8),
+            parent_id=self._current.get(),
+            start=time.time(),
+        )
+        span.set(**attributes)
+        token = self._current.set(span.span_id)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.status = 'cancelled' if isinstance(e, asyncio.CancelledError) else 'error'
+            span.set(error=str(e) or type(e).__name__)
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            self._current.reset(token)
+            self.spans.append(span)
+            STAGE_SECONDS.observe(span.duration, stage=stage)
+
+    @property
+    def duration(self) -> float:
+        return time.perf_counter() - self._started_perf
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Timeline in the form stored on the transcript"""
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.root_id,
+            'job_id': self.job_id,
+            'start': self.started,
+            'duration': round(self.duration, 6),
+            'spans': [span.to_dict() for span in sorted(self.spans, key=lambda s: s.start)],
+        }
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+def _otlp_span(trace_id: str, span_id: str, parent_id: Optional[str], name: str, start: float,
+               duration: float, status: str, attributes: Dict[str, Any]) -> Dict[str, Any]:
+    span = {
+        'traceId': trace_id,
+        'spanId': span_id,
+        'name': name,
+        'kind': 1,  # SPAN_KIND_INTERNAL
+        'startTimeUnixNano': str(int(start * 1e9)),
+        'endTimeUnixNano': str(int((start + duration) * 1e9)),
+        'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()],
+        'status': {'code': 2 if status == 'error' else 1},
+    }
+    if parent_id:
+        span['parentSpanId'] = parent_id
+    return span
+
+def timeline_to_otlp(timeline: Dict[str, Any], service_name: str = 'bentobox') -> Dict[str, Any]:
+    """Convert a stored timeline into an OTLP/JSON ExportTraceServiceRequest"""
+    trace_id = timeline['trace_id']
+    spans = [_otlp_span(
+        trace_id, timeline['span_id'], None, 'job', timeline['start'], timeline['duration'],
+        'ok', {'job.id': timeline.get('job_id', '')}
+    )]
+    for span in timeline.get('spans', []):
+        spans.append(_otlp_span(
+            trace_id, span['span_id'], span['parent_id'], span['stage'], span['start'],
+            span['duration'], span['status'], span.get('attributes', {})
+        ))
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': service_name}}]},
+            'scopeSpans': [{'scope': {'name': 'bentobox.pipeline'}, 'spans': spans}],
+        }]
+    }
+
+async def export_otlp(timeline: Dict[str, Any], endpoint: Optional[str] = None) -> bool:
+    """POST a timeline to an OTLP/HTTP collector; a no-op unless an endpoint is configured"""
+    endpoint = endpoint or os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT')
+    if not endpoint:
+        return False
+    url = endpoint.rstrip('/') + '/v1/traces'
+    payload = timeline_to_otlp(timeline, os.getenv('OTEL_SERVICE_NAME', 'bentobox'))
+    try:
+        import aiohttp  # Only needed when exporting; keeps it out of web startup
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+            async with session.post(url, json=payload) as response:
+                if response.status >= 300:
+                    logger.warning(f"OTLP export failed with {response.status}: {await response.text()}")
+                    return False
+        return True
+    except Exception as e:
+        logger.warning(f"OTLP export failed: {str(e)}")
+        return False
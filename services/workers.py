@@ -0,0 +1,94 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from flask import Flask
+from models import db, Worker
+from services.leases import lease_manager
+from services.local_whisper import local_whisper
+from services.provider_health import PROVIDERS, provider_health
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Cluster:
+    """The live job nodes sharing the database queue, as of their last heartbeats"""
+    workers: int
+    capacity: int  # Job slots across the live nodes
+    can_spill: bool  # Some node has a local backend
+    limited_until: Dict[str, float] = field(default_factory=dict)  # Wall time, per provider
+    healthy: Dict[str, bool] = field(default_factory=dict)
+
+    def limited_for(self, provider: str) -> float:
+        """Seconds until a rate-limited provider said any node could send again"""
+        return max(0.0, self.limited_until.get(provider, 0.0) - time.time())
+
+    def any_healthy(self) -> bool:
+        return any(self.healthy.get(provider) and not self.limited_for(provider) for provider in PROVIDERS)
+
+class WorkerRegistry:
+    """Heartbeats of the nodes running jobs, so web nodes can see the cluster.
+
+    Provider health is only observed where provider calls are made, and job
+    slots only exist where jobs run. In database-queue mode every job node
+    writes a row with its slot count and provider health on each lease
+    heartbeat (see JobRunner). Nodes that stopped beating for
+    ``JOB_LEASE_SECONDS`` no longer count. A provider counts as rate limited
+    while any node is backing off it, since the nodes share its API key, and
+    as healthy while some node last saw it healthy. Methods run inside an
+    app context (via the DB executor).
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Register the extension"""
+        app.extensions['worker_registry'] = self
+
+    def beat(self, slots: int) -> None:
+        """Record this node's slots and what it currently knows about the providers"""
+        now = time.time()
+        providers = {
+            provider: {
+                'healthy': provider_health.healthy(provider),
+                'limited_until': now + provider_health.limited_for(provider),
+            }
+            for provider in PROVIDERS
+        }
+        worker = db.session.get(Worker, lease_manager.owner)
+        if worker is None:
+            worker = Worker(id=lease_manager.owner)
+            db.session.add(worker)
+        worker.slots = slots
+        worker.providers = providers
+        worker.can_spill = local_whisper.can_spill
+        worker.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+
+    def leave(self) -> None:
+        """Drop this node from the registry on a clean shutdown"""
+        db.session.query(Worker).filter(Worker.id == lease_manager.owner).delete()
+        db.session.commit()
+
+    def cluster(self) -> Cluster:
+        """Capacity and provider health across the nodes that are still beating"""
+        cutoff = datetime.utcnow() - timedelta(seconds=lease_manager.lease_seconds)
+        workers = Worker.query.filter(Worker.heartbeat_at >= cutoff).all()
+        limited_until: Dict[str, float] = {}
+        healthy: Dict[str, bool] = {}
+        for worker in workers:
+            for provider, state in (worker.providers or {}).items():
+                limited_until[provider] = max(limited_until.get(provider, 0.0), state.get('limited_until') or 0.0)
+                healthy[provider] = healthy.get(provider, False) or bool(state.get('healthy'))
+        return Cluster(
+            workers=len(workers),
+            capacity=sum(worker.slots for worker in workers),
+            can_spill=any(worker.can_spill for worker in workers),
+            limited_until=limited_until,
+            healthy=healthy,
+        )
+
+worker_registry = WorkerRegistry()
@@ -0,0 +1,54 @@
+import asyncio
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from app import create_app, init_db
+from models import db, Transcript
+from services.database import db_executor, transcript_store
+from utils.common import TranscriptStatus
+
+class UpdateStatusTest(unittest.IsolatedAsyncioTestCase):
+    """Status updates folded into a queued write must land even if its caller is cancelled"""
+
+    def setUp(self):
+        self.work = Path(tempfile.mkdtemp())
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.work}/db.sqlite',
+            'UPLOAD_FOLDER': str(self.work / 'uploads'),
+            'STORAGE_SWEEP_INTERVAL': 0,
+        })
+        init_db(self.app)
+        with self.app.app_context():
+            self.transcript_id = Transcript.create(title='t', status=TranscriptStatus.PROCESSING).id
+
+    def tearDown(self):
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    async def test_cancelled_update_does_not_swallow_later_ones(self):
+        # Hold the writer so the first update stays queued
+        release = threading.Event()
+        self.addCleanup(release.set)
+        blocker = asyncio.ensure_future(db_executor.write(release.wait))
+        first = asyncio.ensure_future(
+            transcript_store.update_status(self.transcript_id, TranscriptStatus.UPLOADING, 10)
+        )
+        await asyncio.sleep(0.05)
+        first.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        await transcript_store.update_status(self.transcript_id, TranscriptStatus.FAILED, error='boom')
+        release.set()
+        await blocker
+        # Writes run in order, so this one waits for the cancelled caller's write
+        await db_executor.write(lambda: None)
+
+        self.assertEqual(transcript_store._pending_status, {})
+        with self.app.app_context():
+            transcript = db.session.get(Transcript, self.transcript_id)
+            self.assertEqual(transcript.status, TranscriptStatus.FAILED)
+            self.assertEqual(transcript.error, 'boom')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ import json
 import logging
 import asyncio
 from deepgram import Deepgram
+from utils.words import WordList
 
 class TranscriptionService:
     def __init__(self, api_key=None):
@@ -45,6 +46,7 @@ class TranscriptionService:
                 return {
                     'text': transcript['transcript'],
                     'segments': transcript['words'],
+                    'words': WordList.from_dicts(transcript['words']),
                     'duration': response['metadata']['duration']
                 }
         except Exception as e:
@@ -4,6 +4,8 @@ from enum import Enum
 
 class TranscriptStatus(str, Enum):
     """Enum for transcript processing status"""
+    QUEUED = "queued"
+    SCHEDULED = "scheduled"  # Held until its schedule releases it to the queue
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
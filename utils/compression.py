@@ -0,0 +1,106 @@
+import struct
+import zlib
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # Optional: zlib only
+    zstandard = None
+
+ZLIB = 'zlib'
+ZSTD = 'zstd'
+
+# Blob layout: codec id, dictionary id (0 = none), then the compressed payload
+_HEADER = struct.Struct('<BI')
+_CODEC_IDS = {ZLIB: 1, ZSTD: 2}
+_CODEC_NAMES = {v: k for k, v in _CODEC_IDS.items()}
+# Packed transcript: UTF-8 content length, content, then the segments JSON
+_CONTENT_LENGTH = struct.Struct('<I')
+# zlib only looks back 32 KiB, so a larger preset dictionary is never used
+ZLIB_DICTIONARY_BYTES = 32 * 1024
+
+
+def resolve_codec(preferred: str) -> str:
+    """The preferred codec if it can be used here, else zlib"""
+    if preferred == ZSTD and zstandard is not None:
+        return ZSTD
+    return ZLIB
+
+
+def default_level(codec: str) -> int:
+    return 19 if codec == ZSTD else 9
+
+
+def compress(data: bytes, codec: str, level: Optional[int] = None,
+             dictionary: Optional[Tuple[int, bytes]] = None) -> bytes:
+    """Compress data into a self-describing blob, optionally with a (dictionary id, data) preset"""
+    level = default_level(codec) if level is None else level
+    dictionary_id, dictionary_data = dictionary or (0, None)
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError('zstd compression requires the zstandard package')
+        options = {'level': level}
+        if dictionary_data:
+            options['dict_data'] = zstandard.ZstdCompressionDict(dictionary_data)
+        payload = zstandard.ZstdCompressor(**options).compress(data)
+    else:
+        compressor = zlib.compressobj(level, zdict=dictionary_data) if dictionary_data else zlib.compressobj(level)
+        payload = compressor.compress(data) + compressor.flush()
+    return _HEADER.pack(_CODEC_IDS[codec], dictionary_id) + payload
+
+
+def blob_codec(blob: bytes) -> Tuple[str, int]:
+    """Codec name and dictionary id a blob was written with"""
+    codec_id, dictionary_id = _HEADER.unpack_from(blob)
+    if codec_id not in _CODEC_NAMES:
+        raise ValueError(f'Unknown compression codec id {codec_id}')
+    return _CODEC_NAMES[codec_id], dictionary_id
+
+
+def decompress(blob: bytes, dictionaries: Callable[[int], bytes]) -> bytes:
+    """Decompress a blob from ``compress``, loading its preset dictionary by id if it used one"""
+    codec, dictionary_id = blob_codec(blob)
+    dictionary_data = dictionaries(dictionary_id) if dictionary_id else None
+    payload = memoryview(blob)[_HEADER.size:]
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError('This transcript was archived with zstd; install the zstandard package to read it')
+        options = {'dict_data': zstandard.ZstdCompressionDict(dictionary_data)} if dictionary_data else {}
+        return zstandard.ZstdDecompressor(**options).decompress(payload)
+    decompressor = zlib.decompressobj(zdict=dictionary_data) if dictionary_data else zlib.decompressobj()
+    return decompressor.decompress(payload) + decompressor.flush()
+
+
+def pack_transcript(content: Optional[str], segments_json: Optional[str]) -> bytes:
+    """Join transcript text and segments JSON into one buffer for compression"""
+    text = (content or '').encode('utf-8')
+    return _CONTENT_LENGTH.pack(len(text)) + text + (segments_json or '').encode('utf-8')
+
+
+def unpack_transcript(data: bytes) -> Tuple[str, str]:
+    """Split a buffer from ``pack_transcript`` back into content and segments JSON"""
+    (length,) = _CONTENT_LENGTH.unpack_from(data)
+    start = _CONTENT_LENGTH.size
+    return data[start:start + length].decode('utf-8'), data[start + length:].decode('utf-8')
+
+
+def train_dictionary(samples: List[bytes], codec: str, size: int = 64 * 1024) -> bytes:
+    """Build a shared preset dictionary from sample payloads.
+
+    zstd trains one with its own sampler. zlib has no trainer, so its
+    dictionary is the most frequent tokens of the samples, ordered so the
+    most common sit nearest the end where matches are cheapest.
+    """
+    if codec == ZSTD:
+        return zstandard.train_dictionary(size, samples).as_bytes()
+
+    size = min(size, ZLIB_DICTIONARY_BYTES)
+    counts = Counter(token for sample in samples for token in sample.split())
+    chosen, used = [], 0
+    for token, count in counts.most_common():
+        if count < 2 or used + len(token) + 1 > size:
+            break
+        chosen.append(token)
+        used += len(token) + 1
+    return b' '.join(reversed(chosen)) + b' '
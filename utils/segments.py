@@ -0,0 +1,184 @@
+import json
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+
+def _srt_timestamp(seconds: float) -> str:
+    """Format seconds as an SRT timestamp (HH:MM:SS,mmm)"""
+    total_ms = int(round(seconds * 1000))
+    hours, rest = divmod(total_ms, 3_600_000)
+    minutes, rest = divmod(rest, 60_000)
+    secs, millis = divmod(rest, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+class SegmentList:
+    """Compact columnar container for transcript segments.
+
+    Start and end times live in parallel ``array('d')`` columns and all segment
+    text is packed into a single UTF-8 buffer indexed by end offsets, so a
+    segment costs roughly 24 bytes plus its text instead of a dict with three
+    boxed values. Iterating yields plain dicts for code that still expects the
+    ``{'start', 'end', 'text'}`` shape.
+    """
+
+    __slots__ = ('_starts', '_ends', '_offsets', '_buffer')
+
+    def __init__(self) -> None:
+        self._starts = array('d')
+        self._ends = array('d')
+        self._offsets = array('Q')
+        self._buffer = bytearray()
+
+    @classmethod
+    def from_dicts(cls, segments: Optional[Iterable[Dict[str, Any]]]) -> 'SegmentList':
+        """Build from an iterable of ``{'start', 'end', 'text'}`` dicts"""
+        result = cls()
+        for segment in segments or ():
+            result.append(segment['start'], segment['end'], segment['text'])
+        return result
+
+    @classmethod
+    def from_json(cls, value: str) -> 'SegmentList':
+        """Build from the JSON list stored in the database"""
+        return cls.from_dicts(json.loads(value))
+
+    @classmethod
+    def coerce(cls, value: Union['SegmentList', Iterable[Dict[str, Any]], None]) -> 'SegmentList':
+        """Return value as a SegmentList, converting lists of dicts"""
+        if isinstance(value, cls):
+            return value
+        return cls.from_dicts(value)
+
+    def append(self, start: float, end: float, text: str) -> None:
+        """Append a single segment"""
+        self._starts.append(start)
+        self._ends.append(end)
+        self._buffer += text.encode('utf-8')
+        self._offsets.append(len(self._buffer))
+
+    def extend(self, other: 'SegmentList', offset: float = 0.0) -> 'SegmentList':
+        """Append all segments of other, shifting their times by offset"""
+        base = len(self._buffer)
+        if offset:
+            self._starts.extend(array('d', [t + offset for t in other._starts]))
+            self._ends.extend(array('d', [t + offset for t in other._ends]))
+        else:
+            self._starts.extend(other._starts)
+            self._ends.extend(other._ends)
+        self._offsets.extend(array('Q', [o + base for o in other._offsets]))
+        self._buffer += other._buffer
+        return self
+
+    def shift(self, offset: float) -> 'SegmentList':
+        """Shift every segment by offset seconds in place"""
+        if offset:
+            self._starts = array('d', [t + offset for t in self._starts])
+            self._ends = array('d', [t + offset for t in self._ends])
+        return self
+
+    @classmethod
+    def concat(cls, parts: Iterable['SegmentList'], offsets: Optional[Iterable[float]] = None) -> 'SegmentList':
+        """Merge several lists into one, each shifted by its matching offset"""
+        result = cls()
+        if offsets is None:
+            for part in parts:
+                result.extend(part)
+        else:
+            for part, offset in zip(parts, offsets):
+                result.extend(part, offset)
+        return result
+
+    def windows(self, seconds: float) -> Iterator['SegmentList']:
+        """Split into runs of segments starting in the same span of seconds.
+
+        Boundaries depend only on start times, so editing the text of one
+        window leaves every other window unchanged.
+        """
+        start = 0
+        while start < len(self):
+            span = self._starts[start] // seconds
+            stop = start + 1
+            while stop < len(self) and self._starts[stop] // seconds == span:
+                stop += 1
+            yield self._slice(slice(start, stop))
+            start = stop
+
+    def text_at(self, index: int) -> str:
+        """Return the text of a single segment"""
+        end = self._offsets[index]
+        start = self._offsets[index - 1] if index > 0 else 0
+        return self._buffer[start:end].decode('utf-8')
+
+    @property
+    def starts(self) -> array:
+        return self._starts
+
+    @property
+    def ends(self) -> array:
+        return self._ends
+
+    @property
+    def duration(self) -> float:
+        """End time of the last segment, or 0 when empty"""
+        return self._ends[-1] if self._ends else 0.0
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Dict[str, Any], 'SegmentList']:
+        if isinstance(key, slice):
+            return self._slice(key)
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('segment index out of range')
+        return {'start': self._starts[key], 'end': self._ends[key], 'text': self.text_at(key)}
+
+    def _slice(self, key: slice) -> 'SegmentList':
+        start, stop, step = key.indices(len(self))
+        result = SegmentList()
+        if step != 1:
+            for i in range(start, stop, step):
+                result.append(self._starts[i], self._ends[i], self.text_at(i))
+            return result
+        if start >= stop:
+            return result
+        base = self._offsets[start - 1] if start > 0 else 0
+        result._starts = self._starts[start:stop]
+        result._ends = self._ends[start:stop]
+        result._offsets = array('Q', [o - base for o in self._offsets[start:stop]])
+        result._buffer = self._buffer[base:self._offsets[stop - 1]]
+        return result
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield {'start': self._starts[i], 'end': self._ends[i], 'text': self.text_at(i)}
+
+    def __repr__(self) -> str:
+        return f'<SegmentList {len(self)} segments>'
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Convert to a list of dicts"""
+        return list(self)
+
+    def to_json(self) -> str:
+        """Serialize to the JSON list format used for storage"""
+        parts = []
+        dumps = json.dumps
+        for i in range(len(self)):
+            parts.append(
+                f'{{"start": {self._starts[i]!r}, "end": {self._ends[i]!r}, "text": {dumps(self.text_at(i))}}}'
+            )
+        return '[' + ', '.join(parts) + ']'
+
+    def to_srt(self) -> str:
+        """Render segments as an SRT subtitle document"""
+        entries = []
+        for i in range(len(self)):
+            entries.append(
+                f"{i + 1}\n"
+                f"{_srt_timestamp(self._starts[i])} --> {_srt_timestamp(self._ends[i])}\n"
+                f"{self.text_at(i)}\n"
+            )
+        return '\n'.join(entries) + ('\n' if entries else '')
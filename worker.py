@@ -0,0 +1,41 @@
+"""Standalone job worker: ``python worker.py``.
+
+Claims queued jobs from the shared database queue and processes them. Run
+any number of these on nodes that share the database and
+``SHARED_STORAGE_ROOT`` with the web nodes.
+"""
+import logging
+import signal
+import threading
+from app import create_app
+from services.audio_workers import audio_workers
+from services.jobs import DATABASE_QUEUE, job_runner
+from services.local_whisper import local_whisper
+from services.workers import worker_registry
+
+logger = logging.getLogger(__name__)
+
+def main():
+    app = create_app({'JOB_QUEUE': DATABASE_QUEUE, 'RUN_JOBS': True})
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    job_runner.start()
+    logger.info(f"Worker polling for jobs with {job_runner.max_jobs} slots")
+    stop.wait()
+
+    # Finish running jobs; anything cut off is requeued once its lease lapses
+    logger.info("Shutting down, waiting for running jobs")
+    if not job_runner.drain(timeout=app.config.get('WORKER_DRAIN_SECONDS', 300)):
+        logger.warning("Jobs still running at shutdown; their leases will expire and be requeued")
+    try:
+        with app.app_context():
+            worker_registry.leave()
+    except Exception as e:
+        logger.warning(f"Could not leave the worker registry: {str(e)}")
+    audio_workers.shutdown(wait=False)
+    local_whisper.shutdown(wait=False)
+
+if __name__ == '__main__':
+    main()
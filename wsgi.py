@@ -0,0 +1,14 @@
+"""Production entry point.
+
+Run several worker processes behind gunicorn, e.g.::
+
+    gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:5001 wsgi:app
+
+Each process has its own job runner, so set ``BROKER_URL`` to a broker all
+processes share (``spool:///path``) for progress streams to reach every
+worker, or run jobs on dedicated nodes with ``JOB_QUEUE=database`` and
+``RUN_JOBS=false`` here (see worker.py).
+"""
+from app import create_app
+
+app = create_app()